@@ -1,6 +1,7 @@
 ### configs/settings.py
 """Configuration settings for the test framework."""
 import os
+import tempfile
 
 class Config:
     """Base configuration class."""
@@ -14,14 +15,92 @@ class Config:
     PASSWORD = os.getenv('PASSWORD', 'testcoding@assignment.com')
     API_TOKEN = os.getenv('API_TOKEN', 'Gs0iQefxuWS2DwIQDgOh6Ke3ZhB1jgqJOE5Qnj0E6UNAa0QaPE6EJTlidKM19cpsfpHJ1E3ChUTwtn3hcDkEAZNaVI4l9QwG')
 
+    # Local Mist API stand-in (--env local)
+    LOCAL_API_HOST = os.getenv('LOCAL_API_HOST', '127.0.0.1')
+    LOCAL_API_PORT = int(os.getenv('LOCAL_API_PORT', '8765'))
+    LOCAL_API_LATENCY_MS = float(os.getenv('LOCAL_API_LATENCY_MS', '0'))
+    LOCAL_API_ERROR_RATE = float(os.getenv('LOCAL_API_ERROR_RATE', '0'))
+    LOCAL_API_ERROR_STATUS = int(os.getenv('LOCAL_API_ERROR_STATUS', '503'))
+    LOCAL_API_SEED = int(os.getenv('LOCAL_API_SEED', '0'))
+
     # Test Configuration
     TIMEOUT = int(os.getenv('TIMEOUT', '30'))
-    IMPLICIT_WAIT = int(os.getenv('IMPLICIT_WAIT', '10'))
+    # Keep implicit waits off: UIUtils waits explicitly, and mixing both multiplies the wait on every poll.
+    IMPLICIT_WAIT = int(os.getenv('IMPLICIT_WAIT', '0'))
+    WAIT_MIN_POLL = float(os.getenv('WAIT_MIN_POLL', '0.05'))
+    WAIT_MAX_POLL = float(os.getenv('WAIT_MAX_POLL', '0.5'))
+    NETWORK_IDLE_MS = int(os.getenv('NETWORK_IDLE_MS', '500'))
+
+    # HTTP Connection Pool Configuration
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '20'))
+    HTTP_POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', 'False').lower() == 'true'
+    HTTP_KEEP_ALIVE = os.getenv('HTTP_KEEP_ALIVE', 'True').lower() == 'true'
+    ASYNC_API_CONCURRENCY = int(os.getenv('ASYNC_API_CONCURRENCY', '20'))
+    BULK_API_WORKERS = int(os.getenv('BULK_API_WORKERS', '10'))
+    SELF_CACHE_TTL = float(os.getenv('SELF_CACHE_TTL', '30'))
+    API_PAGE_LIMIT = int(os.getenv('API_PAGE_LIMIT', '1000'))
+
+    # API Retry and Rate Limit Configuration (Mist allows 5000 API calls per hour per token)
+    API_RATE_LIMIT_PER_HOUR = float(os.getenv('API_RATE_LIMIT_PER_HOUR', '5000'))
+    API_RATE_LIMIT_BURST = int(os.getenv('API_RATE_LIMIT_BURST', '100'))
+    API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '3'))
+    API_BACKOFF_BASE = float(os.getenv('API_BACKOFF_BASE', '0.5'))
+    API_BACKOFF_MAX = float(os.getenv('API_BACKOFF_MAX', '30'))
+    # Longest Retry-After honoured; a server asking to wait longer fails the request instead
+    API_RETRY_AFTER_MAX = float(os.getenv('API_RETRY_AFTER_MAX', '300'))
 
     # Browser Configuration
     BROWSER = os.getenv('BROWSER', 'chrome')
     HEADLESS = os.getenv('HEADLESS', 'False').lower() == 'true'
+    DRIVER_CACHE_FILE = os.getenv('DRIVER_CACHE_FILE',
+                                  os.path.join(os.path.expanduser('~'), '.cache', 'mist-csqa', 'chromedriver.json'))
+    DRIVER_CACHE_TTL = int(os.getenv('DRIVER_CACHE_TTL', str(7 * 24 * 3600)))
+    BROWSER_STATE_DIR = os.getenv('BROWSER_STATE_DIR',
+                                  os.path.join(os.path.expanduser('~'), '.cache', 'mist-csqa', 'browser_state'))
+    BROWSER_STATE_TTL = int(os.getenv('BROWSER_STATE_TTL', '3600'))
+    DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '2'))
+    DRIVER_POOL_WARMUP_URL = os.getenv('DRIVER_POOL_WARMUP_URL', UI_BASE_URL)
+    WINDOW_SIZE = (1920, 1080)
+
+    # Browser Resource Policy (comma separated lists)
+    BLOCKED_URL_PATTERNS = os.getenv('BLOCKED_URL_PATTERNS',
+                                     '*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,'
+                                     '*hotjar.com*,*segment.io*,*segment.com*,*mixpanel.com*,*pendo.io*')
+    BLOCKED_RESOURCE_TYPES = os.getenv('BLOCKED_RESOURCE_TYPES', '')
+    DISABLE_IMAGES = os.getenv('DISABLE_IMAGES', 'False').lower() == 'true'
+    DISABLE_ANIMATIONS = os.getenv('DISABLE_ANIMATIONS', 'True').lower() == 'true'
+    CAPTURE_NETWORK_TIMINGS = os.getenv('CAPTURE_NETWORK_TIMINGS', 'False').lower() == 'true'
+
+    # Parallel UI Execution (pytest-xdist)
+    BROWSER_PROFILE_ROOT = os.getenv('BROWSER_PROFILE_ROOT', os.path.join(tempfile.gettempdir(), 'mist-csqa-profiles'))
+    REMOTE_DEBUGGING_BASE_PORT = int(os.getenv('REMOTE_DEBUGGING_BASE_PORT', '9300'))
+    REMOTE_DEBUGGING_PORTS_PER_WORKER = int(os.getenv('REMOTE_DEBUGGING_PORTS_PER_WORKER', '20'))
+    BROWSER_MEMORY_MB = int(os.getenv('BROWSER_MEMORY_MB', '1024'))
+    MAX_UI_WORKERS = int(os.getenv('MAX_UI_WORKERS', '0'))
+    TEST_DURATIONS_FILE = os.getenv('TEST_DURATIONS_FILE', '.test_durations.json')
 
     # Reporting
     SCREENSHOT_ON_FAILURE = True
-    SCREENSHOT_DIR = 'screenshots'
\ No newline at end of file
+    SCREENSHOT_DIR = 'screenshots'
+    SCREENSHOT_FORMAT = os.getenv('SCREENSHOT_FORMAT', 'webp')
+    SCREENSHOT_QUALITY = int(os.getenv('SCREENSHOT_QUALITY', '80'))
+    ARTIFACT_QUEUE_SIZE = int(os.getenv('ARTIFACT_QUEUE_SIZE', '64'))
+    ARTIFACT_QUEUE_TIMEOUT = float(os.getenv('ARTIFACT_QUEUE_TIMEOUT', '10'))
+    API_METRICS_FILE = os.getenv('API_METRICS_FILE', 'reports/api_latency.json')
+
+    # Page-load Performance
+    CAPTURE_PAGE_PERF = os.getenv('CAPTURE_PAGE_PERF', 'False').lower() == 'true'
+    PAGE_PERF_HISTORY_FILE = os.getenv('PAGE_PERF_HISTORY_FILE', '.page_perf_history.json')
+    PAGE_PERF_HISTORY_RUNS = int(os.getenv('PAGE_PERF_HISTORY_RUNS', '20'))
+    PAGE_PERF_BASELINE_RUNS = int(os.getenv('PAGE_PERF_BASELINE_RUNS', '3'))
+    PAGE_PERF_REGRESSION_PCT = float(os.getenv('PAGE_PERF_REGRESSION_PCT', '25'))
+    PAGE_PERF_FAIL_ON_REGRESSION = os.getenv('PAGE_PERF_FAIL_ON_REGRESSION', 'False').lower() == 'true'
+
+    # Session pool of pre-created orgs leased to the tests (see libs/api_libs/org_pool.py)
+    ORG_POOL_SIZE = int(os.getenv('ORG_POOL_SIZE', '2'))
+
+    # Structured log file written from a background thread (see utils/log_utils.py), disabled when empty
+    LOG_FILE = os.getenv('LOG_FILE', '')
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
@@ -1,12 +1,244 @@
 import pytest
+import hashlib
 import os
+from config.settings import Config
+from libs.api_libs.constants import api_constants
+from libs.api_libs.org_pool import OrgPool
+from libs.api_libs.topology_provisioner import TopologyProvisioner
+from libs.ui_libs.page_objects import PageRegistry
+from libs.ui_libs.signin_libs import SigninLibs
+from utils.api_utils.api_metrics import LatencyRecorder
+from utils.api_utils.connection_pool import SharedConnectionPool
+from utils.api_utils.local_mist_server import LocalMistAPIServer
+from utils.api_utils.request_scheduler import RequestScheduler
+from utils.ui_utils.driver_pool import DriverPool
+from utils.ui_utils import parallel_utils
+from utils.ui_utils import page_perf
+from utils.ui_utils.artifact_writer import ArtifactWriter
+from utils.ui_utils.browser_state import BrowserStateSnapshot, snapshot_path
+from utils.ui_utils.driver_cache import FileLock
+from utils.ui_utils.ui_utils import UIUtils
+from utils import log_utils
 
 def pytest_addoption(parser):
     parser.addoption(
-        "--env", action="store", default="production", help="my option: type1 or type2"
+        "--env", action="store", default="production",
+        help="Target environment: production, or local to run against the in-process Mist API stand-in"
     )
 
+def pytest_configure(config):
+    """Fix the run id before xdist starts the workers, so their page-load metrics land in the same run"""
+    page_perf.get_run_id()
+    log_utils.configure_logging()
+
+
+def pytest_unconfigure(config):
+    """Write the queued log records"""
+    log_utils.shutdown_logging()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Stamp the test node id and a new correlation id on the logs and API requests of the test, fixtures included"""
+    log_utils.set_test_context(item.nodeid)
+    yield
+    log_utils.clear_test_context()
+
+
 @pytest.fixture(scope="session")
 def env(request):
     """Fixture to get environment from command line"""
-    return request.config.getoption("--env")
\ No newline at end of file
+    env = request.config.getoption("--env")
+    if env == "local":
+        request.getfixturevalue("local_mist_api")
+    return env
+
+
+@pytest.fixture(scope="session")
+def local_mist_api():
+    """Session fixture serving the Mist API stand-in on localhost for --env local"""
+    # Every xdist worker runs its own server, so they can't all bind the configured port.
+    port = 0 if os.getenv("PYTEST_XDIST_WORKER") else Config.LOCAL_API_PORT
+    server = LocalMistAPIServer(port=port)
+    api_constants.CONST_EXT_API_URLs["local"] = server.start()
+    # The Mist quota doesn't apply to the stand-in.
+    RequestScheduler.configure(rate_per_hour=0)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def provision_topology(env):
+    """Factory provisioning TopologySpecs; every topology it created is torn down after the test"""
+    provisioner = TopologyProvisioner(env)
+    topologies = []
+
+    def provision(spec):
+        topology = provisioner.provision(spec)
+        topologies.append(topology)
+        return topology
+
+    yield provision
+    for topology in reversed(topologies):
+        provisioner.teardown(topology)
+
+
+@pytest.fixture(scope="session")
+def org_pool(env, http_connection_pool):
+    """Session fixture owning the pool of pre-created orgs, created in the background and deleted at the end"""
+    pool = OrgPool(env).start()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def leased_org(org_pool):
+    """Org leased from the pool for one test, reset to its baseline once the test is done"""
+    with org_pool.lease() as org:
+        yield org
+
+
+@pytest.fixture(scope="session", autouse=True)
+def http_connection_pool():
+    """Session fixture owning the shared HTTP connection pool used by CommonAPIUtils"""
+    adapter = SharedConnectionPool.configure()
+    yield adapter
+    SharedConnectionPool.close()
+
+
+
+@pytest.fixture(scope="session")
+def driver_pool():
+    """Session fixture owning the pool of pre-launched WebDriver sessions used by the UI tests"""
+    pool = DriverPool().start()
+    yield pool
+    pool.close()
+    parallel_utils.cleanup_worker_profiles()
+
+
+@pytest.fixture(scope="session")
+def authenticated_state(driver_pool):
+    """Session fixture with the browser state of Config.USERNAME signed in, reused from disk until it expires"""
+    path = snapshot_path("signin_" + hashlib.sha256(Config.USERNAME.encode()).hexdigest()[:12])
+    snapshot = BrowserStateSnapshot.load(path)
+    if snapshot is None:
+        os.makedirs(Config.BROWSER_STATE_DIR, exist_ok=True)
+        with FileLock(path + ".lock"):
+            # Another worker may have signed in while we waited for the lock.
+            snapshot = BrowserStateSnapshot.load(path)
+            if snapshot is None:
+                with driver_pool.lease() as driver:
+                    SigninLibs(driver).sign_in()
+                    snapshot = UIUtils(driver).capture_browser_state()
+                snapshot.save(path)
+    return snapshot
+
+
+@pytest.fixture
+def authenticated_driver(driver_pool, authenticated_state):
+    """Pooled driver restored to the signed in state, on the page the snapshot was taken on"""
+    with driver_pool.lease() as driver:
+        UIUtils(driver).restore_browser_state(authenticated_state)
+        yield driver
+
+
+_test_duration_history = parallel_utils.TestDurationHistory()
+_page_perf_trend = []
+
+
+def _is_xdist_worker():
+    return parallel_utils.get_worker_id() != "master"
+
+
+def pytest_collection_modifyitems(session, config, items):
+    """Start the historically slowest test files first, so --dist loadfile balances the workers"""
+    _test_duration_history.sort_items(items)
+
+
+def pytest_runtest_logreport(report):
+    """Accumulate per-file durations on the controller (or the only process without xdist)"""
+    if not _is_xdist_worker():
+        _test_duration_history.record(report.nodeid, report.duration)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config):
+    """Derive `-n auto` from the CPUs and memory available for browsers, when the run includes UI tests"""
+    ui_tests_dir = os.path.join(str(config.rootpath), "tests", "ui_tests")
+    if not parallel_utils.selects_ui_tests(config.args, ui_tests_dir):
+        # No browser is started: let xdist use every CPU.
+        return None
+    return parallel_utils.max_parallel_browsers()
+
+
+def _api_endpoint_labels():
+    """Map endpoint templates to their api_constants names, e.g. "/orgs/{}" -> "CONST_API_ORG_DETAILS"."""
+    return {value: name for name, value in vars(api_constants).items()
+            if name.startswith("CONST_API_") and isinstance(value, str)}
+
+
+def _page_labels():
+    """Map page URLs to their PageRegistry names."""
+    return {page.url: name for name, page in PageRegistry.all().items()}
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Write the API latency report, the page-load history and the test duration history collected during the session"""
+    ArtifactWriter.close_shared(timeout=60)
+    if not _is_xdist_worker():
+        _test_duration_history.save()
+    if page_perf.PagePerfRecorder.samples():
+        page_perf.PagePerfRecorder.save_history()
+    if not _is_xdist_worker():
+        # The workers are done by now, so the history holds every page of this run.
+        _page_perf_trend[:] = page_perf.trend_report()
+        if Config.PAGE_PERF_FAIL_ON_REGRESSION and any(row["regressed"] for row in _page_perf_trend):
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+    if _is_xdist_worker():
+        # Sent to the controller with the "workerfinished" event, see pytest_testnodedown.
+        session.config.workeroutput["api_latency_samples"] = LatencyRecorder.samples()
+        session.config.workeroutput["request_scheduler_metrics"] = RequestScheduler.shared().get_metrics()
+    elif LatencyRecorder.summary():
+        LatencyRecorder.write_json(Config.API_METRICS_FILE,
+                                   extra={"labels": _api_endpoint_labels(),
+                                          "scheduler": RequestScheduler.shared().get_metrics()})
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Merge the API samples and scheduler counters of a finished xdist worker into the controller's reports"""
+    workeroutput = getattr(node, "workeroutput", {})
+    LatencyRecorder.merge(workeroutput.get("api_latency_samples", {}))
+    RequestScheduler.shared().merge_metrics(workeroutput.get("request_scheduler_metrics", {}))
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Print the per-endpoint API latency percentiles at the end of the run"""
+    if LatencyRecorder.summary():
+        terminalreporter.write_sep("=", "API latency")
+        terminalreporter.write_line(LatencyRecorder.format_table(_api_endpoint_labels()))
+        terminalreporter.write_line("JSON report: {}".format(Config.API_METRICS_FILE))
+    if _page_perf_trend:
+        terminalreporter.write_sep("=", "Page-load trend")
+        terminalreporter.write_line(page_perf.format_trend(_page_perf_trend, _page_labels()))
+        regressions = [row for row in _page_perf_trend if row["regressed"]]
+        if regressions:
+            terminalreporter.write_line("{} page-load regression(s) over {}%{}".format(
+                len(regressions), Config.PAGE_PERF_REGRESSION_PCT,
+                ", failing the build" if Config.PAGE_PERF_FAIL_ON_REGRESSION else ""), red=True)
+    locator_stats = UIUtils.get_locator_stats()
+    if locator_stats:
+        terminalreporter.write_sep("=", "Slowest UI locators")
+        for entry in locator_stats[:10]:
+            by, value = entry["locator"].split("=", 1)
+            terminalreporter.write_line("{:<50} lookups={:<4} cache_hits={:<4} total={:.2f}s max={:.2f}s".format(
+                PageRegistry.find_locator_name((by, value)) or entry["locator"], entry["lookups"],
+                entry["cache_hits"], entry["total_seconds"], entry["max_seconds"]))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix):
+    """Add the API latency table to the pytest-html report"""
+    if LatencyRecorder.summary():
+        from py.xml import html
+        postfix.extend([html.h2("API latency"), html.pre(LatencyRecorder.format_table(_api_endpoint_labels()))])
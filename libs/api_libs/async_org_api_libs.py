@@ -0,0 +1,76 @@
+from libs.api_libs.constants import api_constants
+from libs.api_libs.org_api_libs import GenericOrgLibs, SelfPrivilegesCache
+from utils.api_utils.async_api_utils import AsyncCommonAPIUtils
+
+
+class AsyncOrgAPILibs(GenericOrgLibs):
+    """
+      Class that holds the async counterparts of the OrgAPILibs operations.
+      All coroutines share one AsyncCommonAPIUtils, which bounds the number of in-flight requests.
+      This class inherits the GenericOrgLibs.
+    """
+
+    def __init__(self, max_concurrency=None):
+        """
+        AsyncOrgAPILibs():: Creates the shared async API client.
+        :param max_concurrency: Maximum number of concurrent requests. Defaults to Config.ASYNC_API_CONCURRENCY.
+        """
+        self.api_utils = AsyncCommonAPIUtils(max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.api_utils.close()
+
+    async def _op_create_org(self, env, org_payload=None):
+        self._log.info("Trying to create a Organization", operation="_op_create_org")
+        create_org_url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORGS
+        create_org_data = self.get_sample_org_config()
+        if org_payload is not None:
+            create_org_data.update(org_payload)
+        else:
+            create_org_data['name'] = self.create_random_org_name()
+
+        response = await self.api_utils.post_request_with_status_code_validation(create_org_url, create_org_data, 200)
+        SelfPrivilegesCache.invalidate(env)
+        self._log.info("Org %s has been created Successfully", response['id'], operation="_op_create_org")
+        return response
+
+    async def _get_org_details(self, env, org_id):
+        org_details_url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_DETAILS.format(org_id)
+        return await self.api_utils.get_request_with_status_code_validation(org_details_url, 200)
+
+    async def _op_update_org(self, env, org_id, org_payload):
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_DETAILS.format(org_id)
+        response = await self.api_utils.put_request_with_status_code_validation(url, org_payload, 200)
+        self._log.info("Org %s was updated successfully", org_id, org_id=org_id, operation="_op_update_org")
+        return response
+
+    async def _op_delete_org(self, env, org_id):
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_DETAILS.format(org_id)
+        await self.api_utils.delete_request_with_status_code_validation(url, 200)
+        SelfPrivilegesCache.invalidate(env)
+        self._log.info("Org %s was deleted successfully", org_id, org_id=org_id, operation="_op_delete_org")
+
+    async def _op_get_self(self, env):
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_SELF
+        return await self.api_utils.get_request_with_status_code_validation(url, 200)
+
+    async def create_orgs(self, env, org_payloads):
+        """
+        Create all the given orgs concurrently.
+        :param org_payloads: List of org payloads. A None entry creates an org with a random name.
+        :return: List of created orgs, with an exception in place of every org that failed.
+        """
+        return await self.api_utils.gather(*[self._op_create_org(env, payload) for payload in org_payloads])
+
+    async def delete_orgs(self, env, org_ids):
+        """
+        Delete all the given orgs concurrently.
+        :return: List aligned with org_ids holding None, or the exception raised for that org.
+        """
+        return await self.api_utils.gather(*[self._op_delete_org(env, org_id) for org_id in org_ids])
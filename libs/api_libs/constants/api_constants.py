@@ -1,5 +1,8 @@
+from config.settings import Config
+
 CONST_EXT_API_URLs = {
-    "production": "https://api.ac2.mist.com/api/v1"
+    "production": "https://api.ac2.mist.com/api/v1",
+    "local": "http://{}:{}/api/v1".format(Config.LOCAL_API_HOST, Config.LOCAL_API_PORT)
 }
 
 CONST_EXT_UI_URLs = {
@@ -13,7 +16,11 @@ CONST_API_ORG_SETTING = "/orgs/{}/setting"
 CONST_API_ORG_SITEGROUP = "/orgs/{}/sitegroups"
 CONST_API_ORG_SITEGROUP_DETAILS = "/orgs/{}/sitegroups/{}"
 CONST_API_SWITCH_ORG_TEMPLATE = "/orgs/{}/networktemplates"
+CONST_API_SWITCH_ORG_TEMPLATE_DETAILS = "/orgs/{}/networktemplates/{}"
 CONST_API_ORG_CLIENTS = "/orgs/{}/clients/search"
 CONST_API_ORG_INVENTORY = "/orgs/{}/inventory"
 CONST_API_SELF = "/self"
 
+######## SITE CONSTANTS #########
+CONST_API_ORG_SITES = "/orgs/{}/sites"
+CONST_API_SITE_DETAILS = "/sites/{}"
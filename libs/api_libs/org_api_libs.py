@@ -1,27 +1,104 @@
-import logging
-from datetime import datetime
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urljoin
 from libs.api_libs.constants import api_constants
+from libs.api_libs.payload_factory import PayloadFactory
 from utils.api_utils.api_utils import CommonAPIUtils
-import os
-import json
+from utils.api_utils.bulk_utils import run_bulk
+from utils.api_utils.pagination import iter_paginated, iter_x_pages
+from utils.log_utils import get_logger
+from config.settings import Config
 
 class GenericOrgLibs(object):
     """
         Class that holds the Generic Functions for the Site Set Up.
     """
 
+    AUTOMATION_ORG_PREFIX = PayloadFactory.NAME_PREFIXES["org"]
+    AUTOMATION_ORG_NAME_PATTERN = re.compile(r"^Automation Org (\d{4}-\d{2}-\d{2} \d{2}:\d{2})")
+
+    @property
+    def _log(self):
+        """Structured logger of the class, see utils.log_utils."""
+        return get_logger(__name__, self.__class__.__name__)
+
     def create_random_org_name(self):
         """
-        Creating the Org Name.
+        Creating the Org Name, unique across threads, processes and xdist workers. See PayloadFactory.name.
         :return: The Org Name.
         """
-        return "Automation Org " + str(datetime.now())[0:16]
+        return PayloadFactory.name("org")
+
+    def get_org_name_timestamp(self, org_name):
+        """
+        Parse the creation timestamp out of a name generated by create_random_org_name.
+        :return: The datetime, or None if the name was not generated by the automation.
+        """
+        match = self.AUTOMATION_ORG_NAME_PATTERN.match(org_name or "")
+        if match is None:
+            return None
+        return datetime.strptime(match.group(1), "%Y-%m-%d %H:%M")
 
     def get_sample_org_config(self):
-        org_config_file = os.path.abspath(__file__ + "/../") + "/configs/sample_org_config.json"
-        with open(org_config_file)  as org_default_payload:
-            data = json.load(org_default_payload)
-        return data
+        """
+        :return: A copy of configs/sample_org_config.json, which is only read once.
+        """
+        return PayloadFactory.payload("org")
+
+
+class SelfPrivilegesCache(object):
+    """
+        Process-wide, per-env cache of the /self privileges with TTL based expiry.
+        Org IDs are indexed in a set so membership checks are O(1).
+        Every invalidate() bumps a per-env generation, so a fetch that was in flight while an org was
+        created or deleted is returned to its caller but never stored.
+    """
+
+    _lock = threading.Lock()
+    _entries = {}
+    _generations = {}
+
+    @classmethod
+    def get(cls, env, fetch_self, ttl=None):
+        """
+        Return the cached entry for env, calling fetch_self(env) if it is missing or expired.
+        :param fetch_self: Callable returning the /self response.
+        :param ttl: Expiry in seconds. Defaults to Config.SELF_CACHE_TTL. 0 always refetches.
+        :return: Dict with "privileges", "org_ids" (ordered list) and "org_id_set".
+        """
+        ttl = Config.SELF_CACHE_TTL if ttl is None else ttl
+        with cls._lock:
+            entry = cls._entries.get(env)
+            if entry is not None and time.monotonic() - entry["fetched_at"] < ttl:
+                return entry
+            generation = cls._generations.get(env, 0)
+
+        privileges = fetch_self(env)["privileges"]
+        org_ids = [privilege["org_id"] for privilege in privileges if privilege["scope"] == "org"]
+        entry = {
+            "fetched_at": time.monotonic(),
+            "privileges": privileges,
+            "org_ids": org_ids,
+            "org_id_set": frozenset(org_ids),
+        }
+        with cls._lock:
+            # An org was created or deleted during the fetch: the result may predate it.
+            if cls._generations.get(env, 0) == generation:
+                cls._entries[env] = entry
+        return entry
+
+    @classmethod
+    def invalidate(cls, env=None):
+        """
+        Drop the cached entry for env, or every entry if env is None.
+        """
+        with cls._lock:
+            envs = list(set(cls._entries) | set(cls._generations)) if env is None else [env]
+            for name in envs:
+                cls._entries.pop(name, None)
+                cls._generations[name] = cls._generations.get(name, 0) + 1
 
 
 class OrgAPILibs(GenericOrgLibs):
@@ -36,8 +113,7 @@ class OrgAPILibs(GenericOrgLibs):
         """
 
     def _op_create_org(self, env, org_payload=None):
-        logging.info("{} :: {} :: Trying to create a Organization".format(self.__class__.__name__,
-                                                                          self.__class__._op_create_org.__name__))
+        self._log.info("Trying to create a Organization", operation="_op_create_org")
         create_org_url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORGS
         create_org_data = super(OrgAPILibs, self).get_sample_org_config()
         if org_payload is not None:
@@ -45,71 +121,217 @@ class OrgAPILibs(GenericOrgLibs):
         else:
             create_org_data['name'] = super(OrgAPILibs, self).create_random_org_name()
 
-        logging.info("{} :: {} :: Org name is set as {} ".format(self.__class__.__name__,
-                                                                 self.__class__._op_create_org.__name__,
-                                                                 create_org_data['name']))
+        self._log.info("Org name is set as %s ", create_org_data['name'], operation="_op_create_org")
         response = CommonAPIUtils().post_request_with_status_code_validation(create_org_url, create_org_data, 200)
-        logging.info("{} :: {} :: Org has been created Successfully".format(self.__class__.__name__,
-                                                                            self.__class__._op_create_org.__name__))
+        SelfPrivilegesCache.invalidate(env)
+        self._log.info("Org has been created Successfully", operation="_op_create_org")
         return response
 
     def _get_org_details(self, env, org_id):
-        logging.info("{} :: {} :: Trying to GET the org details for Org with ID {}".format(self.__class__.__name__,
-                                                                                           self.__class__._get_org_details.__name__,
-                                                                                           org_id))
+        self._log.info("Trying to GET the org details for Org with ID %s",
+                       org_id, org_id=org_id, operation="_get_org_details")
         org_details_url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_DETAILS.format(org_id)
         org_details = CommonAPIUtils().get_request_with_status_code_validation(org_details_url, 200)
         return org_details
 
     def _op_update_org(self, env, org_id, org_payload):
-        logging.info("{} :: {} :: Trying to Update a Org".format(
-            self.__class__.__name__,
-            self.__class__._op_update_org.__name__))
+        self._log.info("Trying to Update a Org", org_id=org_id, operation="_op_update_org")
         url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_DETAILS.format(org_id)
         response = CommonAPIUtils().put_request_with_status_code_validation(url, org_payload, 200)
-        logging.info("{} :: {} :: Org was updated successfully".format(
-            self.__class__.__name__,
-            self.__class__._op_update_org.__name__))
+        self._log.info("Org was updated successfully", org_id=org_id, operation="_op_update_org")
         return response
 
     def _op_delete_org(self, env, org_id):
-        logging.info("{} :: {} :: Trying to delete a Org by its ID".format(
-            self.__class__.__name__,
-            self.__class__._op_delete_org.__name__))
+        self._log.info("Trying to delete a Org by its ID", org_id=org_id, operation="_op_delete_org")
         url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_DETAILS.format(org_id)
         CommonAPIUtils().delete_request_with_status_code_validation(url, 200)
-        logging.info("{} :: {} :: Org was deleted successfully".format(
-            self.__class__.__name__,
-            self.__class__._op_delete_org.__name__))
+        SelfPrivilegesCache.invalidate(env)
+        self._log.info("Org was deleted successfully", org_id=org_id, operation="_op_delete_org")
+
+    def _op_update_org_setting(self, env, org_id, setting_payload):
+        self._log.info("Trying to update the settings of Org %s",
+                       org_id, org_id=org_id, operation="_op_update_org_setting")
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_SETTING.format(org_id)
+        return CommonAPIUtils().put_request_with_status_code_validation(url, setting_payload, 200)
+
+    def _op_create_sitegroup(self, env, org_id, sitegroup_payload):
+        self._log.info("Trying to create the Sitegroup %s in Org %s",
+                       sitegroup_payload['name'], org_id, org_id=org_id, operation="_op_create_sitegroup")
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_SITEGROUP.format(org_id)
+        return CommonAPIUtils().post_request_with_status_code_validation(url, sitegroup_payload, 200)
+
+    def _op_delete_sitegroup(self, env, org_id, sitegroup_id):
+        self._log.info("Trying to delete the Sitegroup %s of Org %s",
+                       sitegroup_id, org_id, org_id=org_id, operation="_op_delete_sitegroup")
+        url = api_constants.CONST_EXT_API_URLs[env] + \
+            api_constants.CONST_API_ORG_SITEGROUP_DETAILS.format(org_id, sitegroup_id)
+        CommonAPIUtils().delete_request_with_status_code_validation(url, 200)
+
+    def _op_create_networktemplate(self, env, org_id, template_payload):
+        self._log.info("Trying to create the Network Template %s in Org %s",
+                       template_payload['name'], org_id, org_id=org_id, operation="_op_create_networktemplate")
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_SWITCH_ORG_TEMPLATE.format(org_id)
+        return CommonAPIUtils().post_request_with_status_code_validation(url, template_payload, 200)
+
+    def _op_delete_networktemplate(self, env, org_id, template_id):
+        self._log.info("Trying to delete the Network Template %s of Org %s",
+                       template_id, org_id, org_id=org_id, operation="_op_delete_networktemplate")
+        url = api_constants.CONST_EXT_API_URLs[env] + \
+            api_constants.CONST_API_SWITCH_ORG_TEMPLATE_DETAILS.format(org_id, template_id)
+        CommonAPIUtils().delete_request_with_status_code_validation(url, 200)
+
+    def _get_org_setting(self, env, org_id):
+        self._log.info("Trying to GET the settings of Org %s", org_id, org_id=org_id, operation="_get_org_setting")
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_SETTING.format(org_id)
+        return CommonAPIUtils().get_request_with_status_code_validation(url, 200)
+
+    def iter_sitegroups(self, env, org_id, limit=None):
+        """
+        Iterate over the sitegroups of an org, page by page.
+        :param limit: Page size. Defaults to Config.API_PAGE_LIMIT.
+        """
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_SITEGROUP.format(org_id)
+        return iter_x_pages(url, limit=limit)
+
+    def iter_networktemplates(self, env, org_id, limit=None):
+        """
+        Iterate over the network templates of an org, page by page.
+        :param limit: Page size. Defaults to Config.API_PAGE_LIMIT.
+        """
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_SWITCH_ORG_TEMPLATE.format(org_id)
+        return iter_x_pages(url, limit=limit)
+
+    def delete_sitegroups(self, env, org_id, sitegroup_ids, max_workers=None):
+        """
+        Delete many sitegroups of an org concurrently over a worker pool.
+        :return: BulkResult with (sitegroup_id, None) successes and (sitegroup_id, exception) failures.
+        """
+        return run_bulk(lambda sitegroup_id: self._op_delete_sitegroup(env, org_id, sitegroup_id), sitegroup_ids,
+                        max_workers)
+
+    def delete_networktemplates(self, env, org_id, template_ids, max_workers=None):
+        """
+        Delete many network templates of an org concurrently over a worker pool.
+        :return: BulkResult with (template_id, None) successes and (template_id, exception) failures.
+        """
+        return run_bulk(lambda template_id: self._op_delete_networktemplate(env, org_id, template_id), template_ids,
+                        max_workers)
 
     def _op_get_self(self, env, api_token=None):
         url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_SELF
         return CommonAPIUtils().get_request_with_status_code_validation(url, 200)
 
+    def get_self_privileges(self, env, ttl=None):
+        """
+        Cached view of the /self privileges. See SelfPrivilegesCache.
+        :param ttl: Expiry in seconds. Defaults to Config.SELF_CACHE_TTL. 0 forces a refetch.
+        """
+        return SelfPrivilegesCache.get(env, self._op_get_self, ttl)
+
     def get_list_of_org_ids_for_user(self, env):
-        logging.info("{} :: {} :: Trying to GET the list of ORG IDs that the account has access".format(
-            self.__class__.__name__,
-            self.__class__._op_update_org.__name__))
-        org_ids = []
-        self_api = self._op_get_self(env)
-        for org_count in range(0, len(self_api["privileges"])):
-            if self_api["privileges"][org_count]["scope"] == "org":
-                current_org_id = self_api['privileges'][org_count]['org_id']
-                org_ids.append(current_org_id)
-        return org_ids
+        self._log.info("Trying to GET the list of ORG IDs that the account has access",
+                       operation="get_list_of_org_ids_for_user")
+        return list(self.get_self_privileges(env)["org_ids"])
+
+    def get_set_of_org_ids_for_user(self, env):
+        """
+        Set of the ORG IDs that the account has access to, for O(1) membership checks.
+        """
+        return self.get_self_privileges(env)["org_id_set"]
 
     def _is_org_present(self, env, org_id):
-        logging.info(
-            "{} :: {} :: Trying to check if the given org_id is present in the list of orgs that the user has access to.".format(
-                self.__class__.__name__, self.__class__._is_org_present.__name__))
-        org_ids = self.get_list_of_org_ids_for_user(env)
-        if org_id in org_ids:
-            logging.info(
-                "{} :: {} :: Given org exists in the list of orgs that user has access to".format(
-                    self.__class__.__name__, self.__class__._is_org_present.__name__))
+        self._log.info("Trying to check if the given org_id is present in the list of orgs that the user has access "
+                       "to.", org_id=org_id, operation="_is_org_present")
+        if org_id in self.get_set_of_org_ids_for_user(env):
+            self._log.info("Given org exists in the list of orgs that user has access to", operation="_is_org_present")
             return True
         else:
-            logging.info(
-                "{} :: {} :: Given org doesnt exist in the list of orgs that user has access to.".format(
-                    self.__class__.__name__, self.__class__._is_org_present.__name__))
-            return False
\ No newline at end of file
+            self._log.info("Given org doesnt exist in the list of orgs that user has access to.",
+                           operation="_is_org_present")
+            return False
+
+    def create_orgs(self, env, count=None, org_payloads=None, max_workers=None):
+        """
+        Create many orgs concurrently over a worker pool.
+        :param count: Number of orgs to create from generated payloads. Ignored if org_payloads is given.
+        :param org_payloads: List of org payloads, one org per payload.
+        :param max_workers: Worker count. Defaults to Config.BULK_API_WORKERS.
+        :return: BulkResult with (payload, created_org) successes and (payload, exception) failures.
+        """
+        if org_payloads is None:
+            if count is None:
+                raise ValueError("Either count or org_payloads must be given")
+            org_payloads = PayloadFactory.org_payloads(count)
+        self._log.info("Trying to create %s Organizations", len(org_payloads), operation="create_orgs")
+        result = run_bulk(lambda payload: self._op_create_org(env, payload), org_payloads, max_workers)
+        self._log.info("%s Orgs created, %s failed", len(result.succeeded), len(result.failed), operation="create_orgs")
+        return result
+
+    def delete_orgs(self, env, org_ids, max_workers=None):
+        """
+        Delete many orgs concurrently over a worker pool.
+        :param org_ids: IDs of the orgs to delete.
+        :param max_workers: Worker count. Defaults to Config.BULK_API_WORKERS.
+        :return: BulkResult with (org_id, None) successes and (org_id, exception) failures.
+        """
+        self._log.info("Trying to delete %s Organizations", len(org_ids), operation="delete_orgs")
+        result = run_bulk(lambda org_id: self._op_delete_org(env, org_id), org_ids, max_workers)
+        self._log.info("%s Orgs deleted, %s failed", len(result.succeeded), len(result.failed), operation="delete_orgs")
+        return result
+
+    def find_stale_automation_orgs(self, env, max_age_minutes=60):
+        """
+        Find the orgs created by create_random_org_name that are older than max_age_minutes.
+        :return: List of org IDs.
+        """
+        cutoff = datetime.now() - timedelta(minutes=max_age_minutes)
+        stale_org_ids = []
+        for privilege in self.get_self_privileges(env, ttl=0)["privileges"]:
+            if privilege["scope"] != "org":
+                continue
+            created_at = self.get_org_name_timestamp(privilege.get("name"))
+            if created_at is not None and created_at < cutoff:
+                stale_org_ids.append(privilege["org_id"])
+        return stale_org_ids
+
+    def sweep_stale_automation_orgs(self, env, max_age_minutes=60, max_workers=None):
+        """
+        Delete the leftover "Automation Org <timestamp>" orgs older than max_age_minutes.
+        :return: BulkResult of the deletes.
+        """
+        stale_org_ids = self.find_stale_automation_orgs(env, max_age_minutes)
+        self._log.info("Found %s stale automation orgs", len(stale_org_ids), operation="sweep_stale_automation_orgs")
+        return self.delete_orgs(env, stale_org_ids, max_workers)
+
+    def iter_org_clients(self, env, org_id, filters=None, limit=None, prefetch=True):
+        """
+        Iterate over the clients of an org, following the "next" links of the search results.
+        :param filters: Search parameters applied server side, e.g. {"ssid": "corp"}.
+        :param limit: Page size. Defaults to Config.API_PAGE_LIMIT.
+        :param prefetch: Fetch the next page while the current one is consumed.
+        :return: Generator of client dicts, holding at most two pages in memory.
+        """
+        query = dict(filters or {}, limit=limit or Config.API_PAGE_LIMIT)
+        first_url = "{}{}?{}".format(api_constants.CONST_EXT_API_URLs[env],
+                                     api_constants.CONST_API_ORG_CLIENTS.format(org_id), urlencode(query))
+
+        def fetch_page(url):
+            self._log.debug("Fetching %s", url, operation="iter_org_clients")
+            page = CommonAPIUtils().get_request_with_status_code_validation(url, 200)
+            # "next" is relative to the API host, e.g. /api/v1/orgs/<id>/clients/search?...&search_after=...
+            return page["results"], urljoin(url, page["next"]) if page.get("next") else None
+
+        return iter_paginated(fetch_page, first_url, prefetch)
+
+    def iter_org_inventory(self, env, org_id, filters=None, limit=None, prefetch=True):
+        """
+        Iterate over the devices of an org inventory, page by page using the X-Page-* response headers.
+        :param filters: Query parameters applied server side, e.g. {"type": "ap"}.
+        :param limit: Page size. Defaults to Config.API_PAGE_LIMIT.
+        :param prefetch: Fetch the next page while the current one is consumed.
+        :return: Generator of device dicts, holding at most two pages in memory.
+        """
+        inventory_url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_INVENTORY.format(org_id)
+        self._log.info("Iterating over the inventory of Org %s", org_id, org_id=org_id, operation="iter_org_inventory")
+        return iter_x_pages(inventory_url, filters, limit, prefetch)
+
@@ -0,0 +1,339 @@
+"""
+Load runner driving OrgAPILibs scenarios at a target rate or concurrency.
+
+Example:
+    python -m libs.api_libs.org_load_runner --env local --scenario org_crud --rate 20 --duration 60 --ramp-up 10
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Config
+from libs.api_libs.constants import api_constants
+from libs.api_libs.org_api_libs import OrgAPILibs
+from utils.api_utils.api_metrics import percentile
+from utils.api_utils.local_mist_server import LocalMistAPIServer
+from utils.api_utils.request_scheduler import RequestScheduler
+from utils.log_utils import configure_logging, shutdown_logging
+
+
+def _create_org(org_libs, env, context):
+    context["org_id"] = org_libs._op_create_org(env)["id"]
+
+
+def _get_org(org_libs, env, context):
+    org_libs._get_org_details(env, context["org_id"])
+
+
+def _update_org(org_libs, env, context):
+    org_libs._op_update_org(env, context["org_id"], {"name": org_libs.create_random_org_name()})
+
+
+def _delete_org(org_libs, env, context):
+    if "org_id" in context:
+        org_libs._op_delete_org(env, context.pop("org_id"))
+
+
+def _get_self(org_libs, env, context):
+    org_libs._op_get_self(env)
+
+
+# Scenario name -> (steps, cleanup steps). Cleanup steps run even when a step failed,
+# so an aborted iteration doesn't leave orgs behind.
+SCENARIOS = {
+    "org_crud": ([("create_org", _create_org), ("update_org", _update_org)],
+                 [("delete_org", _delete_org)]),
+    "org_read": ([("create_org", _create_org), ("get_org", _get_org), ("get_org", _get_org), ("get_self", _get_self)],
+                 [("delete_org", _delete_org)]),
+    "self": ([("get_self", _get_self)], []),
+}
+
+
+class LoadStats:
+    """Thread-safe latency and error counters per operation, with a rolling reporting window."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.iterations = 0
+        self.failed_iterations = 0
+        self._latencies = {}
+        self._errors = {}
+        self._window_latencies = {}
+        self._window_errors = 0
+        self._window_iterations = 0
+        self._window_started_at = self.started_at
+
+    def record_operation(self, operation, seconds, ok):
+        with self._lock:
+            self._latencies.setdefault(operation, []).append(seconds)
+            self._window_latencies.setdefault(operation, []).append(seconds)
+            if not ok:
+                self._errors[operation] = self._errors.get(operation, 0) + 1
+                self._window_errors += 1
+
+    def record_iteration(self, ok):
+        with self._lock:
+            self.iterations += 1
+            self._window_iterations += 1
+            if not ok:
+                self.failed_iterations += 1
+
+    def take_window(self):
+        """Return the stats of the window since the previous call and start a new one."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(now - self._window_started_at, 1e-9)
+            latencies, self._window_latencies = self._window_latencies, {}
+            window = {
+                "elapsed": now - self.started_at,
+                "iterations_per_sec": self._window_iterations / elapsed,
+                "requests_per_sec": sum(len(values) for values in latencies.values()) / elapsed,
+                "errors": self._window_errors,
+                "operations": {operation: self._latency_stats(values) for operation, values in latencies.items()},
+            }
+            self._window_iterations = 0
+            self._window_errors = 0
+            self._window_started_at = now
+            return window
+
+    def summary(self):
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started_at, 1e-9)
+            requests = sum(len(values) for values in self._latencies.values())
+            operations = {}
+            for operation, values in self._latencies.items():
+                operations[operation] = self._latency_stats(values)
+                operations[operation]["errors"] = self._errors.get(operation, 0)
+            return {
+                "duration": round(elapsed, 2),
+                "iterations": self.iterations,
+                "failed_iterations": self.failed_iterations,
+                "requests": requests,
+                "iterations_per_sec": round(self.iterations / elapsed, 2),
+                "requests_per_sec": round(requests / elapsed, 2),
+                "operations": operations,
+            }
+
+    @staticmethod
+    def _latency_stats(values):
+        values = sorted(values)
+        stats = {"count": len(values)}
+        for pct in (50, 95, 99):
+            stats["p{}_ms".format(pct)] = round(percentile(values, pct) * 1000, 2)
+        return stats
+
+
+class OrgLoadRunner:
+    """
+    Runs a scenario of OrgAPILibs operations as a sustained workload.
+
+    Two modes:
+        rate: Open loop, `rate` scenario iterations are started per second (up to max_workers in flight).
+        concurrency: Closed loop, `concurrency` workers run iterations back to back.
+    The rate, or the number of active workers, grows linearly to its target over `ramp_up` seconds.
+
+    Args:
+        env: Target environment, a key of CONST_EXT_API_URLs
+        scenario: Key of SCENARIOS
+        rate: Target iterations per second. When None the runner uses the concurrency mode
+        concurrency: Number of workers in concurrency mode
+        duration: Seconds to run, ramp-up included
+        ramp_up: Seconds to reach the target rate or concurrency
+        max_workers: Maximum iterations in flight in rate mode
+        report_interval: Seconds between live reports
+        reporter: Callable receiving each live report line. Defaults to print
+        clock: Callable returning the current time in seconds. Defaults to time.monotonic
+        wait: Callable waiting up to the given seconds, returning True if the run was stopped meanwhile.
+            Defaults to waiting on the stop event
+    """
+
+    def __init__(self, env, scenario="org_crud", rate=None, concurrency=10, duration=60, ramp_up=0,
+                 max_workers=50, report_interval=5, reporter=print, clock=time.monotonic, wait=None):
+        if scenario not in SCENARIOS:
+            raise ValueError("Unknown scenario {}. Choose one of {}".format(scenario, ", ".join(SCENARIOS)))
+        self.env = env
+        self.steps, self.cleanup_steps = SCENARIOS[scenario]
+        self.rate = rate
+        self.concurrency = concurrency
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.max_workers = max_workers
+        self.report_interval = report_interval
+        self.reporter = reporter
+        self.org_libs = OrgAPILibs()
+        self.stats = LoadStats()
+        self._stop = threading.Event()
+        self._clock = clock
+        self._wait = wait or self._stop.wait
+
+    def run(self):
+        """
+        Run the workload until `duration` has elapsed.
+
+        Returns:
+            dict: Summary with throughput and per-operation latency percentiles and error counts
+        """
+        self.stats = LoadStats()
+        self._stop.clear()
+        reporter_thread = threading.Thread(target=self._report_loop, name="load-reporter", daemon=True)
+        reporter_thread.start()
+        try:
+            if self.rate:
+                self._run_rate_mode()
+            else:
+                self._run_concurrency_mode()
+        finally:
+            self._stop.set()
+            reporter_thread.join()
+        return self.stats.summary()
+
+    def stop(self):
+        """Ask a running workload to stop early."""
+        self._stop.set()
+
+    def run_iteration(self):
+        """Run the scenario steps once, then its cleanup steps. Returns True if every step succeeded."""
+        context = {}
+        ok = self._run_steps(self.steps, context)
+        ok = self._run_steps(self.cleanup_steps, context, always=True) and ok
+        self.stats.record_iteration(ok)
+        return ok
+
+    def _run_steps(self, steps, context, always=False):
+        ok = True
+        for name, step in steps:
+            if not ok and not always:
+                break
+            started_at = time.perf_counter()
+            try:
+                step(self.org_libs, self.env, context)
+                self.stats.record_operation(name, time.perf_counter() - started_at, True)
+            except Exception as e:
+                self.stats.record_operation(name, time.perf_counter() - started_at, False)
+                logging.warning("OrgLoadRunner():: %s failed: %s", name, e)
+                ok = False
+        return ok
+
+    def _iterations_due(self, elapsed):
+        """Number of iterations that should have started after `elapsed` seconds, ramp-up included."""
+        if elapsed < self.ramp_up:
+            return self.rate * elapsed * elapsed / (2.0 * self.ramp_up)
+        return self.rate * (self.ramp_up / 2.0 + elapsed - self.ramp_up)
+
+    def _start_time_of(self, iteration):
+        """Inverse of _iterations_due: seconds after start at which `iteration` is due."""
+        ramp_iterations = self.rate * self.ramp_up / 2.0
+        if iteration <= ramp_iterations:
+            return (2.0 * self.ramp_up * iteration / self.rate) ** 0.5
+        return (iteration - ramp_iterations) / self.rate + self.ramp_up
+
+    def _run_rate_mode(self):
+        in_flight = threading.BoundedSemaphore(self.max_workers)
+        started_at = self._clock()
+        deadline = started_at + self.duration
+        scheduled = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="load") as executor:
+            while not self._stop.is_set():
+                now = self._clock()
+                if now >= deadline:
+                    break
+                next_start = started_at + self._start_time_of(scheduled + 1)
+                if next_start > now:
+                    self._wait(min(next_start, deadline) - now)
+                    continue
+                if not in_flight.acquire(blocking=False):
+                    # Saturated: skip the iterations that are already late instead of bursting later.
+                    # At least the one due now, so the loop waits for the next slot instead of spinning.
+                    missed = max(int(self._iterations_due(now - started_at)) - scheduled, 1)
+                    logging.warning("OrgLoadRunner():: All %d workers busy, skipping %d iterations",
+                                    self.max_workers, missed)
+                    scheduled += missed
+                    continue
+                scheduled += 1
+                future = executor.submit(self.run_iteration)
+                future.add_done_callback(lambda _: in_flight.release())
+
+    def _run_concurrency_mode(self):
+        started_at = self._clock()
+        deadline = started_at + self.duration
+
+        def worker(index):
+            start_delay = self.ramp_up * index / self.concurrency
+            if self._wait(start_delay):
+                return
+            while not self._stop.is_set() and self._clock() < deadline:
+                self.run_iteration()
+
+        threads = [threading.Thread(target=worker, args=(index,), name="load-{}".format(index), daemon=True)
+                   for index in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _report_loop(self):
+        while not self._stop.wait(self.report_interval):
+            self.reporter(self.format_window(self.stats.take_window()))
+
+    @staticmethod
+    def format_window(window):
+        operations = "  ".join("{} p50={}ms p95={}ms".format(name, stats["p50_ms"], stats["p95_ms"])
+                               for name, stats in sorted(window["operations"].items()))
+        return "[{:7.1f}s] {:7.1f} it/s {:7.1f} req/s errors={} | {}".format(
+            window["elapsed"], window["iterations_per_sec"], window["requests_per_sec"], window["errors"], operations)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive OrgAPILibs scenarios as a sustained load.")
+    parser.add_argument("--env", default="production", help="production, or local to start the Mist API stand-in")
+    parser.add_argument("--scenario", default="org_crud", choices=sorted(SCENARIOS))
+    parser.add_argument("--rate", type=float, help="Target scenario iterations per second (open loop)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Workers when --rate is not given (closed loop)")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run, ramp-up included")
+    parser.add_argument("--ramp-up", type=float, default=0, help="Seconds to reach the target rate/concurrency")
+    parser.add_argument("--max-workers", type=int, default=50, help="Maximum iterations in flight in rate mode")
+    parser.add_argument("--report-interval", type=float, default=5)
+    parser.add_argument("--summary-file", help="Write the final summary as JSON to this file")
+    parser.add_argument("--api-rate-limit", type=float, default=Config.API_RATE_LIMIT_PER_HOUR,
+                        help="Client-side API quota in requests per hour, 0 to disable it. The default "
+                             "(API_RATE_LIMIT_PER_HOUR) holds production runs to about 1.4 requests/s after the burst")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--log-file", help="Write the structured logs to this file from a background thread "
+                                           "instead of the console")
+    args = parser.parse_args(argv)
+    if args.log_file:
+        configure_logging(args.log_file, args.log_level.upper())
+    else:
+        logging.basicConfig(level=args.log_level.upper())
+
+    local_server = None
+    if args.env == "local":
+        local_server = LocalMistAPIServer()
+        api_constants.CONST_EXT_API_URLs["local"] = local_server.start()
+        RequestScheduler.configure(rate_per_hour=0)
+    else:
+        RequestScheduler.configure(rate_per_hour=args.api_rate_limit)
+        if args.api_rate_limit:
+            logging.warning("API requests are limited to %.0f/hour (%.2f/s): pass --api-rate-limit 0 to lift "
+                            "the client-side quota", args.api_rate_limit, args.api_rate_limit / 3600.0)
+    try:
+        runner = OrgLoadRunner(args.env, args.scenario, args.rate, args.concurrency, args.duration, args.ramp_up,
+                               args.max_workers, args.report_interval)
+        summary = runner.run()
+    finally:
+        if local_server is not None:
+            local_server.stop()
+        shutdown_logging()
+
+    print(json.dumps(summary, indent=2))
+    if args.summary_file:
+        with open(args.summary_file, "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+    return 0 if summary["failed_iterations"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
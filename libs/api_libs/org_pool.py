@@ -0,0 +1,157 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from libs.api_libs.org_api_libs import OrgAPILibs
+from libs.api_libs.payload_factory import PayloadFactory
+from libs.api_libs.todo_site_api_libs import SiteAPILibs
+from utils.log_utils import get_logger, with_test_context
+from config.settings import Config
+
+
+class OrgPool(object):
+    """
+      Session-wide pool of pre-created orgs leased to tests that only need "an org to work in".
+
+      Orgs are created in the background as soon as the pool starts. A returned org is reset to its
+      baseline in the background (sites, sitegroups and network templates deleted, name and settings
+      restored) before it is leased again; an org that can't be reset is deleted and replaced.
+      An org that can't be created fails the next checkout with the cause, and its creation is retried.
+      Every org is deleted when the pool closes.
+    """
+
+    # Server-managed fields left out of the baseline payloads.
+    VOLATILE_FIELDS = ("id", "org_id", "created_time", "modified_time")
+
+    def __init__(self, env, size=None, max_workers=None):
+        """
+        :param size: Number of orgs. Defaults to Config.ORG_POOL_SIZE.
+        :param max_workers: Workers used for the background creates, resets and deletes. Defaults to size.
+        """
+        self.env = env
+        self.size = size or Config.ORG_POOL_SIZE
+        self.org_libs = OrgAPILibs()
+        self.site_libs = SiteAPILibs()
+        self._idle = queue.Queue()
+        self._baselines = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or self.size, thread_name_prefix="org-pool")
+        self._closed = False
+        self._log = get_logger(__name__, self.__class__.__name__)
+
+    def start(self):
+        """Start creating the orgs in the background and return immediately."""
+        for _ in range(self.size):
+            self._executor.submit(with_test_context(self._add_new_org))
+        return self
+
+    def checkout(self, timeout=None):
+        """
+        Lease an org, waiting up to timeout seconds for one to be created or reset.
+        :return: The org details.
+        :raises RuntimeError: When the creation of a pooled org failed. It is retried in the background.
+        """
+        if self._closed:
+            raise RuntimeError("OrgPool is closed")
+        try:
+            org = self._idle.get(timeout=timeout or Config.TIMEOUT * 4)
+        except queue.Empty:
+            raise TimeoutError("No org available in the OrgPool after {}s".format(timeout or Config.TIMEOUT * 4))
+        if isinstance(org, Exception):
+            # Report why this slot is empty instead of shrinking the pool, and refill it for a later checkout.
+            self._executor.submit(with_test_context(self._add_new_org))
+            raise RuntimeError("Failed to create a pooled Org: {}".format(org)) from org
+        self._log.info("Leased Org %s", org['id'], org_id=org['id'], operation="checkout")
+        return org
+
+    def checkin(self, org):
+        """
+        Return a leased org. It is reset to its baseline in the background before being leased again.
+        """
+        if self._closed:
+            self._delete(org['id'])
+            return
+        # The reset is logged under the test returning the org.
+        self._executor.submit(with_test_context(self._reset_or_replace), org['id'])
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Context manager checking an org out and back in."""
+        org = self.checkout(timeout)
+        try:
+            yield org
+        finally:
+            self.checkin(org)
+
+    def close(self):
+        """Wait for the background work, then delete every org of the pool."""
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            org_ids = list(self._baselines)
+            self._baselines.clear()
+        result = self.org_libs.delete_orgs(self.env, org_ids)
+        self._log.info("Deleted %s pooled Orgs, %s failed",
+                       len(result.succeeded), len(result.failed), operation="close")
+        return result
+
+    def _add_new_org(self):
+        try:
+            org = self.org_libs._op_create_org(self.env)
+        except Exception as e:
+            self._log.error("Failed to create a pooled Org: %s", e, operation="_add_new_org")
+            self._idle.put(e)
+            return
+        try:
+            baseline = {
+                "org": {key: org[key] for key in PayloadFactory.template("org")
+                        if key in org and key not in self.VOLATILE_FIELDS},
+                "setting": {key: value for key, value in self.org_libs._get_org_setting(self.env, org['id']).items()
+                            if key not in self.VOLATILE_FIELDS},
+            }
+        except Exception as e:
+            # close() only deletes the orgs with a baseline: don't leave this one behind.
+            self._log.error("Failed to read the baseline of pooled Org %s: %s",
+                            org['id'], e, org_id=org['id'], operation="_add_new_org")
+            self._delete(org['id'])
+            self._idle.put(e)
+            return
+        with self._lock:
+            self._baselines[org['id']] = baseline
+        self._idle.put(org)
+
+    def _reset_or_replace(self, org_id):
+        try:
+            self._idle.put(self._reset(org_id))
+        except Exception as e:
+            self._log.warning("Failed to reset Org %s (%s), replacing it",
+                              org_id, e, org_id=org_id, operation="_reset_or_replace")
+            self._delete(org_id)
+            if not self._closed:
+                self._add_new_org()
+
+    def _reset(self, org_id):
+        """Delete what the lease created and restore the org fields and settings."""
+        with self._lock:
+            baseline = self._baselines[org_id]
+        site_ids = [site['id'] for site in self.site_libs.iter_sites(self.env, org_id)]
+        self._raise_failures(self.site_libs.delete_sites(self.env, site_ids))
+        self._raise_failures(self.org_libs.delete_sitegroups(
+            self.env, org_id, [sitegroup['id'] for sitegroup in self.org_libs.iter_sitegroups(self.env, org_id)]))
+        self._raise_failures(self.org_libs.delete_networktemplates(
+            self.env, org_id, [template['id'] for template in self.org_libs.iter_networktemplates(self.env, org_id)]))
+        self.org_libs._op_update_org_setting(self.env, org_id, baseline["setting"])
+        return self.org_libs._op_update_org(self.env, org_id, baseline["org"])
+
+    @staticmethod
+    def _raise_failures(result):
+        if result.failed:
+            raise result.failed[0][1]
+
+    def _delete(self, org_id):
+        with self._lock:
+            self._baselines.pop(org_id, None)
+        try:
+            self.org_libs._op_delete_org(self.env, org_id)
+        except Exception as e:
+            self._log.error("Failed to delete pooled Org %s: %s", org_id, e, org_id=org_id, operation="_delete")
@@ -0,0 +1,131 @@
+import copy
+import itertools
+import json
+import os
+import threading
+from datetime import datetime
+from types import MappingProxyType
+
+
+class PayloadFactory(object):
+    """
+      Org and site payloads built from the sample configs, which are read from disk once per process.
+
+      Payloads are copies of a read-only template: scalar fields are shared, only the nested lists and
+      dicts are copied, so a payload can be modified freely without touching the template.
+      Generated names are unique across threads (counter), processes (PID) and xdist workers (worker ID),
+      and keep the "Automation <Kind> <YYYY-MM-DD HH:MM" prefix matched by the stale org sweeper.
+    """
+
+    TEMPLATE_FILES = {"org": "sample_org_config.json", "site": "sample_site_config.json"}
+    NAME_PREFIXES = {"org": "Automation Org ", "site": "Automation Site "}
+
+    # Valid values cycled through by the batch generators, so bulk payloads aren't all identical.
+    ORG_SESSION_EXPIRIES = (1440, 60, 480, 10080)
+    SITE_LOCATIONS = (
+        {"address": "1601 S. Deanza Blvd., Cupertino, CA, 95014", "country_code": "US",
+         "latlng": {"lat": 37.295833, "lng": -122.032946}, "timezone": "America/Los_Angeles"},
+        {"address": "350 5th Ave, New York, NY 10118", "country_code": "US",
+         "latlng": {"lat": 40.748441, "lng": -73.985664}, "timezone": "America/New_York"},
+        {"address": "Bahnhofplatz, 8001 Zurich", "country_code": "CH",
+         "latlng": {"lat": 47.378177, "lng": 8.540192}, "timezone": "Europe/Zurich"},
+        {"address": "Whitefield, Bengaluru, Karnataka 560066", "country_code": "IN",
+         "latlng": {"lat": 12.969800, "lng": 77.749986}, "timezone": "Asia/Kolkata"},
+        {"address": "2-7-2 Marunouchi, Chiyoda-ku, Tokyo 100-7090", "country_code": "JP",
+         "latlng": {"lat": 35.679682, "lng": 139.764618}, "timezone": "Asia/Tokyo"},
+    )
+
+    _templates = {}
+    _mutable_keys = {}
+    _lock = threading.Lock()
+    _counter = itertools.count(1)
+
+    @classmethod
+    def template(cls, kind):
+        """
+        :param kind: "org" or "site".
+        :return: Read-only view of the sample config of that kind.
+        """
+        template = cls._templates.get(kind)
+        if template is None:
+            with cls._lock:
+                if kind not in cls._templates:
+                    config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "configs",
+                                               cls.TEMPLATE_FILES[kind])
+                    with open(config_file) as default_payload:
+                        data = json.load(default_payload)
+                    cls._mutable_keys[kind] = tuple(key for key, value in data.items()
+                                                    if isinstance(value, (dict, list)))
+                    cls._templates[kind] = MappingProxyType(data)
+                template = cls._templates[kind]
+        return template
+
+    @classmethod
+    def payload(cls, kind, overrides=None):
+        """
+        :param overrides: Fields replacing the ones of the template.
+        :return: A new payload dict, the sample config of that kind updated with overrides.
+        """
+        template = cls.template(kind)
+        payload = dict(template)
+        for key in cls._mutable_keys[kind]:
+            if overrides is None or key not in overrides:
+                payload[key] = copy.deepcopy(template[key])
+        if overrides:
+            payload.update(overrides)
+        return payload
+
+    @classmethod
+    def unique_suffix(cls):
+        """
+        :return: "<xdist worker>-<pid>-<counter>", e.g. "gw1-4242-17", unique within a test session.
+        """
+        return "{}-{}-{}".format(os.getenv("PYTEST_XDIST_WORKER", "main"), os.getpid(), next(cls._counter))
+
+    @classmethod
+    def name(cls, kind):
+        """
+        :return: A unique automation name, e.g. "Automation Org 2024-05-01 10:42:07 gw1-4242-17".
+        """
+        return "{}{} {}".format(cls.NAME_PREFIXES[kind], datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                cls.unique_suffix())
+
+    @classmethod
+    def org_payload(cls, overrides=None):
+        """Org payload with a unique name, unless overrides sets one."""
+        return cls.payload("org", dict({"name": cls.name("org")}, **(overrides or {})))
+
+    @classmethod
+    def site_payload(cls, overrides=None):
+        """Site payload with a unique name, unless overrides sets one."""
+        return cls.payload("site", dict({"name": cls.name("site")}, **(overrides or {})))
+
+    @classmethod
+    def org_payloads(cls, count, overrides=None, vary=True):
+        """
+        :param overrides: Fields set on every payload.
+        :param vary: Cycle the session expiry through ORG_SESSION_EXPIRIES.
+        :return: List of count org payloads with unique names.
+        """
+        payloads = []
+        for index in range(count):
+            fields = {}
+            if vary:
+                fields["session_expiry"] = cls.ORG_SESSION_EXPIRIES[index % len(cls.ORG_SESSION_EXPIRIES)]
+            fields.update(overrides or {})
+            payloads.append(cls.org_payload(fields))
+        return payloads
+
+    @classmethod
+    def site_payloads(cls, count, overrides=None, vary=True):
+        """
+        :param overrides: Fields set on every payload.
+        :param vary: Cycle the address, coordinates and timezone through SITE_LOCATIONS.
+        :return: List of count site payloads with unique names.
+        """
+        payloads = []
+        for index in range(count):
+            fields = copy.deepcopy(cls.SITE_LOCATIONS[index % len(cls.SITE_LOCATIONS)]) if vary else {}
+            fields.update(overrides or {})
+            payloads.append(cls.site_payload(fields))
+        return payloads
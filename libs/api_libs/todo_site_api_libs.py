@@ -1 +1,192 @@
-# TODO - Candidate to add Site API Libs when working on the assignment.
\ No newline at end of file
+from libs.api_libs.constants import api_constants
+from libs.api_libs.payload_factory import PayloadFactory
+from utils.api_utils.api_utils import CommonAPIUtils
+from utils.api_utils.bulk_utils import run_bulk
+from utils.api_utils.pagination import iter_x_pages
+from utils.log_utils import get_logger
+
+
+class GenericSiteLibs(object):
+    """
+        Class that holds the Generic Functions for the Site Set Up.
+    """
+
+    AUTOMATION_SITE_PREFIX = PayloadFactory.NAME_PREFIXES["site"]
+
+    @property
+    def _log(self):
+        """Structured logger of the class, see utils.log_utils."""
+        return get_logger(__name__, self.__class__.__name__)
+
+    def create_random_site_name(self):
+        """
+        Creating the Site Name, unique across threads, processes and xdist workers. See PayloadFactory.name.
+        :return: The Site Name.
+        """
+        return PayloadFactory.name("site")
+
+    def get_sample_site_config(self):
+        """
+        :return: A copy of configs/sample_site_config.json, which is only read once.
+        """
+        return PayloadFactory.payload("site")
+
+
+class SiteIndex(object):
+    """
+        Sites of an org indexed by ID and by name, for constant-time lookups.
+    """
+
+    def __init__(self, sites):
+        self.by_id = {}
+        self.by_name = {}
+        for site in sites:
+            self.by_id[site["id"]] = site
+            self.by_name.setdefault(site["name"], []).append(site)
+
+    def __contains__(self, site_id):
+        return site_id in self.by_id
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def get(self, site_id):
+        return self.by_id.get(site_id)
+
+    def get_by_name(self, name):
+        """
+        :return: The sites with this name (names aren't unique), empty list if none.
+        """
+        return list(self.by_name.get(name, []))
+
+    def has_name(self, name):
+        return name in self.by_name
+
+
+class SiteAPILibs(GenericSiteLibs):
+    """
+      Class that holds the Site Setup Related functionalities.
+      This class inherits the GenericSiteLibs.
+    """
+
+    def __init__(self):
+        """
+        SiteAPILibs():: Having __init__ method in here for initializing any attributes if needed"
+        """
+
+    def _op_create_site(self, env, org_id, site_payload=None):
+        self._log.info("Trying to create a Site in Org %s", org_id, org_id=org_id, operation="_op_create_site")
+        create_site_url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_SITES.format(org_id)
+        create_site_data = super(SiteAPILibs, self).get_sample_site_config()
+        if site_payload is not None:
+            create_site_data.update(site_payload)
+        else:
+            create_site_data['name'] = super(SiteAPILibs, self).create_random_site_name()
+
+        self._log.info("Site name is set as %s ", create_site_data['name'], operation="_op_create_site")
+        response = CommonAPIUtils().post_request_with_status_code_validation(create_site_url, create_site_data, 200)
+        self._log.info("Site has been created Successfully", org_id=org_id, operation="_op_create_site")
+        return response
+
+    def _get_site_details(self, env, site_id):
+        self._log.info("Trying to GET the site details for Site with ID %s", site_id, operation="_get_site_details")
+        site_details_url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_SITE_DETAILS.format(site_id)
+        return CommonAPIUtils().get_request_with_status_code_validation(site_details_url, 200)
+
+    def _op_update_site(self, env, site_id, site_payload):
+        self._log.info("Trying to update the Site with ID %s", site_id, operation="_op_update_site")
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_SITE_DETAILS.format(site_id)
+        response = CommonAPIUtils().put_request_with_status_code_validation(url, site_payload, 200)
+        self._log.info("Site has been updated Successfully", operation="_op_update_site")
+        return response
+
+    def _op_delete_site(self, env, site_id):
+        self._log.info("Trying to delete the Site with ID %s", site_id, operation="_op_delete_site")
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_SITE_DETAILS.format(site_id)
+        CommonAPIUtils().delete_request_with_status_code_validation(url, 200)
+        self._log.info("Site has been deleted Successfully", operation="_op_delete_site")
+
+    def iter_sites(self, env, org_id, limit=None):
+        """
+        Iterate over the sites of an org, page by page.
+        :param limit: Page size. Defaults to Config.API_PAGE_LIMIT.
+        :return: Generator of site dicts.
+        """
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_SITES.format(org_id)
+        return iter_x_pages(url, limit=limit)
+
+    def get_list_of_sites(self, env, org_id):
+        self._log.info("Trying to GET the list of Sites of Org %s",
+                       org_id, org_id=org_id, operation="get_list_of_sites")
+        return list(self.iter_sites(env, org_id))
+
+    def get_site_index(self, env, org_id):
+        """
+        List the sites of an org once and index them.
+        :return: SiteIndex with lookups by ID and by name.
+        """
+        return SiteIndex(self.iter_sites(env, org_id))
+
+    def _is_site_present(self, env, org_id, site_id, site_index=None):
+        """
+        :param site_index: A SiteIndex to check against, e.g. to check many sites after a single listing.
+        """
+        self._log.info("Trying to check if Site %s is present in Org %s",
+                       site_id, org_id, org_id=org_id, operation="_is_site_present")
+        site_index = site_index if site_index is not None else self.get_site_index(env, org_id)
+        is_present = site_id in site_index
+        self._log.info("Site %s %s", site_id, "exists" if is_present else "doesnt exist", operation="_is_site_present")
+        return is_present
+
+    def create_sites(self, env, org_id, count=None, site_payloads=None, max_workers=None):
+        """
+        Create many sites in an org concurrently over a worker pool.
+        :param count: Number of sites to create from generated payloads. Ignored if site_payloads is given.
+        :param site_payloads: List of site payloads, one site per payload.
+        :param max_workers: Worker count. Defaults to Config.BULK_API_WORKERS.
+        :return: BulkResult with (payload, created_site) successes and (payload, exception) failures.
+        """
+        if site_payloads is None:
+            if count is None:
+                raise ValueError("Either count or site_payloads must be given")
+            site_payloads = PayloadFactory.site_payloads(count)
+        self._log.info("Trying to create %s Sites in Org %s",
+                       len(site_payloads), org_id, org_id=org_id, operation="create_sites")
+        result = run_bulk(lambda payload: self._op_create_site(env, org_id, payload), site_payloads, max_workers)
+        self._log_bulk_result(self.__class__.create_sites.__name__, "created", result)
+        return result
+
+    def update_sites(self, env, site_payloads, max_workers=None):
+        """
+        Update many sites concurrently over a worker pool.
+        :param site_payloads: Mapping of site ID -> payload.
+        :param max_workers: Worker count. Defaults to Config.BULK_API_WORKERS.
+        :return: BulkResult with (site_id, updated_site) successes and (site_id, exception) failures.
+        """
+        self._log.info("Trying to update %s Sites", len(site_payloads), operation="update_sites")
+        result = run_bulk(lambda site_id: self._op_update_site(env, site_id, site_payloads[site_id]),
+                          list(site_payloads), max_workers)
+        self._log_bulk_result(self.__class__.update_sites.__name__, "updated", result)
+        return result
+
+    def delete_sites(self, env, site_ids, max_workers=None):
+        """
+        Delete many sites concurrently over a worker pool.
+        :param site_ids: IDs of the sites to delete.
+        :param max_workers: Worker count. Defaults to Config.BULK_API_WORKERS.
+        :return: BulkResult with (site_id, None) successes and (site_id, exception) failures.
+        """
+        self._log.info("Trying to delete %s Sites", len(site_ids), operation="delete_sites")
+        result = run_bulk(lambda site_id: self._op_delete_site(env, site_id), site_ids, max_workers)
+        self._log_bulk_result(self.__class__.delete_sites.__name__, "deleted", result)
+        return result
+
+    def _log_bulk_result(self, method_name, action, result):
+        self._log.info("%s Sites %s, %s failed", len(result.succeeded), action, len(result.failed),
+                       operation=method_name)
+        for item, error in result.failed:
+            self._log.error("Site %s failed: %s", item if isinstance(item, str) else (item or {}).get("name"), error,
+                            operation=method_name)
@@ -0,0 +1,257 @@
+import time
+from libs.api_libs.org_api_libs import OrgAPILibs
+from libs.api_libs.todo_site_api_libs import SiteAPILibs
+from utils.api_utils.bulk_utils import run_bulk
+from utils.log_utils import get_logger
+
+
+class TopologyProvisionError(Exception):
+    """
+        Raised by TopologyProvisioner.provision when nodes of a level failed to be created.
+    """
+
+    def __init__(self, failed):
+        self.failed = failed
+        super().__init__("Failed to provision {} node(s): {}".format(
+            len(failed), "; ".join("{}: {}".format(node.key, error) for node, error in failed[:5])))
+
+
+class TopologyNode(object):
+    """
+        One object to create: the org, its settings, a sitegroup, a network template or a site.
+        :param key: Unique key of the node, e.g. "sitegroup:<name>".
+        :param kind: org, setting, sitegroup, networktemplate or site.
+        :param payload: API payload. Site payloads reference sitegroups and templates by name.
+        :param depends_on: Keys of the nodes that must exist before this one is created.
+    """
+
+    def __init__(self, key, kind, payload, depends_on=()):
+        self.key = key
+        self.kind = kind
+        self.payload = payload
+        self.depends_on = tuple(depends_on)
+
+    def __repr__(self):
+        return "TopologyNode({})".format(self.key)
+
+
+class TopologySpec(object):
+    """
+        Declarative description of an org topology: org -> settings, sitegroups, network templates -> sites.
+        :param org: Org payload, None for a random automation org name.
+        :param settings: Org settings payload, None to keep the defaults.
+        :param sitegroups: List of sitegroup payloads.
+        :param networktemplates: List of network template payloads.
+        :param sites: List of site payloads. Their "sitegroups" (list of names) and "networktemplate" (name)
+                      fields are replaced by the IDs of those objects when the site is created.
+    """
+
+    def __init__(self, org=None, settings=None, sitegroups=(), networktemplates=(), sites=()):
+        self.org = org
+        self.settings = settings
+        self.sitegroups = list(sitegroups)
+        self.networktemplates = list(networktemplates)
+        self.sites = list(sites)
+
+    @classmethod
+    def generate(cls, sitegroups=0, sites=0, networktemplates=0, settings=None):
+        """
+        Spec with generated names, the sites spread round-robin over the sitegroups and templates.
+        """
+        sitegroup_names = ["Automation Sitegroup {}".format(index) for index in range(1, sitegroups + 1)]
+        template_names = ["Automation Template {}".format(index) for index in range(1, networktemplates + 1)]
+        site_libs = SiteAPILibs()
+        site_payloads = []
+        for index in range(sites):
+            site = {"name": site_libs.create_random_site_name()}
+            if sitegroup_names:
+                site["sitegroups"] = [sitegroup_names[index % len(sitegroup_names)]]
+            if template_names:
+                site["networktemplate"] = template_names[index % len(template_names)]
+            site_payloads.append(site)
+        return cls(settings=settings, sitegroups=[{"name": name} for name in sitegroup_names],
+                   networktemplates=[{"name": name} for name in template_names], sites=site_payloads)
+
+    def nodes(self):
+        nodes = [TopologyNode("org", "org", self.org)]
+        if self.settings:
+            nodes.append(TopologyNode("setting", "setting", self.settings, ["org"]))
+        nodes.extend(TopologyNode("sitegroup:" + sitegroup["name"], "sitegroup", sitegroup, ["org"])
+                     for sitegroup in self.sitegroups)
+        nodes.extend(TopologyNode("networktemplate:" + template["name"], "networktemplate", template, ["org"])
+                     for template in self.networktemplates)
+        for site in self.sites:
+            depends_on = ["org"] + ["sitegroup:" + name for name in site.get("sitegroups", [])]
+            if site.get("networktemplate"):
+                depends_on.append("networktemplate:" + site["networktemplate"])
+            nodes.append(TopologyNode("site:" + site["name"], "site", site, depends_on))
+        return nodes
+
+
+def resolve_levels(nodes):
+    """
+    Group the nodes of a DAG into levels: every node only depends on nodes of earlier levels,
+    so all the nodes of a level can be created concurrently.
+    :return: List of levels, each a list of TopologyNode.
+    :raises ValueError: On duplicate keys, unknown dependencies or cycles.
+    """
+    nodes_by_key = {}
+    for node in nodes:
+        if node.key in nodes_by_key:
+            raise ValueError("Duplicate topology node {}".format(node.key))
+        nodes_by_key[node.key] = node
+    pending = {}
+    dependents = {key: [] for key in nodes_by_key}
+    for node in nodes:
+        for dependency in node.depends_on:
+            if dependency not in nodes_by_key:
+                raise ValueError("{} depends on unknown node {}".format(node.key, dependency))
+            dependents[dependency].append(node.key)
+        pending[node.key] = len(set(node.depends_on))
+
+    levels = []
+    ready = [node.key for node in nodes if pending[node.key] == 0]
+    resolved = 0
+    while ready:
+        levels.append([nodes_by_key[key] for key in ready])
+        resolved += len(ready)
+        next_ready = []
+        for key in ready:
+            for dependent in dependents[key]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    next_ready.append(dependent)
+        ready = list(dict.fromkeys(next_ready))
+    if resolved != len(nodes_by_key):
+        cyclic = sorted(key for key, count in pending.items() if count > 0)
+        raise ValueError("Topology has a dependency cycle between {}".format(", ".join(cyclic)))
+    return levels
+
+
+class Topology(object):
+    """
+        Objects created by TopologyProvisioner.provision, by node key, and the levels they were created in.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.levels = []
+        self.level_seconds = []
+
+    @property
+    def org(self):
+        return self.objects.get("org")
+
+    @property
+    def org_id(self):
+        return self.org["id"] if self.org else None
+
+    def _of_kind(self, kind):
+        prefix = kind + ":"
+        return {key[len(prefix):]: obj for key, obj in self.objects.items() if key.startswith(prefix)}
+
+    @property
+    def sitegroups(self):
+        """Created sitegroups by name."""
+        return self._of_kind("sitegroup")
+
+    @property
+    def networktemplates(self):
+        """Created network templates by name."""
+        return self._of_kind("networktemplate")
+
+    @property
+    def sites(self):
+        """Created sites by name."""
+        return self._of_kind("site")
+
+
+class TopologyProvisioner(object):
+    """
+      Provisions a TopologySpec level by level, each level concurrently over a bounded worker pool,
+      and tears it down in reverse order.
+    """
+
+    def __init__(self, env, max_workers=None):
+        """
+        :param max_workers: Worker count per level. Defaults to Config.BULK_API_WORKERS.
+        """
+        self.env = env
+        self.max_workers = max_workers
+        self.org_libs = OrgAPILibs()
+        self.site_libs = SiteAPILibs()
+        self._log = get_logger(__name__, self.__class__.__name__)
+
+    def provision(self, spec, rollback_on_failure=True):
+        """
+        Create every object of the spec.
+        :param rollback_on_failure: Tear down what was created when a level fails.
+        :return: Topology.
+        :raises TopologyProvisionError: With the failed nodes of the first level that failed.
+        """
+        topology = Topology()
+        for depth, level in enumerate(resolve_levels(spec.nodes())):
+            started_at = time.monotonic()
+            result = run_bulk(lambda node: self._create(node, topology), level, self.max_workers)
+            topology.level_seconds.append(time.monotonic() - started_at)
+            topology.levels.append([node for node, _ in result.succeeded])
+            for node, created in result.succeeded:
+                topology.objects[node.key] = created
+            self._log.info("Level %s: %s objects created in %.2fs, %s failed", depth, len(result.succeeded),
+                           topology.level_seconds[-1], len(result.failed), operation="provision")
+            if result.failed:
+                if rollback_on_failure:
+                    self.teardown(topology)
+                raise TopologyProvisionError(result.failed)
+        return topology
+
+    def teardown(self, topology):
+        """
+        Delete the objects of a topology, level by level in reverse creation order, each level concurrently.
+        Failures don't stop the teardown.
+        :return: List of (node, exception) for the objects that couldn't be deleted.
+        """
+        failed = []
+        for level in reversed(topology.levels):
+            # Org settings go away with the org.
+            nodes = [node for node in level if node.kind != "setting"]
+            result = run_bulk(lambda node: self._delete(node, topology), nodes, self.max_workers)
+            for node, _ in result.succeeded:
+                topology.objects.pop(node.key, None)
+            failed.extend(result.failed)
+        topology.levels = []
+        self._log.info("Topology torn down, %s deletes failed", len(failed), operation="teardown")
+        return failed
+
+    def _create(self, node, topology):
+        if node.kind == "org":
+            return self.org_libs._op_create_org(self.env, node.payload)
+        if node.kind == "setting":
+            return self.org_libs._op_update_org_setting(self.env, topology.org_id, node.payload)
+        if node.kind == "sitegroup":
+            return self.org_libs._op_create_sitegroup(self.env, topology.org_id, node.payload)
+        if node.kind == "networktemplate":
+            return self.org_libs._op_create_networktemplate(self.env, topology.org_id, node.payload)
+        if node.kind == "site":
+            payload = dict(node.payload)
+            sitegroup_names = payload.pop("sitegroups", [])
+            template_name = payload.pop("networktemplate", None)
+            if sitegroup_names:
+                payload["sitegroup_ids"] = [topology.objects["sitegroup:" + name]["id"] for name in sitegroup_names]
+            if template_name:
+                payload["networktemplate_id"] = topology.objects["networktemplate:" + template_name]["id"]
+            return self.site_libs._op_create_site(self.env, topology.org_id, payload)
+        raise ValueError("Unknown topology node kind {}".format(node.kind))
+
+    def _delete(self, node, topology):
+        object_id = topology.objects[node.key]["id"]
+        if node.kind == "org":
+            self.org_libs._op_delete_org(self.env, object_id)
+        elif node.kind == "sitegroup":
+            self.org_libs._op_delete_sitegroup(self.env, topology.org_id, object_id)
+        elif node.kind == "networktemplate":
+            self.org_libs._op_delete_networktemplate(self.env, topology.org_id, object_id)
+        elif node.kind == "site":
+            self.site_libs._op_delete_site(self.env, object_id)
+        else:
+            raise ValueError("Unknown topology node kind {}".format(node.kind))
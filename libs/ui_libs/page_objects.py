@@ -0,0 +1,107 @@
+from urllib.parse import urljoin
+from selenium.webdriver.common.by import By
+from config.settings import Config
+
+
+class PageObject:
+    """
+    Declarative description of a page: its URL, relative to Config.UI_BASE_URL, and its locators.
+    """
+
+    def __init__(self, name, path, locators):
+        """
+        :param name: Registry key of the page.
+        :param path: URL of the page relative to Config.UI_BASE_URL.
+        :param locators: Mapping of element name -> (By, value).
+        """
+        self.name = name
+        self.path = path
+        self.locators = dict(locators)
+
+    @property
+    def url(self):
+        return urljoin(Config.UI_BASE_URL.rstrip("/") + "/", self.path)
+
+    def __getitem__(self, element_name):
+        try:
+            return self.locators[element_name]
+        except KeyError:
+            raise KeyError("Page {} has no locator named {}".format(self.name, element_name)) from None
+
+    def __repr__(self):
+        return "PageObject({}, {})".format(self.name, self.url)
+
+
+class PageRegistry:
+    """
+    Registry of every PageObject, so locators are defined once and shared by all the UI libs.
+    """
+
+    _pages = {}
+
+    @classmethod
+    def register(cls, page):
+        if page.name in cls._pages:
+            raise ValueError("Page {} is already registered".format(page.name))
+        cls._pages[page.name] = page
+        return page
+
+    @classmethod
+    def get(cls, name):
+        try:
+            return cls._pages[name]
+        except KeyError:
+            raise KeyError("Unknown page {}. Registered pages: {}".format(name, ", ".join(sorted(cls._pages)))) from None
+
+    @classmethod
+    def all(cls):
+        return dict(cls._pages)
+
+    @classmethod
+    def find_locator_name(cls, locator):
+        """
+        Reverse lookup of a (By, value) locator, e.g. to label locator timings.
+        :return: "<page>.<element>", or None if the locator isn't registered.
+        """
+        for page in cls._pages.values():
+            for element_name, page_locator in page.locators.items():
+                if tuple(page_locator) == tuple(locator):
+                    return "{}.{}".format(page.name, element_name)
+        return None
+
+    @classmethod
+    def find_page_name(cls, url):
+        """
+        Reverse lookup of a page URL, e.g. to label page-load metrics.
+        :return: The page name, or None if no registered page has this URL.
+        """
+        for page in cls._pages.values():
+            if page.url == url:
+                return page.name
+        return None
+
+
+CREATE_ACCOUNT_PAGE = PageRegistry.register(PageObject(
+    "create_account",
+    "signin.html#!signup/register",
+    {
+        "first_name": (By.NAME, "first_name"),
+        "last_name": (By.NAME, "last_name"),
+        "email": (By.NAME, "email"),
+        "password": (By.NAME, "password"),
+        "confirm_password": (By.NAME, "password2"),
+        "terms_checkbox": (By.CSS_SELECTOR, "input[type='checkbox']"),
+        "create_account_button": (By.XPATH, "//button[contains(normalize-space(.), 'Create Account')]"),
+    },
+))
+
+SIGNIN_PAGE = PageRegistry.register(PageObject(
+    "signin",
+    "signin.html",
+    {
+        "email": (By.NAME, "email"),
+        "next_button": (By.XPATH, "//button[contains(normalize-space(.), 'Next')]"),
+        "password": (By.NAME, "password"),
+        "signin_button": (By.XPATH, "//button[contains(normalize-space(.), 'Sign In')]"),
+    },
+))
@@ -0,0 +1,31 @@
+from urllib.parse import urlsplit
+from utils.ui_utils.ui_utils import UIUtils
+from libs.ui_libs.page_objects import SIGNIN_PAGE
+from config.settings import Config
+from selenium import webdriver
+
+class SigninLibs:
+    page = SIGNIN_PAGE
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.ui_utils = UIUtils(driver)
+
+    def navigate_to_signin_page(self):
+        """Navigate to the sign in page"""
+        self.ui_utils.navigate_to(self.page.url)
+
+    def sign_in(self, username=None, password=None):
+        """
+        Sign in through the UI, Config.USERNAME / Config.PASSWORD by default, and wait for the portal to load.
+        The password field is shown after the email step on the Mist sign in page.
+        """
+        self.navigate_to_signin_page()
+        self.ui_utils.send_keys(*self.page["email"], username or Config.USERNAME)
+        if not self.ui_utils.is_element_visible(*self.page["password"], timeout=1):
+            self.ui_utils.click_element(*self.page["next_button"])
+        self.ui_utils.send_keys(*self.page["password"], password or Config.PASSWORD)
+        self.ui_utils.click_element(*self.page["signin_button"])
+        self.ui_utils.wait_until(lambda driver: urlsplit(driver.current_url).path != urlsplit(self.page.url).path,
+                                 message="Still on the sign in page after submitting the credentials")
+        self.ui_utils.wait_for_page_ready()
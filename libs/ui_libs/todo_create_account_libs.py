@@ -1,13 +1,44 @@
 from utils.ui_utils.ui_utils import UIUtils
+from utils.ui_utils import batch_utils
+from libs.ui_libs.page_objects import CREATE_ACCOUNT_PAGE
 from selenium import webdriver
 
 class CreateAccountLibs:
+    page = CREATE_ACCOUNT_PAGE
+
     def __init__(self, driver: webdriver.Chrome):
         self.driver = driver
         self.ui_utils = UIUtils(driver)
 
     def navigate_to_create_account_page(self):
         """Navigate to the create account page"""
-        self.ui_utils.navigate_to("https://manage.ac2.mist.com/signin.html#!signup/register")
+        self.ui_utils.navigate_to(self.page.url)
+
+    def fill_create_account_form(self, first_name, last_name, email, password, accept_terms=True):
+        """
+        Fill the whole Create Account form in a single browser round-trip.
+
+        Returns:
+            List[dict]: The batch results, one per field
+        """
+        self.ui_utils.get_cached_element(*self.page["first_name"])
+        actions = [
+            batch_utils.fill(*self.page["first_name"], first_name),
+            batch_utils.fill(*self.page["last_name"], last_name),
+            batch_utils.fill(*self.page["email"], email),
+            batch_utils.fill(*self.page["password"], password),
+            batch_utils.fill(*self.page["confirm_password"], password),
+        ]
+        if accept_terms:
+            actions.append(batch_utils.check(*self.page["terms_checkbox"]))
+        return self.ui_utils.run_batch(actions)
+
+    def get_create_account_form_values(self):
+        """Read back the values of the form inputs in a single round-trip."""
+        locators = [self.page["first_name"], self.page["last_name"], self.page["email"]]
+        results = self.ui_utils.run_batch([batch_utils.attribute(*locator, "value") for locator in locators])
+        return [result["value"] for result in results]
 
-    # TODO - Candidate to add libs for Create Account functionalities when working on the assignment.
\ No newline at end of file
+    def click_create_account(self):
+        """Click the Create Account button with a native click, so the page sees a real user event."""
+        self.ui_utils.click_element(*self.page["create_account_button"])
@@ -0,0 +1,160 @@
+import datetime
+import json
+import pytest
+import requests
+from utils.api_utils.api_metrics import LatencyRecorder, percentile
+from utils.api_utils.endpoints import endpoint_template
+
+ORG_URL = "https://api.mist.com/api/v1/orgs/6f4bf402-45f9-4a34-9dd0-b0e3b2a3a0b5"
+
+
+@pytest.fixture(autouse=True)
+def recorder(monkeypatch):
+    """LatencyRecorder with no samples; the ones of the session are restored after the test"""
+    monkeypatch.setattr(LatencyRecorder, "_samples", {})
+    return LatencyRecorder
+
+
+def add_samples(endpoint, totals_ms, **fields):
+    """Record one fixed sample per total, in milliseconds, the other timings being a fraction of it."""
+    for total_ms in totals_ms:
+        sample = {"total": total_ms / 1000.0, "ttfb": total_ms / 2000.0, "connect": 0.0, "tls": 0.0,
+                  "new_connection": False, "request_bytes": 0, "response_bytes": 0, "failed": False}
+        sample.update(fields)
+        LatencyRecorder._samples.setdefault(endpoint, []).append(sample)
+
+
+def make_response(body, request_body=None, elapsed_ms=5):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response._content_consumed = True
+    response.elapsed = datetime.timedelta(milliseconds=elapsed_ms)
+    response.request = requests.Request("POST", ORG_URL, data=request_body).prepare()
+    return response
+
+
+class TestPercentile():
+
+    def test_01_nearest_rank(self):
+        """
+        Test the nearest-rank percentiles of a fixed sorted list.
+        """
+        values = list(range(1, 101))
+        assert ([percentile(values, pct) for pct in (1, 50, 95, 99, 100)] == [1, 50, 95, 99, 100])
+        assert ([percentile([10, 20, 30, 40], pct) for pct in (25, 50, 51, 99)] == [10, 20, 30, 40])
+        assert (percentile([7], 50) == 7 and percentile([7], 99) == 7)
+        assert (percentile([], 95) == 0.0)
+        # pct 0 still returns the smallest value, not the last one.
+        assert (percentile([3, 4], 0) == 3)
+
+
+class TestEndpointTemplate():
+
+    @pytest.mark.parametrize("url, template", [
+        (ORG_URL, "/orgs/{}"),
+        ("http://127.0.0.1:8000/api/v1/orgs/{}/sites/".format("6f4bf40245f94a349dd0b0e3b2a3a0b5"), "/orgs/{}/sites"),
+        ("/api/v1/sites/42/devices/5c5b35000001/stats", "/sites/{}/devices/{}/stats"),
+        ("/api/v1/sites/42/devices/5C:5B:35:00:00:01", "/sites/{}/devices/{}"),
+        ("/api/v1/orgs/abcdefabcdefabcd/inventory", "/orgs/{}/inventory"),
+        ("/api/v1/orgs/o/sitegroups/site-group-0042", "/orgs/o/sitegroups/{}"),
+        ("/api/v1/self/apitokens/dGVzdDEyMzQ1Njc4OQ==", "/self/apitokens/{}"),
+        ("/api/v1/invites/user%40example.com", "/invites/{}"),
+        ("/api/v1/self/oauth2/?next=/orgs/1", "/self/oauth2"),
+        ("https://api.ac2.mist.com/api/v1", "/"),
+    ])
+    def test_01_id_segments_are_templated(self, url, template):
+        """
+        Test that every id-shaped segment is replaced by {} and that path words are kept.
+        """
+        assert (endpoint_template(url) == template)
+
+
+class TestLatencyRecorder():
+
+    def test_01_summary_percentiles_per_endpoint(self):
+        """
+        Test that every endpoint gets its own count and percentiles, in milliseconds, whatever the insertion order.
+        """
+        add_samples("GET /orgs/{}", [50, 10, 40, 20, 30, 60, 70, 80, 90, 100])
+        add_samples("DELETE /orgs/{}", [5])
+        summary = LatencyRecorder.summary()
+        assert (list(summary) == ["DELETE /orgs/{}", "GET /orgs/{}"])
+        get_stats = summary["GET /orgs/{}"]
+        assert (get_stats["count"] == 10)
+        assert ((get_stats["total_p50_ms"], get_stats["total_p95_ms"], get_stats["total_p99_ms"]) == (50, 100, 100))
+        assert (get_stats["ttfb_p50_ms"] == 25)
+        assert (summary["DELETE /orgs/{}"]["total_p99_ms"] == 5)
+
+    def test_02_summary_counters_and_averages(self):
+        """
+        Test the failed and new connection counts and the average body sizes.
+        """
+        add_samples("POST /orgs", [10, 20], new_connection=True, request_bytes=100, response_bytes=1000)
+        add_samples("POST /orgs", [30], failed=True, request_bytes=40)
+        stats = LatencyRecorder.summary()["POST /orgs"]
+        assert ((stats["count"], stats["failed"], stats["new_connections"]) == (3, 1, 2))
+        assert (stats["avg_request_bytes"] == 80 and stats["avg_response_bytes"] == pytest.approx(2000 / 3))
+
+    def test_03_stop_groups_by_endpoint_template(self):
+        """
+        Test that recorded calls are grouped by method and templated URL, with their body sizes and failures.
+        """
+        started_at = LatencyRecorder.start()
+        LatencyRecorder.stop("POST", ORG_URL, started_at, make_response(b'{"id": 1}', '{"name": "a"}'))
+        started_at = LatencyRecorder.start()
+        LatencyRecorder.stop("POST", ORG_URL.replace("6f4bf402", "0000aaaa"), started_at)
+        summary = LatencyRecorder.summary()
+        assert (list(summary) == ["POST /orgs/{}"])
+        stats = summary["POST /orgs/{}"]
+        assert ((stats["count"], stats["failed"]) == (2, 1))
+        # Bodies of 13 and 9 bytes, averaged with the 0 bytes of the failed call.
+        assert (stats["avg_request_bytes"] == 6.5 and stats["avg_response_bytes"] == 4.5)
+
+    def test_04_write_json(self, tmp_path):
+        """
+        Test the JSON report: the summary under "endpoints", the extra fields at the top level, parents created.
+        """
+        add_samples("GET /self", [1, 2, 3, 4])
+        path = LatencyRecorder.write_json(str(tmp_path / "reports" / "api_latency.json"), extra={"workers": 2})
+        with open(path) as report_file:
+            document = json.load(report_file)
+        assert (document["workers"] == 2)
+        assert (document["endpoints"] == LatencyRecorder.summary())
+        assert (document["endpoints"]["GET /self"]["total_p50_ms"] == 2)
+
+    def test_05_format_table_uses_labels(self):
+        """
+        Test that the table has a row per endpoint, showing the label of its template.
+        """
+        add_samples("GET /orgs/{}", [10, 20])
+        add_samples("GET /self", [1])
+        lines = LatencyRecorder.format_table({"/orgs/{}": "CONST_API_ORG_DETAILS"}).splitlines()
+        assert (len(lines) == 4)
+        assert (lines[2].split()[:4] == ["GET", "CONST_API_ORG_DETAILS", "2", "0"])
+        assert (lines[3].split()[:2] == ["GET", "/self"])
+
+    def test_06_reset(self):
+        """
+        Test that reset drops every sample.
+        """
+        add_samples("GET /self", [1])
+        LatencyRecorder.reset()
+        assert (LatencyRecorder.summary() == {})
+
+    def test_07_merge_samples_of_other_processes(self):
+        """
+        Test that the samples of xdist workers merged on the controller are summarized together.
+        """
+        add_samples("GET /self", [10, 20])
+        worker_samples = LatencyRecorder.samples()
+        LatencyRecorder.reset()
+        add_samples("GET /self", [30])
+        add_samples("GET /orgs/{}", [40])
+        LatencyRecorder.merge(worker_samples)
+        LatencyRecorder.merge({"GET /self": [dict(worker_samples["GET /self"][0], total=0.05)]})
+        summary = LatencyRecorder.summary()
+        assert ((summary["GET /self"]["count"], summary["GET /orgs/{}"]["count"]) == (4, 1))
+        assert (summary["GET /self"]["total_p99_ms"] == 50)
+        # The copy returned by samples() isn't changed by the merges.
+        assert (len(worker_samples["GET /self"]) == 2)
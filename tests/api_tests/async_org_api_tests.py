@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import threading
+import time
+from libs.api_libs.async_org_api_libs import AsyncOrgAPILibs
+from libs.api_libs.org_api_libs import OrgAPILibs
+from utils.api_utils.async_api_utils import AsyncCommonAPIUtils
+
+org_obj = OrgAPILibs()
+
+
+class TestAsyncOrgAPI():
+
+    def test_01_create_and_delete_orgs_concurrently(self, env):
+        """
+        Test to create and delete orgs concurrently, and that the sync org lookups see both changes at once.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format(
+            "test_01_create_and_delete_orgs_concurrently"))
+
+        async def create_and_delete():
+            async with AsyncOrgAPILibs() as async_org_obj:
+                created = await async_org_obj.create_orgs(env, [None] * 5)
+                assert all(isinstance(org, dict) for org in created), created
+                org_ids = [org['id'] for org in created]
+                # The /self cache is primed: only the invalidation makes the new orgs visible.
+                assert all(org_obj._is_org_present(env, org_id) for org_id in org_ids)
+                deleted = await async_org_obj.delete_orgs(env, org_ids)
+                return org_ids, deleted
+
+        org_obj.get_set_of_org_ids_for_user(env)
+        org_ids, deleted = asyncio.run(create_and_delete())
+
+        assert (deleted == [None] * len(org_ids))
+        assert not any(org_obj._is_org_present(env, org_id) for org_id in org_ids)
+
+    def test_02_failures_are_returned_in_place(self, env):
+        """
+        Test that a failed request is returned as an exception at its position without cancelling the others.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format(
+            "test_02_failures_are_returned_in_place"))
+
+        async def delete_with_a_missing_org():
+            async with AsyncOrgAPILibs() as async_org_obj:
+                org_id = (await async_org_obj._op_create_org(env))['id']
+                return org_id, await async_org_obj.delete_orgs(env, ["missing-org-id", org_id])
+
+        org_id, deleted = asyncio.run(delete_with_a_missing_org())
+
+        assert (isinstance(deleted[0], AssertionError))
+        assert (deleted[1] is None)
+        assert (not org_obj._is_org_present(env, org_id))
+
+    def test_03_in_flight_requests_are_bounded(self):
+        """
+        Test that no more than max_concurrency requests run at the same time.
+        """
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+
+        def request():
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+
+        async def run_requests():
+            async with AsyncCommonAPIUtils(max_concurrency=3) as api_utils:
+                await api_utils.gather(*[api_utils._run(request) for _ in range(12)])
+
+        asyncio.run(run_requests())
+
+        assert (peak[0] == 3)
@@ -0,0 +1,124 @@
+import io
+import json
+import pytest
+import requests
+from utils.api_utils.lazy_response import LazyResponse, _StreamReader
+
+
+def make_response(body, stream=True, status_code=200):
+    """requests.Response over an in-memory body, either still to be streamed or already downloaded."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.encoding = "utf-8"
+    if stream:
+        response.raw = io.BytesIO(body)
+    else:
+        response._content = body
+        response._content_consumed = True
+    return response
+
+
+def split_everywhere(body):
+    """Every split of body in two chunks, to cover values, escapes and UTF-8 sequences cut by a chunk boundary."""
+    for index in range(len(body) + 1):
+        yield [body[:index], body[index:]]
+
+
+ITEMS = [
+    {"id": "a", "nested": {"tags": ["x", ["y", {"z": None}]], "count": 12345}},
+    {"id": "b", "name": "Quote \" and backslash \\ inside", "empty": [], "obj": {}},
+    {"id": "c", "name": "café ☃", "flag": True, "ratio": -1.5e3},
+    [1, 2, [3, 4]],
+    "plain string",
+    42,
+]
+
+
+class TestStreamReader():
+
+    def test_01_array_items_split_at_every_chunk_boundary(self):
+        """
+        Test that the items of a list are decoded whatever the chunk boundaries, nested values included.
+        """
+        body = json.dumps(ITEMS).encode("utf-8")
+        for chunks in split_everywhere(body):
+            assert (list(_StreamReader(iter(chunks)).array_items()) == ITEMS)
+
+    def test_02_unicode_escapes_and_raw_utf8_across_chunks(self):
+        """
+        Test that \\uXXXX escapes and raw multi-byte UTF-8 characters survive any chunk boundary.
+        """
+        escaped = json.dumps(["café", "☃", "\"quoted\""], ensure_ascii=True).encode("utf-8")
+        raw = json.dumps(["café", "☃", "\"quoted\""], ensure_ascii=False).encode("utf-8")
+        for body in (escaped, raw):
+            for chunks in split_everywhere(body):
+                assert (list(_StreamReader(iter(chunks)).array_items()) == ["café", "☃", "\"quoted\""])
+
+    def test_03_one_byte_chunks(self):
+        """
+        Test the worst case of one byte per chunk.
+        """
+        body = json.dumps({"total": 3, "results": ITEMS, "next": None}).encode("utf-8")
+        chunks = [body[index:index + 1] for index in range(len(body))]
+        assert (list(_StreamReader(iter(chunks)).object_member_items("results")) == ITEMS)
+
+    def test_04_empty_lists_and_missing_key(self):
+        """
+        Test empty arrays, an empty object, and an object without the requested key.
+        """
+        assert (list(_StreamReader(iter([b" [ ] "])).array_items()) == [])
+        assert (list(_StreamReader(iter([b'{"results": []}'])).object_member_items("results")) == [])
+        assert (list(_StreamReader(iter([b"{}"])).object_member_items("results")) == [])
+        assert (list(_StreamReader(iter([b'{"other": [1, 2]}'])).object_member_items("results")) == [])
+
+    @pytest.mark.parametrize("body", [b'[{"id": "a"}, {"id": "b"', b"[1, 2", b'[{"id": "a"},', b"["])
+    def test_05_truncated_body_raises(self, body):
+        """
+        Test that a body cut short raises instead of silently ending the iteration.
+        """
+        with pytest.raises(ValueError):
+            list(_StreamReader(iter([body])).array_items())
+
+    def test_06_non_json_body_raises(self):
+        """
+        Test that a body that isn't a JSON list raises.
+        """
+        with pytest.raises(ValueError):
+            list(_StreamReader(iter([b"<html>Bad Gateway</html>"])).array_items())
+
+
+class TestLazyResponse():
+
+    def test_01_body_is_parsed_once(self):
+        """
+        Test that the body is parsed on first access and then served from the cache.
+        """
+        response = LazyResponse(make_response(b'{"id": "a", "items": [1, 2]}', stream=False))
+
+        assert (response["id"] == "a")
+        assert (response.data is response.json())
+        assert (response.get("missing", "default") == "default")
+        assert (list(response.iter_items("items")) == [1, 2])
+
+    def test_02_streamed_items(self):
+        """
+        Test that a streamed body is decoded item by item, for a top-level list and a list under a key.
+        """
+        assert (list(LazyResponse(make_response(json.dumps(ITEMS).encode())).iter_items()) == ITEMS)
+        body = json.dumps({"results": ITEMS, "next": None}).encode()
+        assert (list(LazyResponse(make_response(body)).iter_items("results")) == ITEMS)
+
+    def test_03_non_json_body(self):
+        """
+        Test that a non-JSON body is exposed as text, and that streaming it raises.
+        """
+        assert (LazyResponse(make_response(b"Bad Gateway", stream=False, status_code=502)).data == "Bad Gateway")
+        with pytest.raises(ValueError):
+            list(LazyResponse(make_response(b"Bad Gateway", status_code=502)).iter_items())
+
+    def test_04_truncated_streamed_body_raises(self):
+        """
+        Test that a streamed body cut short raises.
+        """
+        with pytest.raises(ValueError):
+            list(LazyResponse(make_response(b'{"results": [{"id": "a"}, {"id"')).iter_items("results"))
@@ -0,0 +1,154 @@
+import pytest
+import requests
+from utils.api_utils.local_mist_server import LocalMistAPIServer, MAX_PAGE_LIMIT
+from utils.log_utils import CORRELATION_ID_HEADER
+
+HEADERS = {"Authorization": "Token local-test"}
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Local API with no latency or injected errors, shared by the module"""
+    with LocalMistAPIServer(port=0, latency_ms=0, error_rate=0) as local_server:
+        yield local_server
+
+
+@pytest.fixture(scope="module")
+def api(server):
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    yield lambda method, path, **kwargs: session.request(method, server.base_url + path, **kwargs)
+    session.close()
+
+
+@pytest.fixture
+def org_id(api):
+    org_id = api("POST", "/orgs", json={"name": "Smoke Org"}).json()["id"]
+    yield org_id
+    api("DELETE", "/orgs/" + org_id)
+
+
+class TestLocalMistServerRoutes():
+
+    def test_01_requires_a_token(self, server):
+        """
+        Test that a request without an API token is refused before being routed.
+        """
+        response = requests.get(server.base_url + "/self")
+        assert (response.status_code == 401)
+
+    def test_02_org_lifecycle(self, api):
+        """
+        Test the org create, read, update, setting and delete routes, and the /self privileges following them.
+        """
+        org = api("POST", "/orgs", json={"name": "Smoke Org"}).json()
+        assert (org["name"] == "Smoke Org" and org["id"])
+        privileges = api("GET", "/self").json()["privileges"]
+        assert (any(privilege["org_id"] == org["id"] for privilege in privileges))
+
+        assert (api("PUT", "/orgs/" + org["id"], json={"name": "Renamed", "id": "ignored"}).json()["id"] == org["id"])
+        assert (api("GET", "/orgs/" + org["id"]).json()["name"] == "Renamed")
+        api("PUT", "/orgs/{}/setting".format(org["id"]), json={"password_policy": {"enabled": True}})
+        assert (api("GET", "/orgs/{}/setting".format(org["id"])).json()["password_policy"] == {"enabled": True})
+
+        assert (api("DELETE", "/orgs/" + org["id"]).status_code == 200)
+        assert (api("GET", "/orgs/" + org["id"]).status_code == 404)
+        assert (not any(privilege["org_id"] == org["id"] for privilege in api("GET", "/self").json()["privileges"]))
+
+    def test_03_org_children(self, api, org_id):
+        """
+        Test the site and sitegroup routes, and that deleting a sitegroup removes it from its sites.
+        """
+        sitegroup = api("POST", "/orgs/{}/sitegroups".format(org_id), json={"name": "Group"}).json()
+        site = api("POST", "/orgs/{}/sites".format(org_id),
+                   json={"name": "Site", "sitegroup_ids": [sitegroup["id"]]}).json()
+        assert (site["org_id"] == org_id and site["country_code"] == "US")
+        assert (api("GET", "/sites/" + site["id"]).json()["sitegroup_ids"] == [sitegroup["id"]])
+
+        assert (api("DELETE", "/orgs/{}/sitegroups/{}".format(org_id, sitegroup["id"])).status_code == 200)
+        assert (api("GET", "/sites/" + site["id"]).json()["sitegroup_ids"] == [])
+        assert (api("GET", "/orgs/{}/sites/{}".format("other-org", site["id"])).status_code == 404)
+        assert (api("DELETE", "/sites/" + site["id"]).status_code == 200)
+
+    def test_04_errors(self, api, org_id):
+        """
+        Test the 400, 404 and 405 answers.
+        """
+        assert (api("POST", "/orgs", json={"name": ""}).status_code == 400)
+        assert (api("POST", "/orgs", data="{not json").status_code == 400)
+        assert (api("GET", "/orgs/{}/inventory".format(org_id), params={"limit": "ten"}).status_code == 400)
+        assert (api("GET", "/orgs/missing-org").status_code == 404)
+        assert (api("GET", "/unknown").status_code == 404)
+        response = api("PATCH", "/orgs/" + org_id, json={})
+        assert (response.status_code == 405)
+        assert (response.json()["detail"] == 'Method "PATCH" not allowed.')
+
+    def test_05_echoes_the_correlation_id(self, api):
+        """
+        Test that the correlation id of a request is sent back.
+        """
+        response = api("GET", "/self", headers={CORRELATION_ID_HEADER: "abc123"})
+        assert (response.headers[CORRELATION_ID_HEADER] == "abc123")
+
+
+class TestLocalMistServerPagination():
+
+    def test_01_x_page_headers(self, api, server, org_id):
+        """
+        Test the X-Page-* headers and page contents of the list endpoints, past the last page and with a clamped limit.
+        """
+        server.state.seed_inventory(org_id, 25)
+        url = "/orgs/{}/inventory".format(org_id)
+        response = api("GET", url, params={"limit": 10, "page": 3})
+        assert (len(response.json()) == 5)
+        assert ((response.headers["X-Page-Limit"], response.headers["X-Page-Page"], response.headers["X-Page-Total"])
+                == ("10", "3", "25"))
+        assert (api("GET", url, params={"limit": 10, "page": 4}).json() == [])
+        assert (api("GET", url, params={"limit": MAX_PAGE_LIMIT * 2}).headers["X-Page-Limit"] == str(MAX_PAGE_LIMIT))
+        response = api("GET", url, params={"type": "switch", "limit": 5})
+        assert (response.headers["X-Page-Total"] == "9" and len(response.json()) == 5)
+
+        for index in range(3):
+            api("POST", "/orgs/{}/sites".format(org_id), json={"name": "Site {}".format(index)})
+        response = api("GET", "/orgs/{}/sites".format(org_id), params={"limit": 2, "page": 2})
+        assert ([site["name"] for site in response.json()] == ["Site 2"])
+        assert (response.headers["X-Page-Total"] == "3")
+
+    def test_02_search_next_links(self, api, server, org_id):
+        """
+        Test that the client search pages with a "next" link keeping the filters, and none on the last page.
+        """
+        server.state.seed_clients(org_id, 12)
+        page = api("GET", "/orgs/{}/clients/search".format(org_id), params={"band": "5", "limit": 4}).json()
+        assert ((page["total"], page["start"], page["end"]) == (6, 0, 4))
+        assert ("band=5" in page["next"] and "search_after=4" in page["next"])
+        last = requests.get(server.base_url.replace("/api/v1", "") + page["next"], headers=HEADERS).json()
+        assert ([client["hostname"] for client in last["results"]] == ["client-9", "client-11"])
+        assert ("next" not in last)
+
+
+class TestLocalMistServerErrorInjection():
+
+    def test_01_injected_errors(self):
+        """
+        Test that injected errors carry the configured status and a Retry-After header, and are counted.
+        """
+        with LocalMistAPIServer(port=0, latency_ms=0, error_rate=1.0, error_status=503) as server:
+            response = requests.get(server.base_url + "/self", headers=HEADERS)
+            assert (response.status_code == 503)
+            assert (response.headers["Retry-After"] == "0")
+            # Authentication is checked first.
+            assert (requests.get(server.base_url + "/self").status_code == 401)
+            assert (server.request_count == 2)
+
+    def test_02_seeded_error_rate_is_deterministic(self):
+        """
+        Test that two servers with the same seed fail the same requests.
+        """
+        statuses = []
+        for _ in range(2):
+            with LocalMistAPIServer(port=0, latency_ms=0, error_rate=0.5, error_status=500, seed=7) as server:
+                statuses.append([requests.get(server.base_url + "/self", headers=HEADERS).status_code
+                                 for _ in range(20)])
+        assert (statuses[0] == statuses[1])
+        assert (set(statuses[0]) == {200, 500})
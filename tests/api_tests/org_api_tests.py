@@ -1,6 +1,17 @@
 import pytest
 import logging
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from libs.api_libs.constants import api_constants
 from libs.api_libs.org_api_libs import *
+from libs.api_libs.org_pool import OrgPool
+from libs.api_libs.todo_site_api_libs import SiteAPILibs
+from utils import log_utils
+from utils.api_utils.api_utils import CommonAPIUtils
+from utils.api_utils.bulk_utils import run_bulk
+from utils.api_utils.pagination import iter_paginated
 
 org_obj = OrgAPILibs()
 
@@ -46,4 +57,304 @@ class TestOrgAPI():
         # Delete the Org
         org_obj._op_delete_org(env, TestOrgAPI.org_id)
 
-        assert (not org_obj._is_org_present(env, TestOrgAPI.org_id))
\ No newline at end of file
+        assert (not org_obj._is_org_present(env, TestOrgAPI.org_id))
+
+class TestOrgPool():
+
+    def test_01_leased_org_is_reset(self, env):
+        """
+        Test that an org returned to the pool is reset to its baseline before it is leased again.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format("test_01_leased_org_is_reset"))
+        site_obj = SiteAPILibs()
+        pool = OrgPool(env, size=1).start()
+        try:
+            with pool.lease() as org:
+                baseline_name = org['name']
+                site_obj._op_create_site(env, org['id'])
+                org_obj._op_create_sitegroup(env, org['id'], {"name": "Automation Sitegroup"})
+                org_obj._op_update_org(env, org['id'], {"name": org_obj.create_random_org_name() + " Renamed"})
+
+            # The pool holds a single org: the next lease is the same org, once reset.
+            with pool.lease() as org:
+                assert (org['name'] == baseline_name)
+                assert (site_obj.get_list_of_sites(env, org['id']) == [])
+                assert (list(org_obj.iter_sitegroups(env, org['id'])) == [])
+                org_id = org['id']
+        finally:
+            pool.close()
+
+        assert (not org_obj._is_org_present(env, org_id))
+
+    def test_02_failed_creation_fails_the_checkout_and_is_retried(self, env, monkeypatch):
+        """
+        Test that an org that can't be created fails the next checkout with its cause, and that the pool refills.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format(
+            "test_02_failed_creation_fails_the_checkout_and_is_retried"))
+        pool = OrgPool(env, size=1)
+        create_org = pool.org_libs._op_create_org
+        failures = [AssertionError("create failed")]
+
+        def flaky_create_org(env, org_payload=None):
+            if failures:
+                raise failures.pop()
+            return create_org(env, org_payload)
+
+        monkeypatch.setattr(pool.org_libs, "_op_create_org", flaky_create_org)
+        pool.start()
+        try:
+            with pytest.raises(RuntimeError, match="create failed"):
+                pool.checkout(timeout=Config.TIMEOUT)
+            with pool.lease(timeout=Config.TIMEOUT) as org:
+                assert (org_obj._is_org_present(env, org['id']))
+        finally:
+            pool.close()
+
+
+    def test_03_org_without_baseline_is_deleted(self, env, monkeypatch):
+        """
+        Test that an org created but whose settings can't be read is deleted, and fails the next checkout.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format(
+            "test_03_org_without_baseline_is_deleted"))
+        pool = OrgPool(env, size=1)
+        create_org, get_org_setting = pool.org_libs._op_create_org, pool.org_libs._get_org_setting
+        created_ids, failures = [], [AssertionError("setting read failed")]
+
+        def recording_create_org(env, org_payload=None):
+            org = create_org(env, org_payload)
+            created_ids.append(org['id'])
+            return org
+
+        def flaky_get_org_setting(env, org_id):
+            if failures:
+                raise failures.pop()
+            return get_org_setting(env, org_id)
+
+        monkeypatch.setattr(pool.org_libs, "_op_create_org", recording_create_org)
+        monkeypatch.setattr(pool.org_libs, "_get_org_setting", flaky_get_org_setting)
+        pool.start()
+        try:
+            with pytest.raises(RuntimeError, match="setting read failed"):
+                pool.checkout(timeout=Config.TIMEOUT)
+            assert (not org_obj._is_org_present(env, created_ids[0]))
+            with pool.lease(timeout=Config.TIMEOUT) as org:
+                assert (org['id'] == created_ids[1])
+        finally:
+            pool.close()
+        assert (not any(org_obj._is_org_present(env, org_id) for org_id in created_ids))
+
+
+class TestStructuredLogging():
+
+    def test_01_requests_carry_correlation_id(self, env, request):
+        """
+        Test that the API requests of a test carry its correlation id (echoed back by the local API only).
+        """
+        if env != "local":
+            pytest.skip("Only the local API echoes the correlation id")
+        assert (log_utils.get_test_node_id() == request.node.nodeid)
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_SELF
+        response = CommonAPIUtils().request("GET", url)
+        assert (response.headers[log_utils.CORRELATION_ID_HEADER] == log_utils.get_correlation_id())
+
+    def test_02_org_logs_are_structured(self, env, request, tmp_path):
+        """
+        Test that the OrgAPILibs records are written off-thread to the log file with their structured fields.
+        """
+        # Under xdist the file name gets the worker id.
+        log_file = log_utils.configure_logging(str(tmp_path / "automation.log"), "INFO", json_lines=True)
+        try:
+            org_id = org_obj._op_create_org(env)['id']
+            org_obj._op_delete_org(env, org_id)
+        finally:
+            log_utils.configure_logging()
+
+        with open(log_file) as log:
+            # Background threads of other tests (e.g. OrgPool resets) may log meanwhile: keep this thread's records.
+            entries = [entry for entry in map(json.loads, log) if entry["thread"] == threading.current_thread().name]
+        deleted = [entry for entry in entries if entry.get("operation") == "_op_delete_org"]
+        assert (deleted and all(entry["org_id"] == org_id for entry in deleted))
+        assert (all(entry["component"] == "OrgAPILibs" for entry in deleted))
+        assert (all(entry["test_node_id"] == request.node.nodeid for entry in entries))
+        assert (any(entry.get("endpoint", "").endswith(org_id) for entry in entries))
+
+    def test_03_worker_threads_keep_the_test_context(self, request):
+        """
+        Test that the work handed over to worker threads is attributed to the test, and other threads are not.
+        """
+        node_id = request.node.nodeid
+        result = run_bulk(lambda item: log_utils.get_test_node_id(), range(4), max_workers=4)
+        assert ([node_id for item, node_id in result.succeeded] == [node_id] * 4)
+
+        def fetch_page(page):
+            return [log_utils.get_test_node_id()], page + 1 if page < 3 else None
+        assert (list(iter_paginated(fetch_page, 1)) == [node_id] * 3)
+
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(log_utils.get_test_node_id()))
+        thread.start()
+        thread.join()
+        assert (seen == [None])
+
+
+class TestSelfPrivilegesCache():
+
+    CACHE_ENV = "self-cache-test"
+
+    @staticmethod
+    def _fetch_self_counting(calls, org_ids=("org-1",)):
+        def fetch_self(env):
+            calls.append(env)
+            return {"privileges": [{"scope": "org", "org_id": org_id} for org_id in org_ids]}
+        return fetch_self
+
+    def setup_method(self):
+        SelfPrivilegesCache.invalidate(self.CACHE_ENV)
+
+    def test_01_entry_is_served_within_ttl(self):
+        """
+        Test that the /self response is fetched once and served from the cache until the TTL expires.
+        """
+        calls = []
+        fetch_self = self._fetch_self_counting(calls)
+        first = SelfPrivilegesCache.get(self.CACHE_ENV, fetch_self, ttl=60)
+        second = SelfPrivilegesCache.get(self.CACHE_ENV, fetch_self, ttl=60)
+
+        assert (len(calls) == 1)
+        assert (second is first)
+        assert (first["org_id_set"] == {"org-1"})
+
+    def test_02_entry_is_refetched_after_ttl(self):
+        """
+        Test that an expired entry is refetched, and that a TTL of 0 always refetches.
+        """
+        calls = []
+        fetch_self = self._fetch_self_counting(calls)
+        SelfPrivilegesCache.get(self.CACHE_ENV, fetch_self, ttl=0.05)
+        time.sleep(0.1)
+        SelfPrivilegesCache.get(self.CACHE_ENV, fetch_self, ttl=0.05)
+        SelfPrivilegesCache.get(self.CACHE_ENV, fetch_self, ttl=0)
+
+        assert (len(calls) == 3)
+
+    def test_03_create_and_delete_invalidate_the_cache(self, env):
+        """
+        Test that an org is seen right after its creation and not after its deletion, despite a primed cache.
+        """
+        org_obj.get_set_of_org_ids_for_user(env)
+        org_id = org_obj._op_create_org(env)['id']
+        assert (org_obj._is_org_present(env, org_id))
+
+        org_obj._op_delete_org(env, org_id)
+        assert (not org_obj._is_org_present(env, org_id))
+
+    def test_04_fetch_in_flight_during_invalidate_is_not_stored(self):
+        """
+        Test that a /self response fetched while the cache was invalidated is returned but not cached.
+        """
+        calls = []
+        fetch_started = threading.Event()
+        release_fetch = threading.Event()
+
+        def slow_fetch_self(env):
+            calls.append(env)
+            fetch_started.set()
+            release_fetch.wait(5)
+            return {"privileges": [{"scope": "org", "org_id": "stale-org"}]}
+
+        results = []
+        fetcher = threading.Thread(target=lambda: results.append(
+            SelfPrivilegesCache.get(self.CACHE_ENV, slow_fetch_self, ttl=60)))
+        fetcher.start()
+        assert (fetch_started.wait(5))
+        # An org is created or deleted while the fetch is in flight.
+        SelfPrivilegesCache.invalidate(self.CACHE_ENV)
+        release_fetch.set()
+        fetcher.join(5)
+
+        assert (results[0]["org_id_set"] == {"stale-org"})
+        fresh = SelfPrivilegesCache.get(self.CACHE_ENV, self._fetch_self_counting(calls, ["fresh-org"]), ttl=60)
+        assert (len(calls) == 2)
+        assert (fresh["org_id_set"] == {"fresh-org"})
+
+
+class TestBulkOrgAPI():
+
+    def test_01_run_bulk_keeps_input_order_and_collects_failures(self):
+        """
+        Test that results come back in input order whatever the completion order, and failures don't stop the batch.
+        """
+        def operation(item):
+            # Later items finish first.
+            time.sleep((10 - item) * 0.005)
+            if item % 3 == 0:
+                raise ValueError("item {} failed".format(item))
+            return item * 10
+
+        result = run_bulk(operation, range(10), max_workers=10)
+
+        assert (len(result) == 10)
+        assert (result.succeeded == [(item, item * 10) for item in range(10) if item % 3])
+        assert ([item for item, _ in result.failed] == [0, 3, 6, 9])
+        assert (all(isinstance(error, ValueError) for _, error in result.failed))
+        assert (not result.ok)
+        assert (run_bulk(operation, []).ok)
+
+    def test_02_create_and_delete_orgs_with_partial_failures(self, env):
+        """
+        Test that the invalid payloads and unknown org IDs of a batch fail alone, at their position.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format(
+            "test_02_create_and_delete_orgs_with_partial_failures"))
+        names = [org_obj.create_random_org_name() for _ in range(4)]
+        payloads = [{"name": names[0]}, {"name": ""}, {"name": names[2]}, {"name": names[3]}]
+        created = org_obj.create_orgs(env, org_payloads=payloads)
+
+        assert ([org['name'] for org in created.results] == [names[0], names[2], names[3]])
+        assert ([payload for payload, _ in created.failed] == [{"name": ""}])
+
+        org_ids = [org['id'] for org in created.results]
+        deleted = org_obj.delete_orgs(env, [org_ids[0], "missing-org-id", org_ids[1], org_ids[2]])
+        assert ([org_id for org_id, _ in deleted.succeeded] == org_ids)
+        assert ([org_id for org_id, _ in deleted.failed] == ["missing-org-id"])
+        assert (not any(org_obj._is_org_present(env, org_id) for org_id in org_ids))
+
+    def test_03_sweeper_only_deletes_stale_automation_orgs(self, env):
+        """
+        Test that the sweeper deletes the automation orgs older than the cutoff, and nothing else.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format(
+            "test_03_sweeper_only_deletes_stale_automation_orgs"))
+        if env != "local":
+            pytest.skip("Creates back-dated orgs and sweeps the account: only against the local API")
+        stale_name = "Automation Org {} gw0-1-1".format((datetime.now() - timedelta(hours=3)).strftime(
+            "%Y-%m-%d %H:%M:%S"))
+        names = {
+            "stale": stale_name,
+            "recent": org_obj.create_random_org_name(),
+            "other_prefix": "Customer " + stale_name,
+            "not_automation": "Automation Orgs 2000-01-01 00:00",
+            "unparsable": "Automation Org last tuesday",
+        }
+        created = org_obj.create_orgs(env, org_payloads=[{"name": name} for name in names.values()])
+        assert created.ok, created.failed
+        org_ids = {key: org['id'] for key, org in zip(names, created.results)}
+        try:
+            assert (org_obj.get_org_name_timestamp(names["recent"]) is not None)
+            assert (org_ids["stale"] in org_obj.find_stale_automation_orgs(env, max_age_minutes=60))
+            assert (org_ids["stale"] not in org_obj.find_stale_automation_orgs(env, max_age_minutes=300))
+
+            swept = org_obj.sweep_stale_automation_orgs(env, max_age_minutes=60)
+            assert (org_ids["stale"] in [org_id for org_id, _ in swept.succeeded])
+            present = org_obj.get_set_of_org_ids_for_user(env)
+            assert (org_ids["stale"] not in present)
+            assert (all(org_ids[key] in present for key in names if key != "stale"))
+        finally:
+            org_obj.delete_orgs(env, [org_id for key, org_id in org_ids.items() if key != "stale"])
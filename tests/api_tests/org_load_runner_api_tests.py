@@ -0,0 +1,169 @@
+import logging
+import threading
+import pytest
+from libs.api_libs.org_load_runner import OrgLoadRunner
+
+
+class FakeClock:
+    """Clock only moved by the runner's waits and the stubbed iterations, so the schedule doesn't depend on the host."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.waits = []
+        self.on_wait = None
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        with self._lock:
+            self.now += seconds
+
+    def wait(self, seconds):
+        with self._lock:
+            self.waits.append(seconds)
+            self.now += max(seconds, 0)
+        if self.on_wait is not None:
+            self.on_wait()
+        return False
+
+
+class StubIteration:
+    """run_iteration stand-in recording the iterations started and the peak of iterations in flight."""
+
+    def __init__(self, runner, body=None):
+        self.runner = runner
+        self.body = body
+        self.started = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.started += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        if self.body is not None:
+            self.body()
+        with self._lock:
+            self.in_flight -= 1
+        self.runner.stats.record_iteration(True)
+        return True
+
+
+def make_runner(body=None, **kwargs):
+    clock = FakeClock()
+    runner = OrgLoadRunner("local", reporter=lambda line: None, clock=clock, wait=clock.wait, **kwargs)
+    runner.run_iteration = StubIteration(runner, body)
+    return runner, clock
+
+
+def iterations_before(runner, seconds):
+    """Iterations whose start time, per the runner's schedule, falls before `seconds`."""
+    iteration = 0
+    while runner._start_time_of(iteration + 1) < seconds:
+        iteration += 1
+    return iteration
+
+
+class TestOrgLoadRunner():
+
+    def test_01_rate_mode_starts_iterations_at_the_target_rate(self):
+        """
+        Test that the rate mode starts the iterations due within the duration, waiting 1/rate between them.
+        """
+        runner, clock = make_runner(rate=50, duration=0.5, max_workers=100)
+        summary = runner.run()
+        assert (runner.run_iteration.started == iterations_before(runner, 0.5) == 24)
+        assert (summary["iterations"] == 24)
+        assert (all(wait == pytest.approx(0.02) for wait in clock.waits))
+        assert (clock.now == pytest.approx(0.5))
+
+    def test_02_rate_mode_ramps_up(self):
+        """
+        Test that the ramp-up starts half the iterations of a full-rate run, fewer in its first half.
+        """
+        runner, clock = make_runner(rate=60, duration=0.6, ramp_up=0.6, max_workers=100)
+        runner.run()
+        assert (runner.run_iteration.started == iterations_before(runner, 0.6))
+        assert (17 <= runner.run_iteration.started <= 18)
+        assert (iterations_before(runner, 0.3) == 4)
+        # The waits shrink as the rate grows.
+        assert (clock.waits[0] > clock.waits[len(clock.waits) // 2] > clock.waits[-2])
+        for iteration in (1, 5, 18, 50):
+            assert (runner._iterations_due(runner._start_time_of(iteration)) == pytest.approx(iteration))
+
+    def test_03_saturated_rate_mode_skips_late_iterations_without_spinning(self, caplog):
+        """
+        Test that with every worker busy, late iterations are skipped, at least one per warning, instead of spinning.
+        """
+        release = threading.Event()
+        runner, clock = make_runner(body=lambda: release.wait(5), rate=100, duration=0.5, ramp_up=0.3,
+                                    max_workers=1)
+        # The iteration in flight finishes once the run is over.
+        clock.on_wait = lambda: release.set() if clock.now >= 0.5 else None
+        with caplog.at_level(logging.WARNING):
+            runner.run()
+        skipped = [record.args[1] for record in caplog.records if "skipping" in record.getMessage()]
+        assert (runner.run_iteration.started == 1)
+        assert (skipped and min(skipped) >= 1)
+        assert (1 + sum(skipped) <= iterations_before(runner, 0.5))
+
+    def test_04_concurrency_mode(self):
+        """
+        Test that the concurrency mode runs `concurrency` iterations at once, the workers starting over the ramp-up.
+        """
+        all_started = threading.Barrier(3, timeout=5)
+        runner, clock = make_runner(concurrency=3, duration=0.4, ramp_up=0.3)
+
+        def iteration():
+            all_started.wait()
+            clock.advance(0.2)
+
+        runner.run_iteration.body = iteration
+        summary = runner.run()
+        assert (sorted(clock.waits) == pytest.approx([0, 0.1, 0.2]))
+        assert (runner.run_iteration.peak == 3)
+        assert (summary["iterations"] == runner.run_iteration.started == 3)
+
+    def test_05_stop_ends_the_rate_mode_early(self):
+        """
+        Test that stop() ends a rate mode run before its duration.
+        """
+        runner, clock = make_runner(rate=20, duration=30)
+        clock.on_wait = lambda: runner.stop() if len(clock.waits) == 5 else None
+        runner.run()
+        assert (len(clock.waits) == 5)
+        assert (runner.run_iteration.started == 4)
+        assert (clock.now == pytest.approx(0.25))
+
+    def test_06_stop_ends_the_concurrency_mode_early(self):
+        """
+        Test that stop() ends a concurrency mode run before its duration, each worker finishing its iteration.
+        """
+        runner, clock = make_runner(concurrency=2, duration=30)
+        runner.run_iteration.body = runner.stop
+        runner.run()
+        assert (1 <= runner.run_iteration.started <= 2)
+        assert (clock.now == 0)
+
+    def test_07_cleanup_steps_run_after_a_failed_step(self):
+        """
+        Test that a failed step skips the following steps but not the cleanup, and fails the iteration.
+        """
+        runner = OrgLoadRunner("local", reporter=lambda line: None)
+        calls = []
+
+        def failing_step(org_libs, env, context):
+            calls.append("failing")
+            raise ValueError("step failed")
+
+        runner.steps = [("failing", failing_step), ("skipped", lambda *args: calls.append("skipped"))]
+        runner.cleanup_steps = [("cleanup", lambda *args: calls.append("cleanup"))]
+        assert (runner.run_iteration() is False)
+        assert (calls == ["failing", "cleanup"])
+        summary = runner.stats.summary()
+        assert (summary["failed_iterations"] == 1)
+        assert (summary["operations"]["failing"]["errors"] == 1 and summary["operations"]["cleanup"]["errors"] == 0)
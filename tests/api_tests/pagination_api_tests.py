@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+import pytest
+from libs.api_libs.org_api_libs import *
+from utils.api_utils.pagination import iter_paginated, iter_x_pages
+
+org_obj = OrgAPILibs()
+
+
+def fake_pages(pages, calls=None):
+    """fetch_page over an in-memory list of pages, requested by index; an exception in place of a page is raised."""
+    def fetch_page(index):
+        if calls is not None:
+            calls.append(index)
+        page = pages[index]
+        if isinstance(page, Exception):
+            raise page
+        return page, index + 1 if index + 1 < len(pages) else None
+    return fetch_page
+
+
+@pytest.fixture
+def seeded_org(env, request):
+    """Org of the local API seeded with 25 clients and 25 inventory devices"""
+    if env != "local":
+        pytest.skip("Seeds clients and inventory: only against the local API")
+    server = request.getfixturevalue("local_mist_api")
+    org_id = org_obj._op_create_org(env)['id']
+    server.state.seed_clients(org_id, 25)
+    server.state.seed_inventory(org_id, 25)
+    yield org_id
+    org_obj._op_delete_org(env, org_id)
+
+
+class TestIterPaginated():
+
+    @pytest.mark.parametrize("prefetch", [True, False])
+    def test_01_multi_page_iteration(self, prefetch):
+        """
+        Test that the items of every page are yielded in order, each page being fetched once.
+        """
+        calls = []
+        items = list(iter_paginated(fake_pages([[1, 2], [3, 4], [5]], calls), 0, prefetch))
+        assert (items == [1, 2, 3, 4, 5])
+        assert (calls == [0, 1, 2])
+
+    @pytest.mark.parametrize("prefetch", [True, False])
+    def test_02_empty_last_page(self, prefetch):
+        """
+        Test that an empty last page, or an empty single page, ends the iteration without yielding anything.
+        """
+        assert (list(iter_paginated(fake_pages([[1, 2], []]), 0, prefetch)) == [1, 2])
+        assert (list(iter_paginated(fake_pages([[]]), 0, prefetch)) == [])
+
+    @pytest.mark.parametrize("prefetch", [True, False])
+    def test_03_error_on_a_middle_page(self, prefetch):
+        """
+        Test that the items before a failing page are yielded, then its error is raised and nothing is fetched after.
+        """
+        calls, items = [], []
+        pages = iter_paginated(fake_pages([[1, 2], ValueError("page 1 failed"), [5]], calls), 0, prefetch)
+        with pytest.raises(ValueError, match="page 1 failed"):
+            for item in pages:
+                items.append(item)
+        assert (items == [1, 2])
+        assert (calls == [0, 1])
+
+    def test_04_early_break_does_not_wait_for_the_prefetch(self):
+        """
+        Test that stopping early returns while the prefetch is still in flight, and that no later page is requested.
+        """
+        calls, release = [], threading.Event()
+        fetch = fake_pages([[1, 2], [3, 4], [5]], calls)
+
+        def slow_fetch(index):
+            if index > 0:
+                release.wait(5)
+            return fetch(index)
+
+        pages = iter_paginated(slow_fetch, 0)
+        for item in pages:
+            break
+        start = time.monotonic()
+        pages.close()
+        assert (time.monotonic() - start < 1)
+        release.set()
+        time.sleep(0.1)
+        assert (calls == [0, 1])
+
+    def test_05_early_break_without_prefetch(self):
+        """
+        Test that without prefetch, stopping early doesn't request the next page at all.
+        """
+        calls = []
+        for item in iter_paginated(fake_pages([[1, 2], [3, 4]], calls), 0, prefetch=False):
+            break
+        assert (calls == [0])
+
+
+class TestPaginatedOrgAPI():
+
+    def test_01_iter_org_clients_follows_the_next_links(self, env, seeded_org):
+        """
+        Test that the clients are read in full across pages, in order, with and without filters.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format(
+            "test_01_iter_org_clients_follows_the_next_links"))
+        clients = list(org_obj.iter_org_clients(env, seeded_org, limit=10))
+        assert ([client['hostname'] for client in clients] == ["client-{}".format(index) for index in range(25)])
+        filtered = list(org_obj.iter_org_clients(env, seeded_org, filters={"ssid": "ssid-1"}, limit=4))
+        assert ([client['hostname'] for client in filtered] ==
+                ["client-{}".format(index) for index in range(1, 25, 4)])
+        assert (list(org_obj.iter_org_clients(env, seeded_org, filters={"ssid": "none"})) == [])
+
+    @pytest.mark.parametrize("prefetch", [True, False])
+    def test_02_iter_org_inventory_reads_every_page(self, env, seeded_org, prefetch):
+        """
+        Test that the inventory is read in full across a short last page, with and without prefetch.
+        """
+        devices = list(org_obj.iter_org_inventory(env, seeded_org, limit=10, prefetch=prefetch))
+        assert ([device['serial'] for device in devices] == ["A{:09d}".format(index) for index in range(25)])
+        switches = list(org_obj.iter_org_inventory(env, seeded_org, filters={"type": "switch"}, limit=3))
+        assert (len(switches) == 9 and all(device['model'] == "EX2300" for device in switches))
+
+    def test_03_no_empty_page_is_requested_after_a_full_last_page(self, env, seeded_org, local_mist_api):
+        """
+        Test that X-Page-Total ends the iteration on a full last page, without requesting an empty one.
+        """
+        local_mist_api.state.seed_inventory(seeded_org, 5)
+        url = api_constants.CONST_EXT_API_URLs[env] + api_constants.CONST_API_ORG_INVENTORY.format(seeded_org)
+        before = local_mist_api.request_count
+        assert (len(list(iter_x_pages(url, limit=10, prefetch=False))) == 30)
+        assert (local_mist_api.request_count - before == 3)
+
+    def test_04_error_on_a_middle_page(self, env, seeded_org, local_mist_api):
+        """
+        Test that a page failing mid-iteration raises after the items of the previous pages.
+        """
+        org_id = org_obj._op_create_org(env)['id']
+        # An empty inventory is a single empty page: the iteration ends at once.
+        assert (list(org_obj.iter_org_inventory(env, org_id, limit=10)) == [])
+        local_mist_api.state.seed_inventory(org_id, 25)
+        devices = org_obj.iter_org_inventory(env, org_id, limit=10, prefetch=False)
+        assert (len([next(devices) for _ in range(10)]) == 10)
+        org_obj._op_delete_org(env, org_id)
+        with pytest.raises(AssertionError, match="Expected status 200, got 404"):
+            next(devices)
@@ -0,0 +1,198 @@
+import time
+import pytest
+import requests
+from utils.api_utils.local_mist_server import LocalMistAPIServer
+from utils.api_utils.request_scheduler import RequestScheduler, RetryAfterTooLong, TokenBucket
+
+AUTH_HEADERS = {"Authorization": "Token scheduler-test"}
+
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = b"{}"
+    response._content_consumed = True
+    return response
+
+
+def scripted_send(*outcomes):
+    """send() returning (or raising) the given outcomes in order, recording every call."""
+    calls = []
+
+    def send():
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(time.monotonic())
+        if isinstance(outcome, Exception):
+            raise outcome
+        return make_response(*outcome) if isinstance(outcome, tuple) else make_response(outcome)
+
+    return send, calls
+
+
+@pytest.fixture(scope="module")
+def error_server():
+    """Stand-in answering every request with an injected error"""
+    server = LocalMistAPIServer(port=0, error_rate=1.0)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def failing_server(error_server):
+    """The error server with its request count reset, error status set per test through error_status"""
+    error_server.request_count = 0
+    return error_server
+
+
+class TestTokenBucket():
+
+    def test_01_burst_then_rate(self):
+        """
+        Test that the burst is served at once and the following tokens at the configured rate.
+        """
+        bucket = TokenBucket(rate=50, capacity=5)
+        started_at = time.monotonic()
+        waits = [bucket.acquire() for _ in range(10)]
+
+        assert (waits[:5] == [0.0] * 5)
+        assert (all(wait > 0 for wait in waits[5:]))
+        # 5 tokens beyond the burst at 50/s.
+        assert (time.monotonic() - started_at >= 0.09)
+
+    def test_02_zero_rate_disables_throttling(self):
+        """
+        Test that a rate of 0 never waits.
+        """
+        bucket = TokenBucket(rate=0, capacity=1)
+        assert (all(bucket.acquire() == 0.0 for _ in range(100)))
+
+    def test_03_rate_is_split_across_xdist_workers(self, monkeypatch):
+        """
+        Test that every xdist worker gets an even share of the hourly quota.
+        """
+        monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "4")
+        scheduler = RequestScheduler(rate_per_hour=3600 * 8, burst=1)
+        assert (scheduler.bucket.rate == pytest.approx(2.0))
+
+
+class TestRequestScheduler():
+
+    @staticmethod
+    def scheduler(**kwargs):
+        return RequestScheduler(**dict(dict(rate_per_hour=0, max_retries=3, backoff_base=0.001, backoff_max=0.01),
+                                       **kwargs))
+
+    @pytest.mark.parametrize("method", ["GET", "PUT", "DELETE", "POST", "PATCH"])
+    def test_01_429_is_retried_for_every_method(self, failing_server, method):
+        """
+        Test that a 429 is retried max_retries times whatever the method, then returned.
+        """
+        failing_server.error_status = 429
+        url = failing_server.base_url + "/self"
+        response = self.scheduler().execute(method, url, lambda: requests.request(method, url, headers=AUTH_HEADERS))
+
+        assert (response.status_code == 429)
+        assert (failing_server.request_count == 4)
+
+    @pytest.mark.parametrize("method, attempts", [("GET", 4), ("PUT", 4), ("DELETE", 4), ("POST", 1), ("PATCH", 1)])
+    def test_02_5xx_is_retried_for_idempotent_methods_only(self, failing_server, method, attempts):
+        """
+        Test that a 503 is retried for idempotent methods and returned at once for POST and PATCH.
+        """
+        failing_server.error_status = 503
+        url = failing_server.base_url + "/self"
+        response = self.scheduler().execute(method, url, lambda: requests.request(method, url, headers=AUTH_HEADERS))
+
+        assert (response.status_code == 503)
+        assert (failing_server.request_count == attempts)
+
+    def test_03_success_after_transient_errors(self):
+        """
+        Test that the first successful response is returned and the retries are counted.
+        """
+        scheduler = self.scheduler()
+        send, calls = scripted_send(503, 502, 200)
+        response = scheduler.execute("GET", "http://api/orgs/1", send)
+
+        assert (response.status_code == 200)
+        assert (len(calls) == 3)
+        metrics = scheduler.get_metrics()["GET /orgs/{}"]
+        assert (metrics["requests"] == 3 and metrics["retries"] == 2)
+
+    def test_04_connection_errors_follow_the_method_rules(self):
+        """
+        Test that connection errors are retried for GET and raised at once for POST.
+        """
+        send, calls = scripted_send(requests.exceptions.ConnectionError("reset"), 200)
+        assert (self.scheduler().execute("GET", "http://api/self", send).status_code == 200)
+        assert (len(calls) == 2)
+
+        send, calls = scripted_send(requests.exceptions.ConnectionError("reset"), 200)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            self.scheduler().execute("POST", "http://api/orgs", send)
+        assert (len(calls) == 1)
+
+    def test_05_retry_after_is_honoured(self):
+        """
+        Test that the retry waits for the Retry-After delay instead of the backoff.
+        """
+        scheduler = self.scheduler(backoff_max=5)
+        send, calls = scripted_send((429, {"Retry-After": "0.3"}), 200)
+        response = scheduler.execute("POST", "http://api/orgs", send)
+
+        assert (response.status_code == 200)
+        assert (calls[1] - calls[0] >= 0.3)
+        metrics = scheduler.get_metrics()["POST /orgs"]
+        assert (metrics["retry_wait"] == pytest.approx(0.3))
+        assert (metrics["throttled"] == 1)
+
+    def test_06_backoff_is_capped(self):
+        """
+        Test that the exponential backoff never exceeds backoff_max, and the parsing of Retry-After values.
+        """
+        scheduler = self.scheduler(backoff_base=10, backoff_max=0.05)
+        assert (all(0 <= scheduler._backoff(attempt) <= 0.05 for attempt in range(20)))
+        assert (scheduler._parse_retry_after("3600") == 3600)
+        assert (scheduler._parse_retry_after("-1") == 0.0)
+        assert (scheduler._parse_retry_after("not a date") is None)
+        assert (scheduler._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0)
+
+    def test_07_retry_after_over_backoff_max_is_honoured(self):
+        """
+        Test that a Retry-After longer than backoff_max is waited for in full.
+        """
+        scheduler = self.scheduler(backoff_max=0.01, retry_after_max=1)
+        send, calls = scripted_send((503, {"Retry-After": "0.3"}), 200)
+        assert (scheduler.execute("GET", "http://api/self", send).status_code == 200)
+        assert (calls[1] - calls[0] >= 0.3)
+        assert (scheduler.get_metrics()["GET /self"]["retry_wait"] == pytest.approx(0.3))
+
+    def test_08_retry_after_over_the_limit_raises(self):
+        """
+        Test that a Retry-After over retry_after_max raises at once with the response, without retrying.
+        """
+        scheduler = self.scheduler(retry_after_max=60)
+        send, calls = scripted_send((429, {"Retry-After": "3600"}), 200)
+        started_at = time.monotonic()
+        with pytest.raises(RetryAfterTooLong, match="POST http://api/orgs returned 429 with Retry-After 3600s") as error:
+            scheduler.execute("POST", "http://api/orgs", send)
+        assert (time.monotonic() - started_at < 1)
+        assert (len(calls) == 1)
+        assert ((error.value.response.status_code, error.value.delay) == (429, 3600))
+
+    def test_09_merge_metrics(self):
+        """
+        Test that the counters of another scheduler are added to the ones of this scheduler.
+        """
+        worker = self.scheduler()
+        worker.execute("GET", "http://api/orgs/1", scripted_send(503, 200)[0])
+        worker.execute("GET", "http://api/self", scripted_send(200)[0])
+        controller = self.scheduler()
+        controller.execute("GET", "http://api/orgs/2", scripted_send(200)[0])
+        controller.merge_metrics(worker.get_metrics())
+
+        metrics = controller.get_metrics()
+        assert ((metrics["GET /orgs/{}"]["requests"], metrics["GET /orgs/{}"]["retries"]) == (3, 1))
+        assert (metrics["GET /self"]["requests"] == 1)
@@ -1 +1,87 @@
-# TODO - Candidate to add Site API Tests when working on the assignment.
\ No newline at end of file
+import pytest
+import logging
+from libs.api_libs.todo_site_api_libs import *
+
+site_obj = SiteAPILibs()
+
+
+@pytest.fixture(scope="class")
+def site_org_id(org_pool):
+    """Org leased from the pool for the sites created by the tests, reset once the class is done."""
+    with org_pool.lease() as org:
+        yield org['id']
+
+
+class TestSiteAPI():
+
+    site_id = ""  # Class variable for Site ID
+
+    def test_01_create_site(self, env, site_org_id):
+        """
+        Test to create a site with a random name via API and validate the response.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format("test_01_create_site"))
+        site_name = site_obj.create_random_site_name()
+        create_site = site_obj._op_create_site(env, site_org_id, {"name": site_name})
+
+        # Making the Site ID available for other test methods.
+        TestSiteAPI.site_id = create_site['id']
+
+        assert (create_site['name'] == site_name)
+        assert (site_obj._is_site_present(env, site_org_id, create_site['id']))
+
+    def test_02_update_site(self, env, site_org_id):
+        """
+        Test to update the name of an existing site via API and validate the response.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format("test_02_update_site"))
+
+        # Generate new Site Name
+        site_payload = {"name": site_obj.create_random_site_name()}
+
+        # Update the Site Name
+        updated_site = site_obj._op_update_site(env, TestSiteAPI.site_id, site_payload)
+
+        assert (updated_site['name'] == site_payload['name'])
+        assert (site_obj._get_site_details(env, TestSiteAPI.site_id)['name'] == site_payload['name'])
+
+    def test_03_delete_site(self, env, site_org_id):
+        """
+        Test to delete an existing site via API and validate the response.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format("test_03_delete_site"))
+
+        # Delete the Site
+        site_obj._op_delete_site(env, TestSiteAPI.site_id)
+
+        assert (not site_obj._is_site_present(env, site_org_id, TestSiteAPI.site_id))
+
+    def test_04_bulk_create_update_delete_sites(self, env, site_org_id):
+        """
+        Test to create, rename and delete many sites concurrently and validate them with a single listing each.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format(
+            "test_04_bulk_create_update_delete_sites"))
+
+        created = site_obj.create_sites(env, site_org_id, count=25)
+        assert created.ok, created.failed
+        site_ids = [site['id'] for site in created.results]
+        site_index = site_obj.get_site_index(env, site_org_id)
+        assert all(site_id in site_index for site_id in site_ids)
+        # Generated names never collide, even when created concurrently.
+        assert len({site['name'] for site in created.results}) == len(site_ids)
+
+        new_names = {site_id: {"name": site_obj.create_random_site_name()} for site_id in site_ids}
+        updated = site_obj.update_sites(env, new_names)
+        assert updated.ok, updated.failed
+        site_index = site_obj.get_site_index(env, site_org_id)
+        assert all(site_index.has_name(payload['name']) for payload in new_names.values())
+
+        deleted = site_obj.delete_sites(env, site_ids)
+        assert deleted.ok, deleted.failed
+        site_index = site_obj.get_site_index(env, site_org_id)
+        assert not any(site_id in site_index for site_id in site_ids)
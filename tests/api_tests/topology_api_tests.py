@@ -0,0 +1,82 @@
+import logging
+import pytest
+from libs.api_libs.org_api_libs import OrgAPILibs
+from libs.api_libs.todo_site_api_libs import SiteAPILibs
+from libs.api_libs.topology_provisioner import TopologyNode, TopologySpec, TopologyProvisioner, resolve_levels
+
+org_obj = OrgAPILibs()
+site_obj = SiteAPILibs()
+
+
+class TestTopologyAPI():
+
+    def test_01_provision_and_teardown_topology(self, env):
+        """
+        Test to provision an org with sitegroups, network templates and sites, then tear it down.
+        """
+        logging.info("*********************************************************************************")
+        logging.info("###################   IN TEST METHOD {} ################".format(
+            "test_01_provision_and_teardown_topology"))
+        provisioner = TopologyProvisioner(env)
+        spec = TopologySpec.generate(sitegroups=4, networktemplates=2, sites=40, settings={"mxedge_mgmt": {}})
+        topology = provisioner.provision(spec)
+
+        assert (len(topology.sitegroups) == 4 and len(topology.networktemplates) == 2)
+        site_index = site_obj.get_site_index(env, topology.org_id)
+        assert (len(site_index) == 40)
+        sitegroup_ids = {sitegroup['id'] for sitegroup in topology.sitegroups.values()}
+        assert all(set(site['sitegroup_ids']) <= sitegroup_ids and site['sitegroup_ids'] for site in site_index)
+
+        org_id = topology.org_id
+        assert (provisioner.teardown(topology) == [])
+        assert (not org_obj._is_org_present(env, org_id))
+
+
+class TestResolveLevels():
+
+    @staticmethod
+    def keys(levels):
+        return [[node.key for node in level] for level in levels]
+
+    def test_01_levels_of_a_spec(self):
+        """
+        Test that the org comes first, then its settings, sitegroups and templates, then the sites.
+        """
+        spec = TopologySpec(settings={"mxedge_mgmt": {}}, sitegroups=[{"name": "sg"}],
+                            networktemplates=[{"name": "tpl"}],
+                            sites=[{"name": "a", "sitegroups": ["sg"], "networktemplate": "tpl"}, {"name": "b"}])
+        assert (self.keys(resolve_levels(spec.nodes())) ==
+                [["org"], ["setting", "sitegroup:sg", "networktemplate:tpl", "site:b"], ["site:a"]])
+
+    def test_02_unknown_reference(self):
+        """
+        Test that a site referencing a sitegroup or template missing from the spec is rejected before any request.
+        """
+        spec = TopologySpec(sitegroups=[{"name": "sg"}], sites=[{"name": "a", "sitegroups": ["sg", "missing"]}])
+        with pytest.raises(ValueError, match="site:a depends on unknown node sitegroup:missing"):
+            resolve_levels(spec.nodes())
+        spec = TopologySpec(sites=[{"name": "a", "networktemplate": "missing"}])
+        with pytest.raises(ValueError, match="site:a depends on unknown node networktemplate:missing"):
+            resolve_levels(spec.nodes())
+
+    @pytest.mark.parametrize("edges, cyclic", [
+        ({"a": ["b"], "b": ["a"]}, "a, b"),
+        ({"a": ["a"]}, "a"),
+        ({"a": ["c"], "b": ["a"], "c": ["b"], "d": ["c"]}, "a, b, c, d"),
+    ])
+    def test_03_cycle(self, edges, cyclic):
+        """
+        Test that a dependency cycle is reported with every node it blocks, self-dependencies included.
+        """
+        nodes = [TopologyNode("org", "org", None)] + [
+            TopologyNode(key, "sitegroup", {"name": key}, ["org"] + depends_on) for key, depends_on in edges.items()]
+        with pytest.raises(ValueError, match="^Topology has a dependency cycle between {}$".format(cyclic)):
+            resolve_levels(nodes)
+
+    def test_04_duplicate_key(self):
+        """
+        Test that two nodes with the same key are rejected.
+        """
+        spec = TopologySpec(sitegroups=[{"name": "sg"}, {"name": "sg"}])
+        with pytest.raises(ValueError, match="Duplicate topology node sitegroup:sg"):
+            resolve_levels(spec.nodes())
@@ -0,0 +1,97 @@
+import gzip
+import os
+import threading
+import time
+import pytest
+from utils.ui_utils import artifact_writer
+from utils.ui_utils.artifact_writer import ArtifactWriter
+
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), max_queue=1, put_timeout=0.05)
+    yield writer
+    writer.close(timeout=5)
+
+
+@pytest.fixture
+def blocked_compression(monkeypatch):
+    """Event holding the writer thread inside gzip.compress until it is set"""
+    release = threading.Event()
+    compress = gzip.compress
+
+    def blocking_compress(data, compresslevel=9):
+        release.wait(5)
+        return compress(data, compresslevel=compresslevel)
+    monkeypatch.setattr(artifact_writer.gzip, "compress", blocking_compress)
+    yield release
+    release.set()
+
+
+class TestArtifactWriter():
+
+    def test_01_written_and_compressed(self, writer, tmp_path):
+        """
+        Test that artifacts are on disk after a flush, compressed ones with a .gz suffix.
+        """
+        screenshot = writer.submit("shot.webp", b"image")
+        page_source = writer.submit("page.html", b"<html></html>", compress=True)
+        assert ((screenshot, page_source) == (str(tmp_path / "shot.webp"), str(tmp_path / "page.html.gz")))
+        assert (writer.flush(timeout=5))
+        with open(screenshot, "rb") as screenshot_file, gzip.open(page_source) as page_source_file:
+            assert ((screenshot_file.read(), page_source_file.read()) == (b"image", b"<html></html>"))
+        assert (writer.written == 2)
+        assert (not [name for name in os.listdir(str(tmp_path)) if name.endswith(".tmp")])
+
+    def test_02_identical_content_written_once(self, writer, tmp_path):
+        """
+        Test that the same content submitted under another name returns the path of the first copy.
+        """
+        first = writer.submit("first.png", b"same")
+        assert (writer.submit("second.png", b"same") == first)
+        writer.flush(timeout=5)
+        assert (os.listdir(str(tmp_path)) == ["first.png"])
+        assert ((writer.written, writer.deduplicated) == (1, 1))
+
+    def test_03_full_queue_drops_the_artifact(self, writer, blocked_compression, tmp_path):
+        """
+        Test that an artifact is dropped when the queue stays full, and that its content can be submitted again.
+        """
+        writer.submit("busy.html", b"busy", compress=True)
+        while not writer._queue.empty():
+            time.sleep(0.01)  # Until the writer thread holds the first artifact.
+        assert (writer.submit("queued.png", b"queued") is not None)
+        assert (writer.submit("dropped.png", b"dropped") is None)
+        assert (writer.dropped == 1)
+        assert (not writer.flush(timeout=0.05))
+
+        blocked_compression.set()
+        assert (writer.flush(timeout=5))
+        assert (writer.submit("dropped.png", b"dropped") == str(tmp_path / "dropped.png"))
+        writer.flush(timeout=5)
+        assert (sorted(os.listdir(str(tmp_path))) == ["busy.html.gz", "dropped.png", "queued.png"])
+
+    def test_04_close_shared(self, tmp_path, monkeypatch):
+        """
+        Test that close_shared flushes the process-wide writer and the next shared() call starts a new one.
+        """
+        monkeypatch.setattr(ArtifactWriter, "_shared", ArtifactWriter(str(tmp_path)))
+        writer = ArtifactWriter.shared()
+        path = writer.submit("shot.png", b"image")
+        ArtifactWriter.close_shared(timeout=5)
+        assert (os.path.exists(path) and not writer._thread.is_alive())
+        assert (ArtifactWriter._shared is None)
+
+
+class TestArtifactName():
+
+    def test_01_name_from_the_running_test(self, monkeypatch):
+        """
+        Test the file name built from the current test node id, and without one.
+        """
+        monkeypatch.setattr(artifact_writer.time, "time", lambda: 1700000000.123)
+        monkeypatch.setenv("PYTEST_CURRENT_TEST", "tests/ui_tests/x_tests.py::TestX::test_page[a b] (call)")
+        assert (artifact_writer.artifact_name("navigation_error", ".webp") ==
+                "tests_ui_tests_x_tests.py__TestX__test_page_a_b-navigation_error-1700000000123.webp")
+        monkeypatch.delenv("PYTEST_CURRENT_TEST")
+        assert (artifact_writer.artifact_name("session", "html") == "session-1700000000123.html")
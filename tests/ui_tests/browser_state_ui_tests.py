@@ -0,0 +1,90 @@
+import json
+import os
+import stat
+import time
+import pytest
+from utils.ui_utils.browser_state import SEED_STORAGE_JS, BrowserStateSnapshot
+
+APP_URL = "https://manage.mist.com/admin/?org_id=1#!dashboard"
+SESSION_COOKIE = {"name": "sessionid", "value": "s", "domain": ".mist.com", "path": "/", "secure": True,
+                  "httpOnly": True, "sameSite": "Lax", "expires": -1, "size": 10, "session": True}
+
+
+def make_snapshot(cookies=None, expires_in=3600):
+    return BrowserStateSnapshot(APP_URL, [SESSION_COOKIE] if cookies is None else cookies, {"token": "t"},
+                                {"tab": "1"}, expires_at=time.time() + expires_in)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.current_url = APP_URL
+        self.commands = []
+        self.visited = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+        if cmd == "Network.getAllCookies":
+            return {"cookies": [SESSION_COOKIE]}
+        if cmd == "Page.addScriptToEvaluateOnNewDocument":
+            return {"identifier": "7"}
+        return {}
+
+    def execute_script(self, script, *args):
+        return {"localStorage": {"token": "t"}, "sessionStorage": {"tab": "1"}}
+
+    def get(self, url):
+        self.visited.append(url)
+
+
+class TestBrowserStateSnapshot():
+
+    def test_01_save_and_load(self, tmp_path):
+        """
+        Test that a saved snapshot loads back identical and is readable by its owner only.
+        """
+        snapshot = make_snapshot()
+        path = snapshot.save(str(tmp_path / "state" / "admin.json"))
+        assert (stat.S_IMODE(os.stat(path).st_mode) == 0o600)
+        assert (os.listdir(str(tmp_path / "state")) == ["admin.json"])
+        assert (BrowserStateSnapshot.load(path).to_dict() == snapshot.to_dict())
+
+    @pytest.mark.parametrize("content", [None, "{not json", '{"url": "x"}'])
+    def test_02_unreadable_snapshot(self, tmp_path, content):
+        """
+        Test that a missing, corrupt or incomplete snapshot file loads as None.
+        """
+        path = tmp_path / "admin.json"
+        if content is not None:
+            path.write_text(content)
+        assert (BrowserStateSnapshot.load(str(path)) is None)
+
+    def test_03_expiry(self, tmp_path):
+        """
+        Test that the snapshot expires with its ttl or with any of its cookies, session cookies never expiring.
+        """
+        assert (not make_snapshot().is_expired())
+        assert (make_snapshot(expires_in=-1).is_expired())
+        expired_cookie = dict(SESSION_COOKIE, expires=time.time() - 1)
+        assert (make_snapshot([SESSION_COOKIE, expired_cookie]).is_expired())
+        assert (not make_snapshot([dict(SESSION_COOKIE, expires=time.time() + 60)]).is_expired())
+        assert (BrowserStateSnapshot.load(make_snapshot(expires_in=-1).save(str(tmp_path / "old.json"))) is None)
+
+    def test_04_capture_and_restore(self):
+        """
+        Test that a captured snapshot restores its cookies, without the read-only or session expiry fields,
+        seeds the storage of its origin for one navigation only, then removes the script.
+        """
+        snapshot = BrowserStateSnapshot.capture(FakeDriver(), ttl=60)
+        assert ((snapshot.origin, snapshot.local_storage, snapshot.session_storage) ==
+                ("https://manage.mist.com", {"token": "t"}, {"tab": "1"}))
+        assert (snapshot.expires_at - snapshot.created_at == pytest.approx(60, abs=1))
+
+        driver = FakeDriver()
+        snapshot.restore(driver)
+        (cookie, ) = driver.commands[0][1]["cookies"]
+        assert (cookie == {"name": "sessionid", "value": "s", "domain": ".mist.com", "path": "/", "secure": True,
+                           "httpOnly": True, "sameSite": "Lax"})
+        assert (driver.commands[1] == ("Page.addScriptToEvaluateOnNewDocument", {"source": SEED_STORAGE_JS % (
+            json.dumps("https://manage.mist.com"), json.dumps({"token": "t"}), json.dumps({"tab": "1"}))}))
+        assert (driver.commands[2] == ("Page.removeScriptToEvaluateOnNewDocument", {"identifier": "7"}))
+        assert (driver.visited == [APP_URL])
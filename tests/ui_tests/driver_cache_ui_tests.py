@@ -0,0 +1,165 @@
+import errno
+import json
+import os
+import time
+import pytest
+from selenium.common.exceptions import SessionNotCreatedException
+from config.settings import Config
+from utils.ui_utils import ui_utils
+from utils.ui_utils.driver_cache import ChromeDriverCache, FileLock
+from utils.ui_utils.ui_utils import UIUtils
+
+
+def make_executable(path, mode=0o755):
+    with open(path, "w") as driver_file:
+        driver_file.write("#!/bin/sh\n")
+    os.chmod(path, mode)
+    return str(path)
+
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    """Driver cache in a temporary directory, for Chrome 120, with nothing resolved in this process"""
+    path = str(tmp_path / "cache" / "chromedriver.json")
+    monkeypatch.setattr(Config, "DRIVER_CACHE_FILE", path)
+    monkeypatch.setattr(ChromeDriverCache, "_resolved_path", None)
+    monkeypatch.setattr(ChromeDriverCache, "get_browser_version", staticmethod(lambda: "120.0"))
+    return path
+
+
+class CountingResolver:
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.path
+
+
+class TestFileLock():
+
+    def test_01_lock_file_lifecycle(self, tmp_path):
+        """
+        Test that the lock file exists while the lock is held, and not after.
+        """
+        path = str(tmp_path / "cache.lock")
+        with FileLock(path):
+            assert (os.path.exists(path))
+        assert (not os.path.exists(path))
+
+    def test_02_held_lock_times_out(self, tmp_path):
+        """
+        Test that a second holder waits, then gives up after its timeout.
+        """
+        path = str(tmp_path / "cache.lock")
+        with FileLock(path):
+            with pytest.raises(TimeoutError):
+                with FileLock(path, timeout=0.2):
+                    pass
+
+    def test_03_stale_lock_is_taken_over(self, tmp_path):
+        """
+        Test that a lock file abandoned for longer than stale_after is removed and the lock acquired.
+        """
+        path = str(tmp_path / "cache.lock")
+        with open(path, "w") as lock_file:
+            lock_file.write("12345")
+        os.utime(path, (time.time() - 600, time.time() - 600))
+        with FileLock(path, timeout=1, stale_after=300):
+            with open(path) as lock_file:
+                assert (lock_file.read() == str(os.getpid()))
+
+
+class TestChromeDriverCache():
+
+    def test_01_resolved_once_then_read_from_disk(self, cache_file, tmp_path, monkeypatch):
+        """
+        Test that the resolver runs once, later processes reading the path from the cache file.
+        """
+        resolver = CountingResolver(make_executable(tmp_path / "chromedriver"))
+        assert (ChromeDriverCache.resolve(resolver) == resolver.path)
+        assert (ChromeDriverCache.resolve(resolver) == resolver.path)
+        # Another process: nothing resolved in memory, the file is reused.
+        monkeypatch.setattr(ChromeDriverCache, "_resolved_path", None)
+        assert (ChromeDriverCache.resolve(resolver) == resolver.path)
+        assert (resolver.calls == 1)
+        with open(cache_file) as cache:
+            assert (json.load(cache)["browser_version"] == "120.0")
+
+    @pytest.mark.parametrize("stale", ["chrome_upgraded", "expired", "driver_not_executable", "corrupt"])
+    def test_02_stale_entry_is_resolved_again(self, cache_file, tmp_path, monkeypatch, stale):
+        """
+        Test that a Chrome upgrade, an expired entry, a driver gone non-executable or a corrupt file re-resolve.
+        """
+        resolver = CountingResolver(make_executable(tmp_path / "chromedriver"))
+        ChromeDriverCache.resolve(resolver)
+        monkeypatch.setattr(ChromeDriverCache, "_resolved_path", None)
+        if stale == "chrome_upgraded":
+            monkeypatch.setattr(ChromeDriverCache, "get_browser_version", staticmethod(lambda: "121.0"))
+        elif stale == "expired":
+            monkeypatch.setattr(Config, "DRIVER_CACHE_TTL", -1)
+        elif stale == "driver_not_executable":
+            os.chmod(resolver.path, 0o644)
+            resolver.path = make_executable(tmp_path / "chromedriver-new")
+        else:
+            with open(cache_file, "w") as cache:
+                cache.write("{not json")
+        assert (ChromeDriverCache.resolve(resolver) == resolver.path)
+        assert (resolver.calls == 2)
+
+    def test_03_invalidate(self, cache_file, tmp_path):
+        """
+        Test that invalidate forgets the path in memory and on disk.
+        """
+        resolver = CountingResolver(make_executable(tmp_path / "chromedriver"))
+        ChromeDriverCache.resolve(resolver)
+        ChromeDriverCache.invalidate()
+        assert (not os.path.exists(cache_file))
+        ChromeDriverCache.resolve(resolver)
+        assert (resolver.calls == 2)
+
+    def test_04_is_broken(self, tmp_path):
+        """
+        Test that only a missing, non-executable or foreign binary counts as a broken driver.
+        """
+        driver_path = make_executable(tmp_path / "chromedriver")
+        assert (not ChromeDriverCache.is_broken(driver_path, SessionNotCreatedException("Chrome crashed")))
+        assert (not ChromeDriverCache.is_broken(driver_path, OSError(errno.EADDRINUSE, "Address in use")))
+        assert (ChromeDriverCache.is_broken(driver_path, OSError(errno.ENOEXEC, "Exec format error")))
+        assert (ChromeDriverCache.is_broken(str(tmp_path / "missing")))
+        assert (ChromeDriverCache.is_broken(make_executable(tmp_path / "not-executable", 0o644)))
+
+
+class TestGetDriverCacheInvalidation():
+
+    @pytest.fixture
+    def failing_launch(self, tmp_path, monkeypatch):
+        """get_driver with every launch failing, recording the cache invalidations"""
+        invalidations = []
+        monkeypatch.setattr(Config, "BROWSER_PROFILE_ROOT", str(tmp_path / "profiles"))
+        monkeypatch.setattr(ChromeDriverCache, "invalidate", classmethod(lambda cls: invalidations.append(1)))
+
+        def launch(path, error):
+            monkeypatch.setattr(UIUtils, "_get_chromedriver_path", staticmethod(lambda: path))
+
+            def chrome(*args, **kwargs):
+                raise error
+            monkeypatch.setattr(ui_utils.webdriver, "Chrome", chrome)
+            with pytest.raises(Exception, match="All ChromeDriver initialization methods failed"):
+                UIUtils.get_driver()
+            return invalidations
+        return launch
+
+    def test_01_launch_errors_keep_the_cache(self, failing_launch, tmp_path):
+        """
+        Test that a Chrome crash or session error with a sound cached driver leaves the shared cache alone.
+        """
+        driver_path = make_executable(tmp_path / "chromedriver")
+        assert (failing_launch(driver_path, SessionNotCreatedException("Chrome crashed")) == [])
+
+    def test_02_broken_binary_invalidates_the_cache(self, failing_launch, tmp_path):
+        """
+        Test that a cached driver that can't be executed is dropped from the cache.
+        """
+        assert (failing_launch(str(tmp_path / "missing"), OSError(errno.ENOENT, "No such file")) == [1])
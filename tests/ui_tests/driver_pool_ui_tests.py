@@ -0,0 +1,164 @@
+import pytest
+from config.settings import Config
+from utils.ui_utils.driver_pool import DriverPool
+from utils.ui_utils.page_perf import LONG_TASK_OBSERVER_JS
+from utils.ui_utils.resource_policy import DISABLE_ANIMATIONS_JS
+from utils.ui_utils.ui_utils import UIUtils
+from utils.ui_utils.wait_utils import PAGE_INSTRUMENTATION_JS
+
+
+class FakeTab:
+    def __init__(self):
+        self.scripts = []
+        self.blocked_urls = []
+        self.history = []
+        self.session_storage = {}
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+    def new_window(self, kind):
+        handle = "tab-{}".format(self.driver._next_handle)
+        self.driver._next_handle += 1
+        self.driver.tabs[handle] = FakeTab()
+        self.driver.current_window_handle = handle
+
+    def default_content(self):
+        pass
+
+
+class FakeDriver:
+    """Chrome stand-in keeping the CDP setup, history and sessionStorage per tab, like the browser does."""
+
+    def __init__(self):
+        self.tabs = {"tab-0": FakeTab()}
+        self._next_handle = 1
+        self.current_window_handle = "tab-0"
+        self.switch_to = FakeSwitchTo(self)
+        self.local_storage = {}
+        self.cookies = []
+        self.quit_count = 0
+
+    @property
+    def tab(self):
+        return self.tabs[self.current_window_handle]
+
+    @property
+    def window_handles(self):
+        return list(self.tabs)
+
+    def get(self, url):
+        self.tab.history.append(url)
+
+    def close(self):
+        del self.tabs[self.current_window_handle]
+
+    def quit(self):
+        self.quit_count += 1
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def set_window_size(self, width, height):
+        pass
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Page.addScriptToEvaluateOnNewDocument":
+            self.tab.scripts.append(params["source"])
+            return {"identifier": str(len(self.tab.scripts))}
+        if cmd == "Network.setBlockedURLs":
+            self.tab.blocked_urls = params["urls"]
+        elif cmd == "Page.getNavigationHistory":
+            return {"currentIndex": len(self.tab.history) - 1,
+                    "entries": [{"url": url} for url in self.tab.history]}
+        elif cmd == "Page.resetNavigationHistory":
+            self.tab.history = self.tab.history[-1:]
+        elif cmd == "Storage.clearDataForOrigin":
+            self.local_storage.pop(params["origin"], None)
+        elif cmd == "DOMStorage.clear":
+            self.tab.session_storage.pop(params["storageId"]["securityOrigin"], None)
+        elif cmd == "Network.clearBrowserCookies":
+            self.cookies = []
+        return {}
+
+
+@pytest.fixture
+def prepared_driver_factory(monkeypatch):
+    """Factory of fake drivers set up by UIUtils._prepare_driver, with every per-tab feature turned on"""
+    monkeypatch.setattr(Config, "BLOCKED_URL_PATTERNS", "*.png*")
+    monkeypatch.setattr(Config, "BLOCKED_RESOURCE_TYPES", "")
+    monkeypatch.setattr(Config, "DISABLE_ANIMATIONS", True)
+    monkeypatch.setattr(Config, "CAPTURE_PAGE_PERF", True)
+    return lambda: UIUtils._prepare_driver(FakeDriver())
+
+
+class TestDriverPool():
+
+    def test_01_released_driver_keeps_its_setup(self, prepared_driver_factory):
+        """
+        Test that a re-leased driver still has the page scripts and blocked URLs installed by _prepare_driver.
+        """
+        pool = DriverPool(size=1, driver_factory=prepared_driver_factory, warmup_url="").start()
+        driver = pool.checkout(timeout=1)
+        setup = (list(driver.tab.scripts), list(driver.tab.blocked_urls))
+        assert (setup == ([PAGE_INSTRUMENTATION_JS, LONG_TASK_OBSERVER_JS, DISABLE_ANIMATIONS_JS], ["*.png*"]))
+        pool.checkin(driver)
+
+        for _ in range(2):
+            driver = pool.checkout(timeout=1)
+            assert ((driver.tab.scripts, driver.tab.blocked_urls) == setup)
+            pool.checkin(driver)
+        pool.close()
+
+    def test_02_reset_clears_every_visited_origin(self, prepared_driver_factory):
+        """
+        Test that the storage of every origin visited in any tab is cleared, along with the extra tabs and cookies.
+        """
+        pool = DriverPool(size=1, driver_factory=prepared_driver_factory, warmup_url="").start()
+        driver = pool.checkout(timeout=1)
+        driver.get("https://app.example.com/signin")
+        driver.get("https://sso.example.com/login?next=/")
+        driver.tab.session_storage = {"https://app.example.com": {"k": "v"}, "https://sso.example.com": {"k": "v"}}
+        driver.switch_to.new_window("tab")
+        driver.get("http://localhost:8000/report")
+        driver.local_storage = {origin: {"k": "v"} for origin in
+                                ("https://app.example.com", "https://sso.example.com", "http://localhost:8000")}
+        driver.cookies = [{"name": "session"}]
+        pool.checkin(driver)
+
+        driver = pool.checkout(timeout=1)
+        assert (driver.window_handles == ["tab-0"])
+        assert (driver.local_storage == {} and driver.tab.session_storage == {} and driver.cookies == [])
+        assert (driver.tab.history == ["about:blank"])
+        pool.checkin(driver)
+        pool.close()
+
+    def test_03_failed_replacement_keeps_the_slot(self):
+        """
+        Test that a replacement that can't be launched fails the next checkout instead of losing the slot.
+        """
+        launches = []
+
+        def flaky_factory():
+            launches.append(len(launches))
+            if len(launches) in (2, 3):
+                raise OSError("chrome failed to start")
+            return FakeDriver()
+
+        pool = DriverPool(size=1, driver_factory=flaky_factory, warmup_url="").start()
+        driver = pool.checkout(timeout=1)
+        driver.tabs.clear()  # Crashed: no window left, the reset fails.
+        pool.checkin(driver)
+        with pytest.raises(OSError, match="chrome failed to start"):
+            pool.checkout(timeout=1)
+        assert (isinstance(pool.checkout(timeout=1), FakeDriver))
+        assert (len(launches) == 4)
+        pool.close()
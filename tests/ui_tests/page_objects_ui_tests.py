@@ -0,0 +1,65 @@
+import pytest
+from selenium.webdriver.common.by import By
+from config.settings import Config
+from libs.ui_libs.page_objects import CREATE_ACCOUNT_PAGE, SIGNIN_PAGE, PageObject, PageRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """PageRegistry holding only the shipped pages; pages registered by the test are dropped afterwards"""
+    monkeypatch.setattr(PageRegistry, "_pages", PageRegistry.all())
+    monkeypatch.setattr(Config, "UI_BASE_URL", "https://manage.mist.com/")
+    return PageRegistry
+
+
+class TestPageObject():
+
+    def test_01_url_and_locators(self, monkeypatch):
+        """
+        Test that the page URL is joined to UI_BASE_URL, with or without its trailing slash, and the locator lookup.
+        """
+        page = PageObject("dashboard", "admin/#!dashboard", {"title": (By.TAG_NAME, "h1")})
+        for base_url in ("https://manage.mist.com", "https://manage.mist.com/"):
+            monkeypatch.setattr(Config, "UI_BASE_URL", base_url)
+            assert (page.url == "https://manage.mist.com/admin/#!dashboard")
+        assert (page["title"] == (By.TAG_NAME, "h1"))
+        with pytest.raises(KeyError, match="Page dashboard has no locator named subtitle"):
+            page["subtitle"]
+
+
+class TestPageRegistry():
+
+    def test_01_shipped_pages(self, registry):
+        """
+        Test that the shipped pages are registered under their names.
+        """
+        assert (registry.get("signin") is SIGNIN_PAGE and registry.get("create_account") is CREATE_ACCOUNT_PAGE)
+
+    def test_02_register_errors(self, registry):
+        """
+        Test that a name can't be registered twice and that an unknown page lists the registered ones.
+        """
+        with pytest.raises(ValueError, match="Page signin is already registered"):
+            registry.register(PageObject("signin", "other.html", {}))
+        assert (registry.get("signin") is SIGNIN_PAGE)
+        with pytest.raises(KeyError, match="Unknown page dashboard. Registered pages: create_account, signin"):
+            registry.get("dashboard")
+
+    def test_03_all_is_a_copy(self, registry):
+        """
+        Test that changing the mapping returned by all() doesn't change the registry.
+        """
+        pages = registry.all()
+        pages.pop("signin")
+        assert ("signin" in registry.all())
+
+    def test_04_reverse_lookups(self, registry):
+        """
+        Test the page and locator names found back from a URL or a (By, value) locator, list or tuple.
+        """
+        assert (registry.find_page_name("https://manage.mist.com/signin.html") == "signin")
+        assert (registry.find_page_name("https://manage.mist.com/signin.html#!signup/register") == "create_account")
+        assert (registry.find_page_name("https://manage.mist.com/admin") is None)
+        assert (registry.find_locator_name((By.NAME, "password2")) == "create_account.confirm_password")
+        assert (registry.find_locator_name([By.NAME, "first_name"]) == "create_account.first_name")
+        assert (registry.find_locator_name((By.ID, "password2")) is None)
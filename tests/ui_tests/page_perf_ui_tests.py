@@ -0,0 +1,130 @@
+import json
+import os
+import pytest
+from utils.ui_utils import page_perf
+from utils.ui_utils.page_perf import PagePerfRecorder
+
+SIGNIN_URL = "https://manage.mist.com/signin.html"
+
+
+@pytest.fixture(autouse=True)
+def recorder(monkeypatch):
+    """PagePerfRecorder with no samples; the ones of the session are restored after the test"""
+    monkeypatch.setattr(PagePerfRecorder, "_samples", {})
+    return PagePerfRecorder
+
+
+@pytest.fixture
+def history_file(tmp_path):
+    return str(tmp_path / "reports" / "page_perf_history.json")
+
+
+def write_history(path, runs):
+    """Write a history of runs given as (run_id, {page: [load_ms, ...]})."""
+    document = {"runs": [{"run_id": run_id, "timestamp": index, "pages": {
+        page: [{"load_ms": value} for value in values] for page, values in pages.items()}}
+        for index, (run_id, pages) in enumerate(runs)]}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as history:
+        json.dump(document, history)
+
+
+def load_rows(path, **kwargs):
+    return [row for row in page_perf.trend_report(path, run_id="current", **kwargs) if row["metric"] == "load_ms"]
+
+
+class TestPagePerfRecorder():
+
+    def test_01_samples_grouped_by_page(self):
+        """
+        Test that samples are grouped by URL without its query string, the fragment being kept.
+        """
+        PagePerfRecorder.record(SIGNIN_URL + "?next=/admin", {"load_ms": 30})
+        PagePerfRecorder.record(SIGNIN_URL, {"load_ms": 10})
+        PagePerfRecorder.record(SIGNIN_URL + "?x=1#!signup/register", {"load_ms": 50})
+        summary = PagePerfRecorder.summary()
+        assert (list(summary) == [SIGNIN_URL, SIGNIN_URL + "#!signup/register"])
+        assert ((summary[SIGNIN_URL]["count"], summary[SIGNIN_URL]["load_ms_p50"]) == (2, 10))
+
+    def test_02_save_history_merges_the_processes_of_a_run(self, history_file):
+        """
+        Test that every process of a run adds its samples to the same run entry and only max_runs are kept.
+        """
+        for run_id in ("run-1", "run-2"):
+            PagePerfRecorder.record(SIGNIN_URL, {"load_ms": 10})
+            PagePerfRecorder.save_history(history_file, run_id=run_id, max_runs=2)
+            PagePerfRecorder.reset()
+        # Two workers of run-3.
+        for load_ms in (20, 30):
+            PagePerfRecorder.record(SIGNIN_URL, {"load_ms": load_ms})
+            PagePerfRecorder.save_history(history_file, run_id="run-3", max_runs=2)
+            PagePerfRecorder.reset()
+        runs = page_perf.load_history(history_file)["runs"]
+        assert ([run["run_id"] for run in runs] == ["run-2", "run-3"])
+        assert (runs[1]["pages"][SIGNIN_URL] == [{"load_ms": 20}, {"load_ms": 30}])
+
+    def test_03_corrupt_history_starts_empty(self, tmp_path):
+        """
+        Test that a missing or corrupt history file reads as no runs.
+        """
+        corrupt = tmp_path / "history.json"
+        corrupt.write_text("{not json")
+        assert (page_perf.load_history(str(corrupt)) == {"runs": []})
+        assert (page_perf.load_history(str(tmp_path / "missing.json")) == {"runs": []})
+
+
+class TestTrendReport():
+
+    def test_01_baseline_is_the_median_of_the_run_medians(self, history_file):
+        """
+        Test that one slow run doesn't move the baseline and that the current median is compared to it.
+        """
+        write_history(history_file, [("a", {SIGNIN_URL: [100, 100, 900]}), ("b", {SIGNIN_URL: [90, 110]}),
+                                     ("c", {SIGNIN_URL: [5000]}), ("current", {SIGNIN_URL: [120, 130, 10]})])
+        (row, ) = load_rows(history_file, threshold_pct=25, min_baseline_runs=3)
+        assert ((row["baseline"], row["current"], row["runs"]) == (100, 120, 3))
+        assert ((row["change_pct"], row["regressed"]) == (20.0, False))
+
+    @pytest.mark.parametrize("current, regressed", [([125], False), ([126], True), ([50], False)])
+    def test_02_regression_above_the_threshold(self, history_file, current, regressed):
+        """
+        Test that only an increase strictly above the threshold is a regression.
+        """
+        write_history(history_file, [("a", {SIGNIN_URL: [100]}), ("b", {SIGNIN_URL: [100]}),
+                                     ("current", {SIGNIN_URL: current})])
+        (row, ) = load_rows(history_file, threshold_pct=25, min_baseline_runs=2)
+        assert (row["regressed"] is regressed)
+
+    def test_03_pages_without_enough_baseline_runs_are_not_judged(self, history_file):
+        """
+        Test that a new page, a page seen in too few runs, or a zero baseline is never a regression.
+        """
+        other_url = "https://manage.mist.com/admin/"
+        write_history(history_file, [("a", {SIGNIN_URL: [100], "https://manage.mist.com/zero": [0]}),
+                                     ("b", {"https://manage.mist.com/zero": [0]}),
+                                     ("current", {SIGNIN_URL: [1000], other_url: [1000],
+                                                  "https://manage.mist.com/zero": [1000]})])
+        rows = {row["page"]: row for row in load_rows(history_file, threshold_pct=25, min_baseline_runs=2)}
+        assert ((rows[SIGNIN_URL]["runs"], rows[SIGNIN_URL]["baseline"]) == (1, None))
+        assert ((rows[other_url]["runs"], rows[other_url]["baseline"]) == (0, None))
+        assert ((rows["https://manage.mist.com/zero"]["baseline"], rows["https://manage.mist.com/zero"]["change_pct"])
+                == (0, None))
+        assert (not any(row["regressed"] for row in rows.values()))
+
+    def test_04_run_not_in_history(self, history_file):
+        """
+        Test that there is nothing to report when the current run saved no samples.
+        """
+        write_history(history_file, [("a", {SIGNIN_URL: [100]})])
+        assert (page_perf.trend_report(history_file, run_id="current") == [])
+
+    def test_05_format_trend(self, history_file):
+        """
+        Test the status column of the table and the page labels.
+        """
+        write_history(history_file, [("a", {SIGNIN_URL: [100]}), ("current", {SIGNIN_URL: [200], "/new": [10]})])
+        rows = load_rows(history_file, threshold_pct=25, min_baseline_runs=1)
+        lines = page_perf.format_trend(rows, {SIGNIN_URL: "signin"}).splitlines()
+        assert (len(lines) == 4)
+        assert (lines[2].split() == ["/new", "load_ms", "-", "10", "-", "0", "no", "baseline"])
+        assert (lines[3].split() == ["signin", "load_ms", "100", "200", "+100.0%", "1", "REGRESSION"])
@@ -0,0 +1,145 @@
+import itertools
+import json
+import os
+import socket
+from types import SimpleNamespace
+import pytest
+from config.settings import Config
+from utils.ui_utils import parallel_utils
+from utils.ui_utils.parallel_utils import TestDurationHistory
+
+
+@pytest.fixture
+def port_block(monkeypatch):
+    """Blocks of 3 remote debugging ports starting at a port free on this host, with a fresh port counter"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        base_port = probe.getsockname()[1]
+    monkeypatch.setattr(Config, "REMOTE_DEBUGGING_BASE_PORT", base_port)
+    monkeypatch.setattr(Config, "REMOTE_DEBUGGING_PORTS_PER_WORKER", 3)
+    monkeypatch.setattr(parallel_utils, "_port_counter", itertools.count())
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw0")
+    return base_port
+
+
+def listen(port):
+    server = socket.socket()
+    server.bind(("127.0.0.1", port))
+    server.listen()
+    return server
+
+
+class TestWorkerIds():
+
+    def test_01_worker_id_and_index(self, monkeypatch):
+        """
+        Test the worker id and index under xdist and without it.
+        """
+        monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw3")
+        assert ((parallel_utils.get_worker_id(), parallel_utils.get_worker_index()) == ("gw3", 3))
+        monkeypatch.delenv("PYTEST_XDIST_WORKER")
+        assert ((parallel_utils.get_worker_id(), parallel_utils.get_worker_index()) == ("master", 0))
+
+
+class TestRemoteDebuggingPorts():
+
+    def test_01_ports_of_the_worker_block_in_turn(self, port_block, monkeypatch):
+        """
+        Test that a worker hands out the ports of its own block in turn, wrapping around once they are free again.
+        """
+        ports = [parallel_utils.next_remote_debugging_port() for _ in range(4)]
+        assert (ports == [port_block, port_block + 1, port_block + 2, port_block])
+        monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw2")
+        assert (parallel_utils.next_remote_debugging_port() == port_block + 2 * 3 + 1)
+
+    def test_02_ports_in_use_are_skipped(self, port_block):
+        """
+        Test that a port still used by a browser is not handed out again.
+        """
+        with listen(port_block), listen(port_block + 1):
+            assert (parallel_utils.next_remote_debugging_port() == port_block + 2)
+
+    def test_03_full_block_raises(self, port_block):
+        """
+        Test that an error is raised when every port of the block is in use, instead of reusing one.
+        """
+        with listen(port_block), listen(port_block + 1), listen(port_block + 2):
+            with pytest.raises(RuntimeError, match="All 3 remote debugging ports of worker gw0"):
+                parallel_utils.next_remote_debugging_port()
+
+
+class TestParallelBrowsers():
+
+    @pytest.mark.parametrize("args, expected", [
+        ([], True),
+        (["tests"], True),
+        (["tests/ui_tests"], True),
+        (["tests/ui_tests/driver_pool_ui_tests.py::TestDriverPool::test_01_released_driver_keeps_its_setup"], True),
+        (["tests/api_tests"], False),
+        (["tests/api_tests/org_api_tests.py", "tests/api_tests/async_org_api_tests.py"], False),
+        (["tests/api_tests", "tests/ui_tests/driver_pool_ui_tests.py"], True),
+        (["tests/ui_tests_old"], False),
+    ])
+    def test_01_selects_ui_tests(self, args, expected):
+        """
+        Test which pytest arguments select UI tests.
+        """
+        assert (parallel_utils.selects_ui_tests(args, "tests/ui_tests") is expected)
+
+    def test_02_max_parallel_browsers(self, monkeypatch):
+        """
+        Test the cap by CPU count, memory and MAX_UI_WORKERS, never below one browser.
+        """
+        monkeypatch.setattr(os, "cpu_count", lambda: 8)
+        monkeypatch.setattr(Config, "MAX_UI_WORKERS", 0)
+        monkeypatch.setattr(Config, "BROWSER_MEMORY_MB", 1)
+        available_mb = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+        assert (parallel_utils.max_parallel_browsers() == min(8, available_mb))
+        monkeypatch.setattr(Config, "MAX_UI_WORKERS", 3)
+        assert (parallel_utils.max_parallel_browsers() == min(3, available_mb))
+        monkeypatch.setattr(Config, "BROWSER_MEMORY_MB", 10 ** 9)
+        assert (parallel_utils.max_parallel_browsers() == 1)
+
+
+class TestDurationHistoryOrder():
+
+    @staticmethod
+    def items(*nodeids):
+        return [SimpleNamespace(nodeid=nodeid) for nodeid in nodeids]
+
+    def test_01_slowest_files_first(self, tmp_path):
+        """
+        Test that files are ordered by historical duration, unknown files after in collection order,
+        tests keeping their order within a file.
+        """
+        history = TestDurationHistory(str(tmp_path / "durations.json"))
+        history.durations = {"b.py": 10.0, "c.py": 30.0}
+        items = self.items("a.py::t1", "b.py::t1", "a.py::t2", "c.py::t1", "d.py::t1", "b.py::t2", "c.py::t2")
+        history.sort_items(items)
+        assert ([item.nodeid for item in items] ==
+                ["c.py::t1", "c.py::t2", "b.py::t1", "b.py::t2", "a.py::t1", "a.py::t2", "d.py::t1"])
+
+    def test_02_save_merges_the_run_as_a_moving_average(self, tmp_path):
+        """
+        Test that the phases of a run are summed per file and averaged with the history on save.
+        """
+        path = str(tmp_path / "history" / "durations.json")
+        with open(os.path.join(str(tmp_path), "seed.json"), "w") as seed:
+            json.dump({"a.py": 10.0}, seed)
+        os.makedirs(os.path.dirname(path))
+        os.replace(os.path.join(str(tmp_path), "seed.json"), path)
+
+        history = TestDurationHistory(path)
+        for nodeid, duration in [("a.py::t1", 1.0), ("a.py::t1", 3.0), ("b.py::t1", 2.0), ("b.py::t2", 0.5)]:
+            history.record(nodeid, duration)
+        history.save(smoothing=0.5)
+        assert (TestDurationHistory(path).durations == {"a.py": 7.0, "b.py": 2.5})
+
+    def test_03_missing_or_corrupt_history(self, tmp_path):
+        """
+        Test that a missing or corrupt history file starts empty.
+        """
+        assert (TestDurationHistory(str(tmp_path / "missing.json")).durations == {})
+        corrupt = tmp_path / "corrupt.json"
+        corrupt.write_text("{not json")
+        assert (TestDurationHistory(str(corrupt)).durations == {})
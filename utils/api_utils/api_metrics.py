@@ -0,0 +1,222 @@
+"""Per-request latency instrumentation for the API layer."""
+import json
+import math
+import os
+import threading
+import time
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from utils.api_utils.endpoints import endpoint_template
+
+_connection_timings = threading.local()
+
+TIMING_FIELDS = ("total", "ttfb", "connect", "tls")
+PERCENTILES = (50, 95, 99)
+
+
+def _add_connection_timing(name, seconds):
+    timings = getattr(_connection_timings, "value", None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """HTTPConnection recording how long opening the socket (DNS + TCP connect) took."""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        _add_connection_timing("connect", time.perf_counter() - start)
+        return sock
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """HTTPSConnection recording the socket open time and the TLS handshake time separately."""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        _add_connection_timing("connect", time.perf_counter() - start)
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        timings = getattr(_connection_timings, "value", None)
+        connect_before = timings.get("connect", 0.0) if timings is not None else 0.0
+        super().connect()
+        if timings is not None:
+            socket_time = timings.get("connect", 0.0) - connect_before
+            _add_connection_timing("tls", time.perf_counter() - start - socket_time)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES_BY_SCHEME = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+
+class LatencyRecorder:
+    """
+    Process-wide collector of API call timings, aggregated by "<METHOD> <endpoint template>".
+
+    Each sample holds:
+        total: Wall time of the call, retries and throttling included
+        ttfb: Time from sending the request to parsing the response headers (last attempt)
+        connect: DNS + TCP connect time, 0 when a pooled connection was reused
+        tls: TLS handshake time, 0 when a pooled connection was reused
+        request_bytes / response_bytes: Body sizes
+    """
+
+    _lock = threading.Lock()
+    _samples = {}
+
+    @staticmethod
+    def start():
+        """Start collecting connection timings for the request about to be sent on this thread."""
+        _connection_timings.value = {}
+        return time.perf_counter()
+
+    @classmethod
+    def stop(cls, method, url, started_at, response=None):
+        """
+        Record the call started by start(). Connection timings collected on this thread are consumed.
+
+        Args:
+            method: HTTP method
+            url: Concrete request URL
+            started_at: Value returned by start()
+            response: The requests.Response, if one was received
+        """
+        total = time.perf_counter() - started_at
+        timings = getattr(_connection_timings, "value", None) or {}
+        _connection_timings.value = None
+        sample = {
+            "total": total,
+            "ttfb": response.elapsed.total_seconds() if response is not None else total,
+            "connect": timings.get("connect", 0.0),
+            "tls": timings.get("tls", 0.0),
+            "new_connection": "connect" in timings,
+            "request_bytes": cls._body_size(response.request.body) if response is not None else 0,
+            "response_bytes": cls._response_size(response) if response is not None else 0,
+            "failed": response is None,
+        }
+        endpoint = "{} {}".format(method, endpoint_template(url))
+        with cls._lock:
+            cls._samples.setdefault(endpoint, []).append(sample)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._samples = {}
+
+    @classmethod
+    def samples(cls):
+        """Copy of the raw samples per endpoint, e.g. to send them from an xdist worker to the controller."""
+        with cls._lock:
+            return {endpoint: [dict(sample) for sample in samples] for endpoint, samples in cls._samples.items()}
+
+    @classmethod
+    def merge(cls, samples_by_endpoint):
+        """
+        Add samples collected by another process, as returned by samples().
+
+        Args:
+            samples_by_endpoint: endpoint -> list of samples
+        """
+        with cls._lock:
+            for endpoint, samples in samples_by_endpoint.items():
+                cls._samples.setdefault(endpoint, []).extend(dict(sample) for sample in samples)
+
+    @classmethod
+    def summary(cls):
+        """
+        Aggregate the samples per endpoint.
+
+        Returns:
+            dict: endpoint -> {count, failed, new_connections, <field>_p50/p95/p99 in ms,
+                               avg_request_bytes, avg_response_bytes}
+        """
+        with cls._lock:
+            samples_by_endpoint = {endpoint: list(samples) for endpoint, samples in cls._samples.items()}
+
+        summary = {}
+        for endpoint, samples in sorted(samples_by_endpoint.items()):
+            stats = {
+                "count": len(samples),
+                "failed": sum(1 for sample in samples if sample["failed"]),
+                "new_connections": sum(1 for sample in samples if sample["new_connection"]),
+                "avg_request_bytes": sum(sample["request_bytes"] for sample in samples) / len(samples),
+                "avg_response_bytes": sum(sample["response_bytes"] for sample in samples) / len(samples),
+            }
+            for field in TIMING_FIELDS:
+                values = sorted(sample[field] for sample in samples)
+                for pct in PERCENTILES:
+                    stats["{}_p{}_ms".format(field, pct)] = round(percentile(values, pct) * 1000, 2)
+            summary[endpoint] = stats
+        return summary
+
+    @classmethod
+    def format_table(cls, labels=None):
+        """
+        Render the summary as a fixed-width text table.
+
+        Args:
+            labels: Optional mapping of endpoint template -> display name, e.g. "/orgs/{}" -> "CONST_API_ORG_DETAILS"
+        """
+        labels = labels or {}
+        header = "{:<48} {:>6} {:>5} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+            "endpoint", "count", "new", "p50 ms", "p95 ms", "p99 ms", "ttfb p50", "conn p95", "tls p95")
+        lines = [header, "-" * len(header)]
+        for endpoint, stats in cls.summary().items():
+            method, template = endpoint.split(" ", 1)
+            lines.append("{:<48} {:>6} {:>5} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+                "{} {}".format(method, labels.get(template, template))[:48], stats["count"],
+                stats["new_connections"], stats["total_p50_ms"], stats["total_p95_ms"], stats["total_p99_ms"],
+                stats["ttfb_p50_ms"], stats["connect_p95_ms"], stats["tls_p95_ms"]))
+        return "\n".join(lines)
+
+    @classmethod
+    def write_json(cls, path, extra=None):
+        """
+        Write the summary as JSON.
+
+        Args:
+            path: Output file path. Parent directories are created.
+            extra: Optional dict merged into the top level of the document
+        """
+        document = {"endpoints": cls.summary()}
+        document.update(extra or {})
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as report_file:
+            json.dump(document, report_file, indent=2, sort_keys=True)
+        return path
+
+    @staticmethod
+    def _response_size(response):
+        # Reading .content of a streamed response would download it before the caller iterates over it.
+        if not response._content_consumed:
+            return int(response.headers.get("Content-Length") or 0)
+        return len(response.content or b"")
+
+    @staticmethod
+    def _body_size(body):
+        if body is None:
+            return 0
+        if isinstance(body, str):
+            return len(body.encode("utf-8"))
+        return len(body)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
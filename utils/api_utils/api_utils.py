@@ -3,19 +3,119 @@ import requests
 import json
 from typing import Dict, Any, Optional, Tuple, Union
 from config.settings import Config
+from utils.api_utils.connection_pool import SharedConnectionPool
+from utils.api_utils.request_scheduler import RequestScheduler
+from utils.api_utils.api_metrics import LatencyRecorder
+from utils.api_utils.lazy_response import LazyResponse
+from utils.log_utils import CORRELATION_ID_HEADER, get_correlation_id, get_logger
 import logging
 
+log = get_logger(__name__, "CommonAPIUtils")
+
 class CommonAPIUtils:
     """Utility class for API operations."""
 
     def __init__(self):
         self.base_url = Config.BASE_URL
-        self.session = requests.Session()
-        self.headers = {
+        self._headers = {
             'Content-Type': 'application/json'
         }
         if Config.API_TOKEN:
-            self.headers['Authorization'] = f'Token {Config.API_TOKEN}'
+            self._headers['Authorization'] = f'Token {Config.API_TOKEN}'
+        self.scheduler = RequestScheduler.shared()
+
+    @property
+    def headers(self):
+        """Request headers, with the correlation id of the running test (see utils.log_utils)."""
+        return dict(self._headers, **{CORRELATION_ID_HEADER: get_correlation_id()})
+
+    @property
+    def session(self):
+        """Pooled session of the calling thread, so one instance can be shared across threads."""
+        return SharedConnectionPool.get_session()
+
+    def _send(self, method, url, send):
+        """
+        Send a request through the scheduler and record its latency.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            send: Callable performing a single attempt of the request
+
+        Returns:
+            requests.Response
+        """
+        started_at = LatencyRecorder.start()
+        response = None
+        try:
+            response = self.scheduler.execute(method, url, send)
+            return response
+        finally:
+            LatencyRecorder.stop(method, url, started_at, response)
+
+    @staticmethod
+    def _parse(method, url, response):
+        """
+        Parse the response body once. The body is only rendered for logging when DEBUG is enabled.
+
+        Returns:
+            Tuple of (response_json, status_code), the text instead of the JSON if the body isn't JSON
+        """
+        log.info("%s %s completed - Status Code: %d", method, url, response.status_code, endpoint=url)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s %s response body: %s", method, url, response.text, endpoint=url)
+        return LazyResponse(response).data, response.status_code
+
+    def request(self, method, url, data=None, stream=False):
+        """
+        Send a request and return the response unparsed, for callers that only need a few fields,
+        the status code, or to stream a large list.
+
+        Args:
+            method: HTTP method
+            url: API endpoint
+            data: Optional data to send as the JSON body
+            stream: Download the body as it is consumed, see LazyResponse.iter_items
+
+        Returns:
+            LazyResponse
+        """
+        try:
+            response = self._send(method, url, lambda: self.session.request(
+                method,
+                url,
+                json=data,
+                headers=self.headers,
+                timeout=Config.TIMEOUT,
+                stream=stream
+            ))
+            log.info("%s %s completed - Status Code: %d", method, url, response.status_code, endpoint=url)
+            return LazyResponse(response)
+
+        except requests.exceptions.RequestException as e:
+            logging.error("%s request failed for %s: %s", method, url, str(e))
+            raise
+
+    def iter_list(self, url, key=None, expected_status_code=200):
+        """
+        Stream the elements of a list endpoint, e.g. CONST_API_ORG_INVENTORY, without parsing the whole body.
+
+        Args:
+            url: API endpoint
+            key: Top-level key holding the list when the body is an object, e.g. "results"
+            expected_status_code: Expected HTTP status code
+
+        Yields:
+            The list elements, one at a time
+        """
+        response = self.request("GET", url, stream=True)
+        if response.status_code != expected_status_code:
+            response.close()
+            raise AssertionError(
+                f'E: CommonAPIUtils() :: GET request failed. Expected status {expected_status_code}, '
+                f'got {response.status_code}')
+        yield from response.iter_items(key)
 
     def post(self, url, data):
         """
@@ -29,20 +129,13 @@ class CommonAPIUtils:
             Tuple of (response_json, status_code)
         """
         try:
-            response = self.session.post(
+            response = self._send("POST", url, lambda: self.session.post(
                 url,
                 data=json.dumps(data),
                 headers=self.headers,
                 timeout=Config.TIMEOUT
-            )
-            logging.info("POST %s completed - Status Code: %d", url, response.status_code)
-
-            logging.info(response.json())
-            # Handle different response types
-            try:
-                return response.json(), response.status_code
-            except json.JSONDecodeError:
-                return response.text, response.status_code
+            ))
+            return self._parse("POST", url, response)
 
         except requests.exceptions.RequestException as e:
             logging.error("POST request failed for %s: %s", url, str(e))
@@ -87,18 +180,12 @@ class CommonAPIUtils:
             Tuple of (response_json, status_code)
         """
         try:
-            response = self.session.get(
+            response = self._send("GET", url, lambda: self.session.get(
                 url,
                 headers=self.headers,
                 timeout=Config.TIMEOUT
-            )
-            logging.info("GET %s completed - Status Code: %d", url, response.status_code)
-
-            # Handle different response types
-            try:
-                return response.json(), response.status_code
-            except json.JSONDecodeError:
-                return response.text, response.status_code
+            ))
+            return self._parse("GET", url, response)
 
         except requests.exceptions.RequestException as e:
             logging.error("GET request failed for %s: %s", url, str(e))
@@ -143,19 +230,13 @@ class CommonAPIUtils:
             Tuple of (response_json, status_code)
         """
         try:
-            response = self.session.put(
+            response = self._send("PUT", url, lambda: self.session.put(
                 url,
                 json=data,
                 headers=self.headers,
                 timeout=Config.TIMEOUT
-            )
-            logging.info("PUT %s completed - Status Code: %d", url, response.status_code)
-
-            # Handle different response types
-            try:
-                return response.json(), response.status_code
-            except json.JSONDecodeError:
-                return response.text, response.status_code
+            ))
+            return self._parse("PUT", url, response)
 
         except requests.exceptions.RequestException as e:
             logging.error("PUT request failed for %s: %s", url, str(e))
@@ -199,18 +280,12 @@ class CommonAPIUtils:
             Tuple of (response_json, status_code)
         """
         try:
-            response = self.session.delete(
+            response = self._send("DELETE", url, lambda: self.session.delete(
                 url,
                 headers=self.headers,
                 timeout=Config.TIMEOUT
-            )
-            logging.info("DELETE %s completed - Status Code: %d", url, response.status_code)
-
-            # Handle different response types
-            try:
-                return response.json(), response.status_code
-            except json.JSONDecodeError:
-                return response.text, response.status_code
+            ))
+            return self._parse("DELETE", url, response)
 
         except requests.exceptions.RequestException as e:
             logging.error("DELETE request failed for %s: %s", url, str(e))
@@ -253,22 +328,17 @@ class CommonAPIUtils:
         Returns:
             Tuple of (response_json, status_code)
         """
-        logging.info("Making PATCH request to: %s", url)
-        logging.debug("PATCH request data: %s", json.dumps(data, indent=2))
+        log.info("Making PATCH request to: %s", url, endpoint=url)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("PATCH request data: %s", json.dumps(data, indent=2), endpoint=url)
         try:
-            response = self.session.patch(
+            response = self._send("PATCH", url, lambda: self.session.patch(
                 url,
                 json=data,
                 headers=self.headers,
                 timeout=Config.TIMEOUT
-            )
-            logging.info("PATCH %s completed - Status Code: %d", url, response.status_code)
-
-            # Handle different response types
-            try:
-                return response.json(), response.status_code
-            except json.JSONDecodeError:
-                return response.text, response.status_code
+            ))
+            return self._parse("PATCH", url, response)
 
         except requests.exceptions.RequestException as e:
             logging.error("PATCH request failed for %s: %s", url, str(e))
@@ -0,0 +1,150 @@
+"""Asyncio counterpart of CommonAPIUtils for concurrent CRUD operations."""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Config
+from utils.api_utils.api_utils import CommonAPIUtils
+from utils.log_utils import with_test_context
+
+
+class AsyncCommonAPIUtils:
+    """
+    Async utility class for API operations.
+
+    Each coroutine runs the matching CommonAPIUtils method on a worker thread, so requests
+    go through the same pooled transport and the status code validation and error wrapping
+    are exactly the ones of the synchronous client. At most `max_concurrency` requests are
+    in flight at any time.
+    """
+
+    def __init__(self, max_concurrency=None):
+        self.max_concurrency = max_concurrency or Config.ASYNC_API_CONCURRENCY
+        self.api_utils = CommonAPIUtils()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                            thread_name_prefix="async-api")
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Shut down the worker threads once all in-flight requests have finished."""
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            # run_in_executor doesn't carry the context over to the worker thread.
+            return await loop.run_in_executor(self._executor, with_test_context(functools.partial(func, *args)))
+
+    async def post(self, url, data):
+        """
+        Create a new resource via POST request.
+
+        Returns:
+            Tuple of (response_json, status_code)
+        """
+        return await self._run(self.api_utils.post, url, data)
+
+    async def post_request_with_status_code_validation(self, url, data, expected_status_code):
+        """
+        Perform POST request with status code validation.
+
+        Raises:
+            AssertionError: If status code doesn't match expected value
+        """
+        return await self._run(self.api_utils.post_request_with_status_code_validation,
+                               url, data, expected_status_code)
+
+    async def get(self, url):
+        """
+        Read resource via GET request.
+
+        Returns:
+            Tuple of (response_json, status_code)
+        """
+        return await self._run(self.api_utils.get, url)
+
+    async def get_request_with_status_code_validation(self, url, expected_status_code):
+        """
+        Perform GET request with status code validation.
+
+        Raises:
+            AssertionError: If status code doesn't match expected value
+        """
+        return await self._run(self.api_utils.get_request_with_status_code_validation,
+                               url, expected_status_code)
+
+    async def put(self, url, data):
+        """
+        Update resource via PUT request.
+
+        Returns:
+            Tuple of (response_json, status_code)
+        """
+        return await self._run(self.api_utils.put, url, data)
+
+    async def put_request_with_status_code_validation(self, url, data, expected_status_code):
+        """
+        Perform PUT request and validate status code.
+
+        Raises:
+            AssertionError: If status code doesn't match expected value
+        """
+        return await self._run(self.api_utils.put_request_with_status_code_validation,
+                               url, data, expected_status_code)
+
+    async def delete(self, url):
+        """
+        Delete resource via DELETE request.
+
+        Returns:
+            Tuple of (response_json, status_code)
+        """
+        return await self._run(self.api_utils.delete, url)
+
+    async def delete_request_with_status_code_validation(self, url, expected_status_code):
+        """
+        Perform DELETE request and validate status code.
+
+        Raises:
+            AssertionError: If status code doesn't match expected value
+        """
+        return await self._run(self.api_utils.delete_request_with_status_code_validation,
+                               url, expected_status_code)
+
+    async def patch(self, url, data):
+        """
+        Partially update resource via PATCH request.
+
+        Returns:
+            Tuple of (response_json, status_code)
+        """
+        return await self._run(self.api_utils.patch, url, data)
+
+    async def patch_request_with_status_code_validation(self, url, data, expected_status_code):
+        """
+        Perform PATCH request and validate status code.
+
+        Raises:
+            AssertionError: If status code doesn't match expected value
+        """
+        return await self._run(self.api_utils.patch_request_with_status_code_validation,
+                               url, data, expected_status_code)
+
+    async def gather(self, *coroutines):
+        """
+        Run coroutines concurrently and return their results in order.
+        Failures are returned in place as exceptions instead of cancelling the others.
+        """
+        results = await asyncio.gather(*coroutines, return_exceptions=True)
+        failed = sum(1 for result in results if isinstance(result, BaseException))
+        if failed:
+            logging.error("AsyncCommonAPIUtils():: %d of %d requests failed", failed, len(results))
+        return results
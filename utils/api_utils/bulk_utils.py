@@ -0,0 +1,68 @@
+"""Helpers to run many API operations concurrently over a worker pool."""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Config
+from utils.log_utils import with_test_context
+
+
+class BulkResult:
+    """
+    Per-item outcome of a bulk operation.
+
+    Attributes:
+        succeeded: List of (item, result) tuples, in input order
+        failed: List of (item, exception) tuples, in input order
+    """
+
+    def __init__(self):
+        self.succeeded = []
+        self.failed = []
+
+    @property
+    def results(self):
+        """Results of the successful items only."""
+        return [result for _, result in self.succeeded]
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    def __len__(self):
+        return len(self.succeeded) + len(self.failed)
+
+    def __repr__(self):
+        return f"BulkResult(succeeded={len(self.succeeded)}, failed={len(self.failed)})"
+
+
+def run_bulk(operation, items, max_workers=None):
+    """
+    Apply `operation` to every item over a thread pool.
+
+    A failing item never aborts the batch; its exception is recorded in the returned BulkResult.
+
+    Args:
+        operation: Callable taking one item
+        items: Iterable of items
+        max_workers: Worker count. Defaults to Config.BULK_API_WORKERS
+
+    Returns:
+        BulkResult: Successes and failures, each in input order
+    """
+    items = list(items)
+    bulk_result = BulkResult()
+    if not items:
+        return bulk_result
+
+    workers = min(max_workers or Config.BULK_API_WORKERS, len(items))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-api") as executor:
+        operation = with_test_context(operation)
+        futures = [executor.submit(operation, item) for item in items]
+        for item, future in zip(items, futures):
+            try:
+                bulk_result.succeeded.append((item, future.result()))
+            except Exception as e:
+                bulk_result.failed.append((item, e))
+
+    if bulk_result.failed:
+        logging.error("run_bulk():: %d of %d items failed", len(bulk_result.failed), len(items))
+    return bulk_result
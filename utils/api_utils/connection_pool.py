@@ -0,0 +1,103 @@
+"""Process-wide pooled HTTP transport shared by all API utility instances."""
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import Config
+from utils.api_utils.api_metrics import TIMED_POOL_CLASSES_BY_SCHEME
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report connect and TLS handshake times to the LatencyRecorder."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES_BY_SCHEME
+
+
+class SharedConnectionPool:
+    """
+    Holds a single HTTPAdapter (and therefore a single urllib3 PoolManager) per process.
+
+    Every thread gets its own requests.Session, but all of them mount the same adapter,
+    so TCP/TLS connections to the Mist API are kept alive and reused across
+    CommonAPIUtils instances without sharing a Session object between threads.
+    """
+
+    _lock = threading.Lock()
+    _adapter = None
+    _local = threading.local()
+
+    @classmethod
+    def configure(cls, pool_connections=None, pool_maxsize=None, pool_block=None):
+        """
+        (Re)build the shared adapter. Any previously pooled connections are closed.
+
+        Args:
+            pool_connections: Number of per-host pools to keep cached
+            pool_maxsize: Maximum number of connections kept per host
+            pool_block: Whether to block when a host pool is exhausted
+
+        Returns:
+            HTTPAdapter: The shared adapter
+        """
+        with cls._lock:
+            cls._close_locked()
+            cls._adapter = cls._build_adapter(
+                Config.HTTP_POOL_CONNECTIONS if pool_connections is None else pool_connections,
+                Config.HTTP_POOL_MAXSIZE if pool_maxsize is None else pool_maxsize,
+                Config.HTTP_POOL_BLOCK if pool_block is None else pool_block,
+            )
+            return cls._adapter
+
+    @classmethod
+    def get_adapter(cls):
+        """Return the shared adapter, building it from Config on first use."""
+        if cls._adapter is None:
+            with cls._lock:
+                if cls._adapter is None:
+                    cls._adapter = cls._build_adapter(Config.HTTP_POOL_CONNECTIONS,
+                                                      Config.HTTP_POOL_MAXSIZE,
+                                                      Config.HTTP_POOL_BLOCK)
+        return cls._adapter
+
+    @classmethod
+    def get_session(cls):
+        """
+        Return the calling thread's Session, mounted on the shared adapter.
+
+        Returns:
+            requests.Session: Session reusing pooled connections
+        """
+        adapter = cls.get_adapter()
+        session = getattr(cls._local, 'session', None)
+        if session is None or getattr(cls._local, 'adapter', None) is not adapter:
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            if not Config.HTTP_KEEP_ALIVE:
+                session.headers['Connection'] = 'close'
+            cls._local.session = session
+            cls._local.adapter = adapter
+        return session
+
+    @classmethod
+    def close(cls):
+        """Close every pooled connection. A later get_session() rebuilds the pool."""
+        with cls._lock:
+            cls._close_locked()
+
+    @classmethod
+    def _close_locked(cls):
+        if cls._adapter is not None:
+            logging.info("SharedConnectionPool():: Closing pooled HTTP connections")
+            cls._adapter.close()
+        cls._adapter = None
+
+    @staticmethod
+    def _build_adapter(pool_connections, pool_maxsize, pool_block):
+        logging.info("SharedConnectionPool():: Building HTTP adapter (pool_connections=%d, pool_maxsize=%d, "
+                     "pool_block=%s)", pool_connections, pool_maxsize, pool_block)
+        return TimedHTTPAdapter(pool_connections=pool_connections,
+                                pool_maxsize=pool_maxsize,
+                                pool_block=pool_block)
@@ -0,0 +1,31 @@
+"""Helpers to group concrete API URLs by endpoint template."""
+import re
+from urllib.parse import urlsplit
+
+_API_PREFIX = re.compile(r"^/api/v\d+")
+# Path words of the API are digit-free (or short, like oauth2). Ids are numbers, UUIDs, MACs, hex strings or
+# other long tokens carrying a digit.
+_ID_SEGMENT = re.compile(r"^(?:\d+"  # Numeric ids
+                         r"|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"  # UUIDs
+                         r"|[0-9a-fA-F]{2}(?:[:-]?[0-9a-fA-F]{2}){5}"  # MAC addresses
+                         r"|[0-9a-fA-F]{16,}"  # Hex ids
+                         r"|(?=[^\d]*\d)[\w.:~%+=-]{8,})$")  # Slugs, serials, base64 tokens
+
+
+def endpoint_template(url):
+    """
+    Map a concrete URL to its endpoint template, in the format of the api_constants values.
+
+    Examples:
+        https://api.ac2.mist.com/api/v1/orgs/6f4bf402-45f9-4a34-9dd0-b0e3b2a3a0b5 -> /orgs/{}
+        /api/v1/sites/3/devices/5c5b35000001/stats -> /sites/{}/devices/{}/stats
+
+    Args:
+        url: Absolute or relative URL
+
+    Returns:
+        str: Path with the API version prefix removed and id-shaped segments replaced by {}
+    """
+    path = _API_PREFIX.sub("", urlsplit(url).path)
+    segments = ["{}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return "/".join(segments).rstrip("/") or "/"
@@ -0,0 +1,169 @@
+"""Lazy API responses: the body is parsed at most once, and large JSON lists can be consumed item by item."""
+
+import codecs
+import json
+from typing import Any, Iterator, Optional
+import requests
+
+STREAM_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\r\n"
+
+
+class LazyResponse:
+    """
+    Wrapper of a requests.Response that parses the JSON body on first access and caches it.
+
+    With a streamed response (stream=True), iter_items() decodes the elements of a JSON list while the
+    body is downloaded, so large client or inventory lists never exist as a whole in memory.
+    """
+
+    def __init__(self, response: requests.Response):
+        self.response = response
+        self._parsed = False
+        self._data = None
+
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+
+    @property
+    def headers(self):
+        return self.response.headers
+
+    @property
+    def text(self) -> str:
+        return self.response.text
+
+    @property
+    def data(self) -> Any:
+        """Parsed JSON body, or the text when the body isn't JSON."""
+        if not self._parsed:
+            try:
+                self._data = self.response.json()
+            except (json.JSONDecodeError, requests.exceptions.JSONDecodeError):
+                self._data = self.response.text
+            self._parsed = True
+        return self._data
+
+    def json(self) -> Any:
+        return self.data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def get(self, key, default=None):
+        data = self.data
+        return data.get(key, default) if isinstance(data, dict) else default
+
+    def iter_items(self, key: Optional[str] = None) -> Iterator[Any]:
+        """
+        Yield the elements of the list in the body: the top-level list, or the list under the top-level
+        `key` of an object (e.g. "results" of the clients search).
+
+        Once the body was parsed (data accessed, or the response wasn't streamed) the cached value is used.
+        """
+        if self._parsed or self.response._content_consumed:
+            data = self.data
+            if key is not None:
+                data = data.get(key) or []
+            yield from data
+            return
+        reader = _StreamReader(self.response.iter_content(STREAM_CHUNK_SIZE), self.response.encoding or "utf-8")
+        try:
+            if key is None:
+                yield from reader.array_items()
+            else:
+                yield from reader.object_member_items(key)
+        finally:
+            self.response.close()
+
+    def close(self):
+        self.response.close()
+
+    def __repr__(self):
+        return "<LazyResponse [{}]>".format(self.status_code)
+
+
+class _StreamReader:
+    """Incremental JSON reader over an iterator of byte chunks, decoding one value at a time."""
+
+    def __init__(self, chunks: Iterator[bytes], encoding: str = "utf-8"):
+        self._chunks = chunks
+        # Multi-byte characters may be split across chunks.
+        self._text_decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ""
+        self._pos = 0
+        self._exhausted = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping the consumed part. False at end of stream."""
+        if self._exhausted:
+            return False
+        for chunk in self._chunks:
+            chunk = self._text_decoder.decode(chunk)
+            if chunk:
+                self._buffer = self._buffer[self._pos:] + chunk
+                self._pos = 0
+                return True
+        self._exhausted = True
+        return False
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise ValueError("Expected {!r} at offset {} of the JSON stream".format(char, self._pos))
+        self._pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self._buffer) and not isinstance(value, (dict, list, str)) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def array_items(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("]")
+            return
+
+    def object_member_items(self, key: str) -> Iterator[Any]:
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            member = self._value()
+            self._expect(":")
+            if member == key and self._peek() == "[":
+                yield from self.array_items()
+                return
+            self._value()
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("}")
+            return
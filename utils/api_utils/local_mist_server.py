@@ -0,0 +1,452 @@
+"""In-process stand-in for the Mist API, used with `--env local` for offline, high-throughput runs."""
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+from config.settings import Config
+from utils.log_utils import CORRELATION_ID_HEADER
+
+API_PREFIX = "/api/v1"
+# Page size bounds of the Mist list and search endpoints.
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+
+class NotFound(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+class MistAPIState:
+    """
+    Thread-safe in-memory state of the fake Mist account: orgs and their settings, sitegroups,
+    network templates, sites, clients and inventory, plus the /self privileges of the API user.
+    """
+
+    def __init__(self, email=None):
+        self.lock = threading.RLock()
+        self.email = email or Config.USERNAME
+        self.orgs = {}
+        self.org_settings = {}
+        self.sitegroups = {}
+        self.networktemplates = {}
+        self.sites = {}
+        self.clients = {}
+        self.inventory = {}
+
+    @staticmethod
+    def _new_object(payload, **fields):
+        now = time.time()
+        obj = dict(payload)
+        obj.update(fields)
+        obj["id"] = str(uuid.uuid4())
+        obj["created_time"] = now
+        obj["modified_time"] = now
+        return obj
+
+    @staticmethod
+    def _update_object(obj, payload):
+        obj.update({key: value for key, value in payload.items() if key not in ("id", "org_id", "created_time")})
+        obj["modified_time"] = time.time()
+        return obj
+
+    @staticmethod
+    def _require_name(payload):
+        if not isinstance(payload, dict) or not payload.get("name"):
+            raise BadRequest("name is required")
+
+    def _get(self, collection, object_id):
+        if object_id not in collection:
+            raise NotFound()
+        return collection[object_id]
+
+    def _org_children(self, collection, org_id):
+        self._get(self.orgs, org_id)
+        return [obj for obj in collection.values() if obj["org_id"] == org_id]
+
+    # Self
+    def get_self(self):
+        with self.lock:
+            return {
+                "email": self.email,
+                "privileges": [{"scope": "org", "org_id": org["id"], "name": org["name"], "role": "admin"}
+                               for org in self.orgs.values()],
+            }
+
+    # Orgs
+    def create_org(self, payload):
+        self._require_name(payload)
+        with self.lock:
+            org = self._new_object(payload, msp_id=payload.get("msp_id"))
+            self.orgs[org["id"]] = org
+            self.org_settings[org["id"]] = {"org_id": org["id"], "password_policy": {"enabled": False}}
+            return org
+
+    def get_org(self, org_id):
+        with self.lock:
+            return self._get(self.orgs, org_id)
+
+    def update_org(self, org_id, payload):
+        with self.lock:
+            return self._update_object(self._get(self.orgs, org_id), payload)
+
+    def delete_org(self, org_id):
+        with self.lock:
+            self._get(self.orgs, org_id)
+            del self.orgs[org_id]
+            self.org_settings.pop(org_id, None)
+            self.clients.pop(org_id, None)
+            self.inventory.pop(org_id, None)
+            for collection in (self.sitegroups, self.networktemplates, self.sites):
+                for object_id in [key for key, obj in collection.items() if obj["org_id"] == org_id]:
+                    del collection[object_id]
+            return {}
+
+    def get_org_setting(self, org_id):
+        with self.lock:
+            self._get(self.orgs, org_id)
+            return self.org_settings[org_id]
+
+    def update_org_setting(self, org_id, payload):
+        with self.lock:
+            self._get(self.orgs, org_id)
+            return self._update_object(self.org_settings[org_id], payload)
+
+    # Org children: sitegroups, network templates and sites
+    def list_children(self, collection_name, org_id, start=0, limit=None):
+        """
+        :return: Tuple of (children[start:start + limit], total children of the org)
+        """
+        with self.lock:
+            return self._page(self._org_children(getattr(self, collection_name), org_id), start, limit)
+
+    def create_child(self, collection_name, org_id, payload):
+        self._require_name(payload)
+        with self.lock:
+            self._get(self.orgs, org_id)
+            obj = self._new_object(payload, org_id=org_id)
+            if collection_name == "sites":
+                obj.setdefault("sitegroup_ids", [])
+                obj.setdefault("timezone", "America/Los_Angeles")
+                obj.setdefault("country_code", "US")
+            getattr(self, collection_name)[obj["id"]] = obj
+            return obj
+
+    def get_child(self, collection_name, object_id, org_id=None):
+        with self.lock:
+            obj = self._get(getattr(self, collection_name), object_id)
+            if org_id is not None and obj["org_id"] != org_id:
+                raise NotFound()
+            return obj
+
+    def update_child(self, collection_name, object_id, payload, org_id=None):
+        with self.lock:
+            return self._update_object(self.get_child(collection_name, object_id, org_id), payload)
+
+    def delete_child(self, collection_name, object_id, org_id=None):
+        with self.lock:
+            self.get_child(collection_name, object_id, org_id)
+            del getattr(self, collection_name)[object_id]
+            if collection_name == "sitegroups":
+                for site in self.sites.values():
+                    if object_id in site.get("sitegroup_ids", []):
+                        site["sitegroup_ids"] = [sg for sg in site["sitegroup_ids"] if sg != object_id]
+            return {}
+
+    # Clients and inventory
+    def seed_clients(self, org_id, count):
+        """Add `count` generated wireless clients to the org."""
+        with self.lock:
+            clients = self.clients.setdefault(org_id, [])
+            start = len(clients)
+            for index in range(start, start + count):
+                clients.append({"org_id": org_id, "mac": "{:012x}".format(index), "hostname": "client-{}".format(index),
+                                "ssid": "ssid-{}".format(index % 4), "band": "5" if index % 2 else "24"})
+
+    def seed_inventory(self, org_id, count):
+        """Add `count` generated devices to the org inventory."""
+        with self.lock:
+            devices = self.inventory.setdefault(org_id, [])
+            start = len(devices)
+            for index in range(start, start + count):
+                devices.append({"org_id": org_id, "mac": "5c5b35{:06x}".format(index), "serial": "A{:09d}".format(index),
+                                "model": "AP43" if index % 3 else "EX2300", "type": "ap" if index % 3 else "switch",
+                                "connected": bool(index % 2)})
+
+    def search_clients(self, org_id, filters, start=0, limit=None):
+        """
+        :return: Tuple of (clients[start:start + limit], total matching clients)
+        """
+        with self.lock:
+            self._get(self.orgs, org_id)
+            return self._page(self._filter(self.clients.get(org_id, []), filters), start, limit)
+
+    def list_inventory(self, org_id, filters, start=0, limit=None):
+        """
+        :return: Tuple of (devices[start:start + limit], total matching devices)
+        """
+        with self.lock:
+            self._get(self.orgs, org_id)
+            return self._page(self._filter(self.inventory.get(org_id, []), filters), start, limit)
+
+    @staticmethod
+    def _page(items, start, limit):
+        return items[start:] if limit is None else items[start:start + limit], len(items)
+
+    @staticmethod
+    def _filter(items, filters):
+        if not filters:
+            return list(items)
+        return [item for item in items if all(str(item.get(key)).lower() == str(value).lower()
+                                              for key, value in filters.items())]
+
+
+class LocalMistAPIServer:
+    """
+    Localhost HTTP server speaking the subset of the Mist API used by the libs.
+
+    Args:
+        host: Interface to bind. Defaults to Config.LOCAL_API_HOST
+        port: Port to bind, 0 picks a free one. Defaults to Config.LOCAL_API_PORT
+        latency_ms: Delay added to every response. Defaults to Config.LOCAL_API_LATENCY_MS
+        error_rate: Fraction (0..1) of requests answered with error_status. Defaults to Config.LOCAL_API_ERROR_RATE
+        error_status: Status code of injected errors. Defaults to Config.LOCAL_API_ERROR_STATUS
+        seed: Seed of the error injection, for deterministic runs. Defaults to Config.LOCAL_API_SEED
+    """
+
+    PAGINATION_PARAMS = ("limit", "page", "search_after")
+
+    def __init__(self, host=None, port=None, latency_ms=None, error_rate=None, error_status=None, seed=None):
+        self.host = host or Config.LOCAL_API_HOST
+        self.port = Config.LOCAL_API_PORT if port is None else port
+        self.latency_ms = Config.LOCAL_API_LATENCY_MS if latency_ms is None else latency_ms
+        self.error_rate = Config.LOCAL_API_ERROR_RATE if error_rate is None else error_rate
+        self.error_status = error_status or Config.LOCAL_API_ERROR_STATUS
+        self._random = random.Random(Config.LOCAL_API_SEED if seed is None else seed)
+        self._random_lock = threading.Lock()
+        self.state = MistAPIState()
+        self.request_count = 0
+        self._httpd = None
+        self._thread = None
+        self._routes = self._build_routes()
+
+    @property
+    def base_url(self):
+        return "http://{}:{}{}".format(self.host, self.port, API_PREFIX)
+
+    def start(self):
+        """Start serving on a background thread and return the API base URL."""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="local-mist-api", daemon=True)
+        self._thread.start()
+        logging.info("LocalMistAPIServer():: Serving the Mist API stand-in at %s", self.base_url)
+        return self.base_url
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+            logging.info("LocalMistAPIServer():: Stopped after %d requests", self.request_count)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _build_routes(self):
+        state = self.state
+        org = r"/orgs/(?P<org_id>[^/]+)"
+        routes = [
+            ("GET", r"/self", lambda m, body, query: state.get_self()),
+            ("POST", r"/orgs", lambda m, body, query: state.create_org(body)),
+            ("GET", org, lambda m, body, query: state.get_org(m["org_id"])),
+            ("PUT", org, lambda m, body, query: state.update_org(m["org_id"], body)),
+            ("DELETE", org, lambda m, body, query: state.delete_org(m["org_id"])),
+            ("GET", org + r"/setting", lambda m, body, query: state.get_org_setting(m["org_id"])),
+            ("PUT", org + r"/setting", lambda m, body, query: state.update_org_setting(m["org_id"], body)),
+            ("GET", org + r"/clients/search", self._search_clients),
+            ("GET", org + r"/inventory", self._list_inventory),
+        ]
+        for collection in ("sitegroups", "networktemplates", "sites"):
+            routes.extend(self._child_routes(org, collection))
+        routes.extend([
+            ("GET", r"/sites/(?P<object_id>[^/]+)",
+             lambda m, body, query: state.get_child("sites", m["object_id"])),
+            ("PUT", r"/sites/(?P<object_id>[^/]+)",
+             lambda m, body, query: state.update_child("sites", m["object_id"], body)),
+            ("DELETE", r"/sites/(?P<object_id>[^/]+)",
+             lambda m, body, query: state.delete_child("sites", m["object_id"])),
+        ])
+        return [(method, re.compile("^" + pattern + "$"), handler) for method, pattern, handler in routes]
+
+    def _child_routes(self, org, collection):
+        state = self.state
+        details = org + "/" + collection + r"/(?P<object_id>[^/]+)"
+        return [
+            ("GET", org + "/" + collection, lambda m, body, query: self._list_children(collection, m, query)),
+            ("POST", org + "/" + collection,
+             lambda m, body, query: state.create_child(collection, m["org_id"], body)),
+            ("GET", details, lambda m, body, query: state.get_child(collection, m["object_id"], m["org_id"])),
+            ("PUT", details,
+             lambda m, body, query: state.update_child(collection, m["object_id"], body, m["org_id"])),
+            ("DELETE", details,
+             lambda m, body, query: state.delete_child(collection, m["object_id"], m["org_id"])),
+        ]
+
+    def _filters(self, query):
+        return {key: values[-1] for key, values in query.items() if key not in self.PAGINATION_PARAMS}
+
+    @staticmethod
+    def _int_param(query, name, default, minimum=0):
+        try:
+            return max(int(query[name][-1]), minimum) if name in query else default
+        except ValueError:
+            raise BadRequest("Invalid {}".format(name))
+
+    def _limit(self, query):
+        return min(self._int_param(query, "limit", DEFAULT_PAGE_LIMIT, minimum=1), MAX_PAGE_LIMIT)
+
+    def _search_clients(self, match, body, query):
+        """Search endpoints page with an opaque search_after cursor and return the next page link in the body."""
+        filters, limit = self._filters(query), self._limit(query)
+        start = self._int_param(query, "search_after", 0)
+        results, total = self.state.search_clients(match["org_id"], filters, start, limit)
+        response = {"results": results, "total": total, "limit": limit, "start": start, "end": start + len(results)}
+        if start + len(results) < total:
+            next_query = dict(filters, limit=limit, search_after=start + len(results))
+            response["next"] = "{}/orgs/{}/clients/search?{}".format(API_PREFIX, match["org_id"], urlencode(next_query))
+        return response
+
+    @staticmethod
+    def _page_headers(limit, page, total):
+        return {"X-Page-Limit": str(limit), "X-Page-Page": str(page), "X-Page-Total": str(total)}
+
+    def _list_inventory(self, match, body, query):
+        """List endpoints page with ?limit=&page= and report the position in X-Page-* headers."""
+        limit, page = self._limit(query), self._int_param(query, "page", 1, minimum=1)
+        devices, total = self.state.list_inventory(match["org_id"], self._filters(query), (page - 1) * limit, limit)
+        return 200, devices, self._page_headers(limit, page, total)
+
+    def _list_children(self, collection, match, query):
+        limit, page = self._limit(query), self._int_param(query, "page", 1, minimum=1)
+        children, total = self.state.list_children(collection, match["org_id"], (page - 1) * limit, limit)
+        return 200, children, self._page_headers(limit, page, total)
+
+    def _inject_error(self):
+        if self.error_rate <= 0:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    def _dispatch(self, method, raw_path, raw_body, headers):
+        """
+        Route one request.
+
+        Returns:
+            Tuple of (status_code, json_body, extra_headers)
+        """
+        with self._random_lock:
+            self.request_count += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        if not (headers.get("Authorization") or "").startswith("Token "):
+            return 401, {"detail": "Authentication credentials were not provided."}, {}
+        if self._inject_error():
+            return self.error_status, {"detail": "Injected error"}, {"Retry-After": "0"}
+
+        url = urlsplit(raw_path)
+        if not url.path.startswith(API_PREFIX):
+            return 404, {"detail": "Not found."}, {}
+        path = url.path[len(API_PREFIX):].rstrip("/") or "/"
+        query = parse_qs(url.query)
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            return 400, {"detail": "JSON parse error"}, {}
+
+        path_matched = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            try:
+                result = handler(match.groupdict(), body, query)
+            except NotFound:
+                return 404, {"detail": "Object not found"}, {}
+            except BadRequest as e:
+                return 400, {"detail": str(e)}, {}
+            if isinstance(result, tuple):
+                return result
+            return 200, result, {}
+        if path_matched:
+            return 405, {"detail": 'Method "{}" not allowed.'.format(method)}, {}
+        return 404, {"detail": "Not found."}, {}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                status, payload, extra_headers = server._dispatch(self.command, self.path, raw_body, self.headers)
+                # Handlers return live state objects, serialize them before another request mutates them.
+                with server.state.lock:
+                    data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in extra_headers.items():
+                    self.send_header(name, value)
+                if self.headers.get(CORRELATION_ID_HEADER):
+                    self.send_header(CORRELATION_ID_HEADER, self.headers[CORRELATION_ID_HEADER])
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = _handle
+
+            def log_message(self, format, *args):
+                logging.debug("LocalMistAPIServer():: " + format, *args)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local Mist API stand-in server.")
+    parser.add_argument("--host", default=Config.LOCAL_API_HOST)
+    parser.add_argument("--port", type=int, default=Config.LOCAL_API_PORT)
+    parser.add_argument("--latency-ms", type=float, default=Config.LOCAL_API_LATENCY_MS)
+    parser.add_argument("--error-rate", type=float, default=Config.LOCAL_API_ERROR_RATE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    server = LocalMistAPIServer(args.host, args.port, args.latency_ms, args.error_rate)
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Iteration over paginated API endpoints, with the next page fetched while the current one is consumed."""
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from config.settings import Config
+from utils.api_utils.api_utils import CommonAPIUtils
+from utils.log_utils import with_test_context
+
+
+def iter_paginated(fetch_page, first_request, prefetch=True):
+    """
+    Yield the items of every page of a paginated endpoint.
+
+    At most two pages are held in memory: the one being consumed and, with prefetch, the next one,
+    requested on a background thread as soon as the current page arrives.
+
+    Args:
+        fetch_page: Callable taking a page request and returning (items, next_request), next_request
+            being None on the last page
+        first_request: Request of the first page, e.g. its URL
+        prefetch: Fetch the next page concurrently with the consumption of the current one
+
+    Yields:
+        The items of each page, in order
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch") if prefetch else None
+    prefetch_page = with_test_context(fetch_page)
+    try:
+        items, next_request = fetch_page(first_request)
+        while True:
+            next_page = executor.submit(prefetch_page, next_request) if executor and next_request is not None else None
+            yield from items
+            if next_request is None:
+                return
+            items, next_request = next_page.result() if next_page is not None else fetch_page(next_request)
+    finally:
+        if executor is not None:
+            # The caller may stop early: don't wait for a prefetch nobody will read.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_x_pages(url, filters=None, limit=None, prefetch=True, expected_status_code=200):
+    """
+    Yield the items of a list endpoint paged with ?limit=&page= and X-Page-Limit/X-Page-Total
+    response headers, e.g. the org inventory or the org sites.
+
+    Args:
+        url: Endpoint URL, without query string
+        filters: Query parameters applied server side
+        limit: Page size. Defaults to Config.API_PAGE_LIMIT
+        prefetch: Fetch the next page concurrently with the consumption of the current one
+        expected_status_code: Expected HTTP status code of every page
+
+    Yields:
+        The items of each page, in order
+    """
+    limit = limit or Config.API_PAGE_LIMIT
+
+    def fetch_page(page):
+        page_url = "{}?{}".format(url, urlencode(dict(filters or {}, limit=limit, page=page)))
+        response = CommonAPIUtils().request("GET", page_url)
+        if response.status_code != expected_status_code:
+            raise AssertionError(f'E: CommonAPIUtils() :: GET {page_url} failed. Expected status '
+                                 f'{expected_status_code}, got {response.status_code}')
+        items = response.data
+        total = response.headers.get("X-Page-Total")
+        if total is not None:
+            has_next = page * int(response.headers.get("X-Page-Limit", limit)) < int(total)
+        else:
+            # Without the headers, a short page is the last one.
+            has_next = len(items) >= limit
+        return items, page + 1 if has_next else None
+
+    return iter_paginated(fetch_page, 1, prefetch)
@@ -0,0 +1,198 @@
+"""Retry, backoff and client-side rate limiting for API requests."""
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests
+from config.settings import Config
+from utils.api_utils.endpoints import endpoint_template
+
+IDEMPOTENT_METHODS = frozenset(["GET", "PUT", "DELETE", "HEAD", "OPTIONS"])
+RETRYABLE_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class RetryAfterTooLong(Exception):
+    """Raised when the server asks to retry later than RequestScheduler.retry_after_max allows."""
+
+    def __init__(self, method, url, response, delay, limit):
+        self.response = response
+        self.delay = delay
+        super().__init__("{} {} returned {} with Retry-After {:.0f}s, over the {:.0f}s limit "
+                         "(API_RETRY_AFTER_MAX)".format(method, url, response.status_code, delay, limit))
+
+
+class TokenBucket:
+    """Thread-safe token bucket. A rate of 0 disables throttling."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, sleeping until one is available.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def drain(self, seconds):
+        """Hold back every caller for `seconds`, e.g. after the server answered 429."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self._tokens, 1.0 - seconds * self.rate)
+
+
+class RequestScheduler:
+    """
+    Sends requests through a shared token bucket and retries transient failures.
+
+    - Every request takes a token first, so all threads of the process stay under the quota.
+      Under pytest-xdist the configured rate is split evenly across the workers.
+    - 429 responses are retried for every method, since the server did not process them.
+      Connection errors and 5xx responses are retried for idempotent methods only.
+    - The delay is the Retry-After header when present, else jittered exponential backoff capped at
+      backoff_max. Retry-After is honoured as sent; RetryAfterTooLong is raised when it exceeds
+      retry_after_max rather than retrying before the server is ready.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, rate_per_hour=None, burst=None, max_retries=None, backoff_base=None, backoff_max=None,
+                 retry_after_max=None):
+        rate_per_hour = Config.API_RATE_LIMIT_PER_HOUR if rate_per_hour is None else rate_per_hour
+        workers = int(os.getenv('PYTEST_XDIST_WORKER_COUNT', '1'))
+        self.bucket = TokenBucket(rate_per_hour / 3600.0 / workers,
+                                  Config.API_RATE_LIMIT_BURST if burst is None else burst)
+        self.max_retries = Config.API_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = Config.API_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = Config.API_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.retry_after_max = Config.API_RETRY_AFTER_MAX if retry_after_max is None else retry_after_max
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """Return the process-wide scheduler, creating it from Config on first use."""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def configure(cls, **kwargs):
+        """Replace the process-wide scheduler. Accepts the __init__ arguments."""
+        with cls._shared_lock:
+            cls._shared = cls(**kwargs)
+            return cls._shared
+
+    def execute(self, method, url, send):
+        """
+        Send a request with throttling and retries.
+
+        Args:
+            method: HTTP method, used to decide whether retrying is safe
+            url: Request URL, used for logging and metrics
+            send: Callable performing the request and returning a requests.Response
+
+        Returns:
+            requests.Response: The last response received
+        """
+        endpoint = "{} {}".format(method, endpoint_template(url))
+        idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self._record(endpoint, throttle_wait=self.bucket.acquire(), requests=1)
+            try:
+                response = send()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logging.warning("%s %s failed (%s), retrying in %.2fs (attempt %d/%d)",
+                                method, url, e, delay, attempt + 1, self.max_retries)
+            else:
+                status = response.status_code
+                if status not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries \
+                        or (status != 429 and not idempotent):
+                    return response
+                retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is not None and retry_after > self.retry_after_max:
+                    raise RetryAfterTooLong(method, url, response, retry_after, self.retry_after_max)
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if status == 429:
+                    self.bucket.drain(delay)
+                    self._record(endpoint, throttled=1)
+                logging.warning("%s %s returned %d, retrying in %.2fs (attempt %d/%d)",
+                                method, url, status, delay, attempt + 1, self.max_retries)
+                response.close()
+            attempt += 1
+            self._record(endpoint, retries=1, retry_wait=delay)
+            time.sleep(delay)
+
+    def get_metrics(self):
+        """
+        Snapshot of the per-endpoint counters.
+
+        Returns:
+            dict: "<METHOD> <endpoint template>" -> {requests, retries, throttled, throttle_wait, retry_wait}
+        """
+        with self._metrics_lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._metrics.items()}
+
+    def reset_metrics(self):
+        with self._metrics_lock:
+            self._metrics = {}
+
+    def merge_metrics(self, metrics):
+        """
+        Add the counters of another scheduler, e.g. the get_metrics() of an xdist worker.
+
+        Args:
+            metrics: "<METHOD> <endpoint template>" -> counters, as returned by get_metrics()
+        """
+        for endpoint, counters in metrics.items():
+            self._record(endpoint, **counters)
+
+    def _record(self, endpoint, **increments):
+        with self._metrics_lock:
+            counters = self._metrics.setdefault(endpoint, {"requests": 0, "retries": 0, "throttled": 0,
+                                                           "throttle_wait": 0.0, "retry_wait": 0.0})
+            for name, value in increments.items():
+                counters[name] += value
+
+    def _backoff(self, attempt):
+        # Full jitter: uniform between 0 and the capped exponential delay.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _parse_retry_after(self, value):
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return max(seconds, 0.0)
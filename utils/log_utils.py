@@ -0,0 +1,239 @@
+"""
+Structured, non-blocking logging for the libs and utils.
+
+Records carry the component (class), operation (method), endpoint, org id, test node id and correlation id
+as fields. Their message is only built if the level is enabled, and with a LOG_FILE configured, formatting
+and file I/O happen on a background QueueListener thread instead of the test thread.
+
+The test context is held in a ContextVar, so concurrent work is attributed to the test that started it:
+worker threads see it when their function is wrapped with with_test_context().
+"""
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import uuid
+from config.settings import Config
+
+CORRELATION_ID_HEADER = "X-Correlation-ID"
+STRUCTURED_FIELDS = ("component", "operation", "endpoint", "org_id")
+_PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+
+_NO_TEST_CONTEXT = {"test_node_id": None, "correlation_id": None}
+# Set to a new dict (never mutated) per test, read by the threads running in a copy of the test's context.
+_test_context = contextvars.ContextVar("test_context", default=_NO_TEST_CONTEXT)
+_session_correlation_id = uuid.uuid4().hex[:16]
+_queue_handler = None
+_listener = None
+
+
+def set_test_context(node_id):
+    """
+    Start the context of a test: its node id and a new correlation id are stamped on every log record
+    and API request of the calling thread, and of the work it hands over through with_test_context(),
+    until clear_test_context().
+
+    Args:
+        node_id: pytest node id of the test
+
+    Returns:
+        The correlation id of the test
+    """
+    context = {"test_node_id": node_id, "correlation_id": uuid.uuid4().hex[:16]}
+    _test_context.set(context)
+    return context["correlation_id"]
+
+
+def clear_test_context():
+    _test_context.set(_NO_TEST_CONTEXT)
+
+
+def get_test_node_id():
+    return _test_context.get()["test_node_id"]
+
+
+def get_correlation_id():
+    """Correlation id of the running test, or of the session outside of a test."""
+    return _test_context.get()["correlation_id"] or _session_correlation_id
+
+
+def with_test_context(func):
+    """
+    Bind func to the test context of the calling thread, for work submitted to another thread.
+
+    Args:
+        func: Callable to run on a worker thread
+
+    Returns:
+        Callable running func in a copy of the caller's context, safe to call from several threads at once
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def run_in_context(*args, **kwargs):
+        # A Context can only be entered by one thread at a time: every call runs in its own copy.
+        return context.copy().run(func, *args, **kwargs)
+
+    return run_in_context
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the test context on the records and defaults the structured fields they don't set."""
+
+    def filter(self, record):
+        context = _test_context.get()
+        record.test_node_id = context["test_node_id"]
+        record.correlation_id = context["correlation_id"] or _session_correlation_id
+        for field in STRUCTURED_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, None)
+        return True
+
+
+class StructuredAdapter(logging.LoggerAdapter):
+    """
+    Logger taking the structured fields as keyword arguments, e.g.
+    log.info("Org %s created", org_id, operation="_op_create_org", org_id=org_id).
+
+    The message keeps its %-style arguments, so nothing is formatted unless the level is enabled.
+    It is prefixed with "<component> :: <operation> ::" like the rest of the framework's logs.
+    """
+
+    def process(self, msg, kwargs):
+        extra = dict(self.extra)
+        for field in STRUCTURED_FIELDS:
+            if field in kwargs:
+                extra[field] = kwargs.pop(field)
+        kwargs["extra"] = extra
+        if extra.get("operation"):
+            msg = "{} :: {} :: {}".format(extra["component"], extra["operation"], msg)
+        return msg, kwargs
+
+
+@functools.lru_cache(maxsize=None)
+def get_logger(name, component):
+    """
+    Args:
+        name: Logger name, usually the module __name__
+        component: Class name recorded in the component field
+
+    Returns:
+        StructuredAdapter, shared by all the callers with the same name and component
+    """
+    return StructuredAdapter(logging.getLogger(name), {"component": component})
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats a record as a text line with its fields appended, or as a JSON object per line.
+    """
+
+    def __init__(self, json_lines=False):
+        super().__init__("%(asctime)s %(levelname)s [%(correlation_id)s] %(message)s")
+        self.json_lines = json_lines
+
+    def _fields(self, record):
+        fields = {field: getattr(record, field, None) for field in STRUCTURED_FIELDS + ("test_node_id",)}
+        return {field: value for field, value in fields.items() if value is not None}
+
+    def format(self, record):
+        if not hasattr(record, "correlation_id"):
+            ContextFilter().filter(record)
+        if self.json_lines:
+            entry = {
+                "time": self.formatTime(record),
+                "level": record.levelname,
+                "logger": record.name,
+                "thread": record.threadName,
+                "correlation_id": record.correlation_id,
+                "message": record.getMessage(),
+            }
+            entry.update(self._fields(record))
+            if record.exc_info:
+                entry["exception"] = self.formatException(record.exc_info)
+            return json.dumps(entry, default=str)
+        line = super().format(record)
+        fields = self._fields(record)
+        fields.pop("component", None)
+        fields.pop("operation", None)
+        if fields:
+            line += " | " + " ".join("{}={}".format(field, value) for field, value in fields.items())
+        return line
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler leaving the message and exception formatting to the listener thread.
+
+    The message is only rendered on the calling thread when an argument is mutable and could change
+    before the listener gets to it.
+    """
+
+    def prepare(self, record):
+        args = record.args
+        if args and (isinstance(args, dict) or not all(isinstance(arg, _PRIMITIVE_TYPES) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def _worker_log_file(log_file):
+    """One file per xdist worker, e.g. reports/automation-gw1.log."""
+    worker_id = os.getenv("PYTEST_XDIST_WORKER")
+    if not worker_id:
+        return log_file
+    root, extension = os.path.splitext(log_file)
+    return "{}-{}{}".format(root, worker_id, extension)
+
+
+def configure_logging(log_file=None, level=None, json_lines=None):
+    """
+    Write the records of the process to log_file from a background thread, at the given level.
+    Does nothing without a log file. Calling it again replaces the previous configuration.
+
+    Args:
+        log_file: Log file path. Defaults to Config.LOG_FILE
+        level: Level name or number. Defaults to Config.LOG_LEVEL
+        json_lines: One JSON object per line instead of text. Defaults to Config.LOG_FORMAT == "json"
+
+    Returns:
+        Path of the file written, with the xdist worker suffix if any, or None without a log file
+    """
+    global _queue_handler, _listener
+    shutdown_logging()
+    log_file = Config.LOG_FILE if log_file is None else log_file
+    if not log_file:
+        return None
+    log_file = _worker_log_file(log_file)
+    if os.path.dirname(log_file):
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    file_handler.setFormatter(StructuredFormatter(Config.LOG_FORMAT == "json" if json_lines is None else json_lines))
+    records = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+    _listener.start()
+
+    _queue_handler = DeferredQueueHandler(records)
+    # The test context must be read on the calling thread, the listener runs after the fact.
+    _queue_handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    root.setLevel(Config.LOG_LEVEL if level is None else level)
+    root.addHandler(_queue_handler)
+    return log_file
+
+
+def shutdown_logging():
+    """Write the queued records and close the log file."""
+    global _queue_handler, _listener
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
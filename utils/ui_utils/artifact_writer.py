@@ -0,0 +1,131 @@
+"""Background writer for test artifacts (screenshots, page sources), so failing tests don't block on disk I/O."""
+
+import gzip
+import hashlib
+import os
+import queue
+import re
+import threading
+import time
+from typing import Optional
+from config.settings import Config
+from utils.ui_utils import parallel_utils
+
+_STOP = object()
+
+
+def artifact_name(suffix: str, extension: str) -> str:
+    """
+    File name derived from the running test node id, e.g.
+    "tests_ui_tests_x_tests.py__TestCreateAccount__test_page_title-navigation_error-1700000000123.webp".
+    Outside of a test, only the suffix and the timestamp are used.
+    """
+    node_id = os.getenv("PYTEST_CURRENT_TEST", "").rsplit(" ", 1)[0]
+    parts = [re.sub(r"[^\w.-]+", "_", node_id.replace("::", "__")).strip("_"), suffix, str(int(time.time() * 1000))]
+    return "-".join(part for part in parts if part) + "." + extension.lstrip(".")
+
+
+class ArtifactWriter:
+    """
+    Writes artifacts from a single daemon thread fed by a bounded queue.
+
+    submit() returns the final path immediately. Identical content (same SHA-256) is written once and
+    the path of the first copy is returned. When the queue stays full for `put_timeout` seconds the
+    artifact is dropped rather than stalling the test run.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory: str = None, max_queue: int = None, put_timeout: float = None):
+        self.directory = directory or parallel_utils.worker_artifact_dir(Config.SCREENSHOT_DIR)
+        self.put_timeout = Config.ARTIFACT_QUEUE_TIMEOUT if put_timeout is None else put_timeout
+        self._queue = queue.Queue(maxsize=Config.ARTIFACT_QUEUE_SIZE if max_queue is None else max_queue)
+        self._paths_by_hash = {}
+        self._lock = threading.Lock()
+        self.written = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls) -> "ArtifactWriter":
+        """Process-wide writer, started on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @classmethod
+    def close_shared(cls, timeout: float = None):
+        """Flush and stop the process-wide writer, if it was started."""
+        with cls._shared_lock:
+            writer, cls._shared = cls._shared, None
+        if writer is not None:
+            writer.close(timeout)
+
+    def submit(self, filename: str, data: bytes, compress: bool = False) -> Optional[str]:
+        """
+        Queue `data` to be written as `filename` in the artifact directory.
+
+        Args:
+            filename: Name of the file. ".gz" is appended when compress is set.
+            data: File content
+            compress: gzip the content in the writer thread
+
+        Returns:
+            str: Path the artifact will be written to, or None if it was dropped
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.directory, filename + (".gz" if compress else ""))
+        with self._lock:
+            if digest in self._paths_by_hash:
+                self.deduplicated += 1
+                return self._paths_by_hash[digest]
+            self._paths_by_hash[digest] = path
+        try:
+            self._queue.put((path, data, compress), timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self._paths_by_hash.pop(digest, None)
+                self.dropped += 1
+            print(f"Artifact queue full, dropped {path}")
+            return None
+        return path
+
+    def flush(self, timeout: float = None):
+        """Wait until every queued artifact is on disk (or `timeout` seconds elapsed)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = None):
+        """Flush the queue and stop the writer thread."""
+        self.flush(timeout)
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                path, data, compress = item
+                if compress:
+                    data = gzip.compress(data, compresslevel=6)
+                temporary_path = path + ".tmp"
+                with open(temporary_path, "wb") as artifact_file:
+                    artifact_file.write(data)
+                os.replace(temporary_path, path)
+                self.written += 1
+            except Exception as e:
+                print(f"Could not write artifact: {e}")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,118 @@
+"""Single-roundtrip batched DOM operations for UIUtils."""
+
+from selenium.webdriver.common.by import By
+
+# Runs a list of actions in the page and returns one result per action. Values are set through the
+# native value setter and followed by input/change events so framework bindings (Angular, React) see them.
+BATCH_JS = """
+var actions = arguments[0];
+function locate(by, value) {
+    switch (by) {
+        case 'id': return document.getElementById(value);
+        case 'name': return document.getElementsByName(value)[0] || null;
+        case 'class name': return document.getElementsByClassName(value)[0] || null;
+        case 'tag name': return document.getElementsByTagName(value)[0] || null;
+        case 'css selector': return document.querySelector(value);
+        case 'link text':
+        case 'partial link text':
+            var links = document.getElementsByTagName('a');
+            for (var i = 0; i < links.length; i++) {
+                var text = links[i].textContent.trim();
+                if (by === 'link text' ? text === value : text.indexOf(value) !== -1) { return links[i]; }
+            }
+            return null;
+        case 'xpath':
+            return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    throw new Error('Unsupported locator strategy: ' + by);
+}
+function isVisible(el) {
+    if (!el) { return false; }
+    var style = window.getComputedStyle(el);
+    var rect = el.getBoundingClientRect();
+    return style.visibility !== 'hidden' && style.display !== 'none' && rect.width > 0 && rect.height > 0;
+}
+function setValue(el, text) {
+    var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+        : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+    var setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+    el.focus();
+    setter.call(el, text);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.blur();
+}
+return actions.map(function (action) {
+    try {
+        var el = locate(action.by, action.value);
+        if (action.action === 'present') { return {ok: true, value: !!el}; }
+        if (action.action === 'visible') { return {ok: true, value: isVisible(el)}; }
+        if (!el) { return {ok: false, error: 'Element not found: ' + action.by + '=' + action.value}; }
+        switch (action.action) {
+            case 'fill':
+                if (action.native) { return {ok: true, element: el}; }
+                setValue(el, action.text);
+                return {ok: true, value: el.value};
+            case 'check':
+                if (el.checked !== action.checked) { el.click(); }
+                return {ok: true, value: el.checked};
+            case 'click': el.click(); return {ok: true};
+            case 'text': return {ok: true, value: el.innerText};
+            case 'attribute':
+                var attr = el[action.attribute];
+                return {ok: true, value: attr === undefined ? el.getAttribute(action.attribute) : attr};
+        }
+        return {ok: false, error: 'Unsupported action: ' + action.action};
+    } catch (e) {
+        return {ok: false, error: String(e)};
+    }
+});
+"""
+
+
+def fill(by: By, value: str, text: str, native: bool = False) -> dict:
+    """
+    Action setting the value of an input. With native=True the value is typed through real key
+    events by WebDriver after the batch, for fields that only react to keyboard input.
+    """
+    return {"action": "fill", "by": by, "value": value, "text": text, "native": native}
+
+
+def check(by: By, value: str, checked: bool = True) -> dict:
+    """Action setting a checkbox to `checked`, clicking it only if needed."""
+    return {"action": "check", "by": by, "value": value, "checked": checked}
+
+
+def click(by: By, value: str) -> dict:
+    """Action clicking an element through the DOM (no native mouse event)."""
+    return {"action": "click", "by": by, "value": value}
+
+
+def text(by: By, value: str) -> dict:
+    """Action reading the visible text of an element."""
+    return {"action": "text", "by": by, "value": value}
+
+
+def attribute(by: By, value: str, name: str) -> dict:
+    """Action reading a property (or attribute) of an element."""
+    return {"action": "attribute", "by": by, "value": value, "attribute": name}
+
+
+def visible(by: By, value: str) -> dict:
+    """Action checking whether an element is displayed."""
+    return {"action": "visible", "by": by, "value": value}
+
+
+def present(by: By, value: str) -> dict:
+    """Action checking whether an element is in the DOM."""
+    return {"action": "present", "by": by, "value": value}
+
+
+class BatchError(Exception):
+    """Raised by UIUtils.run_batch(strict=True) when at least one action failed."""
+
+    def __init__(self, results):
+        self.results = results
+        failures = ["{}: {}".format(index, result["error"]) for index, result in enumerate(results)
+                    if not result["ok"]]
+        super().__init__("Batch actions failed: " + "; ".join(failures))
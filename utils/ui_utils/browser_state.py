@@ -0,0 +1,142 @@
+"""Browser state snapshots (cookies, localStorage, sessionStorage) captured once and restored into other drivers."""
+
+import json
+import os
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+from selenium import webdriver
+from config.settings import Config
+
+READ_STORAGE_JS = """
+function dump(storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) { var key = storage.key(i); items[key] = storage.getItem(key); }
+    return items;
+}
+return {localStorage: dump(window.localStorage), sessionStorage: dump(window.sessionStorage)};
+"""
+
+# Installed for a single navigation: seeds the storage of the snapshot origin before the page scripts run.
+SEED_STORAGE_JS = """
+(function (origin, localItems, sessionItems) {
+    if (window.location.origin !== origin) { return; }
+    Object.keys(localItems).forEach(function (key) { window.localStorage.setItem(key, localItems[key]); });
+    Object.keys(sessionItems).forEach(function (key) { window.sessionStorage.setItem(key, sessionItems[key]); });
+})(%s, %s, %s);
+"""
+
+# CDP Network.setCookies accepts these fields of the Network.getAllCookies entries.
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return "{}://{}".format(parts.scheme, parts.netloc)
+
+
+class BrowserStateSnapshot:
+    """
+    Cookies of every domain plus the local and session storage of one origin.
+
+    Attributes:
+        url: Page the snapshot was taken on, navigated to on restore
+        cookies: CDP cookie objects, httpOnly cookies included
+        local_storage / session_storage: Storage items of the url origin
+        created_at / expires_at: Epoch seconds
+    """
+
+    def __init__(self, url: str, cookies: list, local_storage: dict, session_storage: dict,
+                 created_at: float = None, expires_at: float = None):
+        self.url = url
+        self.cookies = cookies
+        self.local_storage = local_storage
+        self.session_storage = session_storage
+        self.created_at = time.time() if created_at is None else created_at
+        self.expires_at = expires_at
+
+    @property
+    def origin(self) -> str:
+        return _origin(self.url)
+
+    def is_expired(self) -> bool:
+        if self.expires_at is not None and time.time() >= self.expires_at:
+            return True
+        # A session cookie that already expired invalidates the login as well.
+        return any(0 < cookie.get("expires", -1) <= time.time() for cookie in self.cookies)
+
+    @classmethod
+    def capture(cls, driver: webdriver.Chrome, ttl: float = None) -> "BrowserStateSnapshot":
+        """
+        Snapshot the state of the driver on its current page.
+
+        Args:
+            driver: WebDriver instance, on a page of the origin whose storage should be kept
+            ttl: Seconds the snapshot stays valid, Config.BROWSER_STATE_TTL by default
+        """
+        ttl = Config.BROWSER_STATE_TTL if ttl is None else ttl
+        try:
+            cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        except Exception:
+            cookies = driver.get_cookies()
+        storage = driver.execute_script(READ_STORAGE_JS)
+        return cls(driver.current_url, cookies, storage["localStorage"], storage["sessionStorage"],
+                   expires_at=time.time() + ttl)
+
+    def restore(self, driver: webdriver.Chrome, url: str = None):
+        """
+        Load the snapshot into a driver and navigate to `url` (the snapshot page by default), in a single
+        page load: cookies are set through CDP and the storage is seeded before the page scripts run.
+        """
+        driver.execute_cdp_cmd("Network.setCookies",
+                               {"cookies": [self._cookie_param(cookie) for cookie in self.cookies]})
+        script_id = None
+        if self.local_storage or self.session_storage:
+            source = SEED_STORAGE_JS % (json.dumps(self.origin), json.dumps(self.local_storage),
+                                        json.dumps(self.session_storage))
+            script_id = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                               {"source": source})["identifier"]
+        try:
+            driver.get(url or self.url)
+        finally:
+            if script_id is not None:
+                # Pooled drivers are reused by other tests, which must not get the storage seeded again.
+                driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+
+    @staticmethod
+    def _cookie_param(cookie: dict) -> dict:
+        param = {field: cookie[field] for field in COOKIE_FIELDS if field in cookie}
+        # Session cookies are reported with expires -1, which setCookies would treat as already expired.
+        if param.get("expires", 0) <= 0:
+            param.pop("expires", None)
+        return param
+
+    def to_dict(self) -> dict:
+        return {"url": self.url, "cookies": self.cookies, "local_storage": self.local_storage,
+                "session_storage": self.session_storage, "created_at": self.created_at,
+                "expires_at": self.expires_at}
+
+    def save(self, path: str):
+        """Write the snapshot as JSON, readable by the current user only since it holds session cookies."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as snapshot_file:
+            json.dump(self.to_dict(), snapshot_file)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BrowserStateSnapshot"]:
+        """Snapshot saved at `path`, or None if it's missing, unreadable or expired."""
+        try:
+            with open(path) as snapshot_file:
+                snapshot = cls(**json.load(snapshot_file))
+        except (OSError, ValueError, TypeError):
+            return None
+        return None if snapshot.is_expired() else snapshot
+
+
+def snapshot_path(name: str) -> str:
+    """Location of the named snapshot in Config.BROWSER_STATE_DIR."""
+    return os.path.join(Config.BROWSER_STATE_DIR, "{}.json".format(name))
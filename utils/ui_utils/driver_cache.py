@@ -0,0 +1,150 @@
+"""On-disk cache of the resolved ChromeDriver path, shared across tests, sessions and xdist workers."""
+
+import errno
+import json
+import os
+import time
+from typing import Optional
+from config.settings import Config
+
+
+class FileLock:
+    """
+    Minimal cross-platform inter-process lock based on exclusive creation of a lock file.
+    A lock file older than `stale_after` seconds is considered abandoned and removed.
+    """
+
+    def __init__(self, path: str, timeout: float = 120, stale_after: float = 300):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._fd = None
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(self._fd, str(os.getpid()).encode())
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {self.path}")
+                time.sleep(0.1)
+
+    def __exit__(self, exc_type, exc, tb):
+        os.close(self._fd)
+        self._fd = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class ChromeDriverCache:
+    """
+    Caches the ChromeDriver path resolved by UIUtils together with the installed Chrome version.
+
+    The path is resolved once per process. Across processes the cache file is reused while the
+    driver is still executable, Chrome has not been upgraded and the entry is younger than
+    Config.DRIVER_CACHE_TTL. Resolution is serialized with a lock file so parallel workers only
+    run ChromeDriverManager once.
+    """
+
+    _resolved_path = None
+
+    @classmethod
+    def resolve(cls, resolver) -> str:
+        """
+        Return the cached ChromeDriver path, calling `resolver()` only when no valid entry exists.
+
+        Args:
+            resolver: Callable returning the ChromeDriver path
+
+        Returns:
+            str: Path to the ChromeDriver executable
+        """
+        if cls._resolved_path and cls._is_executable(cls._resolved_path):
+            return cls._resolved_path
+
+        browser_version = cls.get_browser_version()
+        entry = cls._read_valid_entry(browser_version)
+        if entry is None:
+            os.makedirs(os.path.dirname(Config.DRIVER_CACHE_FILE) or ".", exist_ok=True)
+            with FileLock(Config.DRIVER_CACHE_FILE + ".lock"):
+                # Another worker may have resolved the driver while we waited for the lock.
+                entry = cls._read_valid_entry(browser_version)
+                if entry is None:
+                    entry = {"driver_path": resolver(), "browser_version": browser_version,
+                             "resolved_at": time.time()}
+                    cls._write_entry(entry)
+                    print(f"Cached ChromeDriver path in: {Config.DRIVER_CACHE_FILE}")
+
+        cls._resolved_path = entry["driver_path"]
+        return cls._resolved_path
+
+    @classmethod
+    def invalidate(cls):
+        """Forget the cached path, e.g. after the cached driver failed to start a session."""
+        cls._resolved_path = None
+        try:
+            os.remove(Config.DRIVER_CACHE_FILE)
+        except OSError:
+            pass
+
+    @classmethod
+    def is_broken(cls, driver_path, error=None) -> bool:
+        """
+        Whether a failed launch is due to the driver binary itself: missing, not executable, or not an
+        executable of this platform. Chrome crashes, port collisions or session errors don't count.
+
+        Args:
+            driver_path: Path of the driver that failed to start
+            error: The exception raised by the launch
+        """
+        if not cls._is_executable(driver_path):
+            return True
+        return isinstance(error, OSError) and error.errno == errno.ENOEXEC
+
+    @staticmethod
+    def get_browser_version() -> Optional[str]:
+        """Installed Chrome version as reported by the OS, or None if it can't be detected."""
+        try:
+            from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+            return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+        except Exception as e:
+            print(f"Could not detect Chrome version: {e}")
+            return None
+
+    @classmethod
+    def _read_valid_entry(cls, browser_version):
+        try:
+            with open(Config.DRIVER_CACHE_FILE) as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("resolved_at", 0) > Config.DRIVER_CACHE_TTL:
+            return None
+        if entry.get("browser_version") != browser_version:
+            return None
+        if not cls._is_executable(entry.get("driver_path")):
+            return None
+        return entry
+
+    @staticmethod
+    def _write_entry(entry):
+        tmp_path = f"{Config.DRIVER_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as cache_file:
+            json.dump(entry, cache_file)
+        os.replace(tmp_path, Config.DRIVER_CACHE_FILE)
+
+    @staticmethod
+    def _is_executable(path) -> bool:
+        return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
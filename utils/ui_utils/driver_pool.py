@@ -0,0 +1,167 @@
+"""Pool of pre-launched, pre-warmed WebDriver sessions reused between UI tests."""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from selenium import webdriver
+from config.settings import Config
+from utils.ui_utils.ui_utils import UIUtils
+
+
+class DriverPool:
+    """
+    Keeps `size` Chrome sessions alive for the whole test session.
+
+    Tests check a driver out and return it; on return the browser state (cookies, storage,
+    extra tabs, window size) is reset so the next test starts clean. A driver that fails its
+    health check or its reset is quit and replaced by a fresh one. If the replacement can't be
+    launched, its error keeps the slot and the next checkout tries again.
+    """
+
+    # Storage.clearDataForOrigin types: everything an origin keeps besides its cookies.
+    STORAGE_TYPES = "local_storage,indexeddb,websql,file_systems,cache_storage,service_workers"
+
+    def __init__(self, size: int = None, driver_factory=None, warmup_url: str = None):
+        """
+        Args:
+            size: Number of drivers to keep. Defaults to Config.DRIVER_POOL_SIZE
+            driver_factory: Callable returning a new driver. Defaults to UIUtils.get_driver
+            warmup_url: Page loaded once by every new driver to warm DNS, connections and cache.
+                        Defaults to Config.DRIVER_POOL_WARMUP_URL, empty to skip
+        """
+        self.size = size or Config.DRIVER_POOL_SIZE
+        self.driver_factory = driver_factory or UIUtils.get_driver
+        self.warmup_url = Config.DRIVER_POOL_WARMUP_URL if warmup_url is None else warmup_url
+        self._idle = queue.Queue()
+        self._all = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """Launch and warm all drivers in parallel."""
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            for driver in executor.map(lambda _: self._new_driver(), range(self.size)):
+                self._idle.put(driver)
+        return self
+
+    def checkout(self, timeout: float = None) -> webdriver.Chrome:
+        """
+        Take a healthy driver out of the pool, waiting up to `timeout` seconds for one to be returned.
+
+        Returns:
+            webdriver.Chrome: Driver with a clean state
+        """
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        driver = self._idle.get(timeout=timeout or Config.TIMEOUT * 4)
+        if isinstance(driver, Exception) or not self._is_healthy(driver):
+            print("DriverPool: recycling crashed driver session")
+            try:
+                driver = self._replace(driver)
+            except Exception as e:
+                # Keep the slot, otherwise later checkouts wait for a driver that never comes back.
+                self._idle.put(e)
+                raise
+        return driver
+
+    def checkin(self, driver: webdriver.Chrome):
+        """Reset the driver state and make it available again. Broken drivers are replaced."""
+        if self._closed:
+            self._quit(driver)
+            return
+        try:
+            self._reset(driver)
+        except Exception as e:
+            print(f"DriverPool: reset failed ({e}), recycling driver session")
+            try:
+                driver = self._replace(driver)
+            except Exception as replace_error:
+                print(f"DriverPool: replacement failed ({replace_error}), retrying on the next checkout")
+                driver = replace_error
+        self._idle.put(driver)
+
+    @contextmanager
+    def lease(self):
+        """Context manager checking a driver out and back in."""
+        driver = self.checkout()
+        try:
+            yield driver
+        finally:
+            self.checkin(driver)
+
+    def close(self):
+        """Quit every driver, including the ones still checked out."""
+        self._closed = True
+        with self._lock:
+            drivers = list(self._all)
+        for driver in drivers:
+            self._quit(driver)
+
+    def _new_driver(self) -> webdriver.Chrome:
+        driver = self.driver_factory()
+        with self._lock:
+            self._all.add(driver)
+        if self.warmup_url:
+            try:
+                driver.get(self.warmup_url)
+                driver.get("about:blank")
+            except Exception as e:
+                print(f"DriverPool: warm-up navigation failed: {e}")
+        return driver
+
+    def _replace(self, driver) -> webdriver.Chrome:
+        """Quit the driver, or take over the slot of a failed launch, and launch a new one."""
+        if not isinstance(driver, Exception):
+            self._quit(driver)
+        return self._new_driver()
+
+    def _quit(self, driver):
+        with self._lock:
+            self._all.discard(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return bool(driver.window_handles)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _visited_origins(driver) -> set:
+        """Origins of the pages navigated to in every tab of the driver."""
+        origins = set()
+        for handle in driver.window_handles:
+            driver.switch_to.window(handle)
+            for entry in driver.execute_cdp_cmd("Page.getNavigationHistory", {})["entries"]:
+                url = urlsplit(entry["url"])
+                if url.scheme in ("http", "https"):
+                    origins.add("{}://{}".format(url.scheme, url.netloc))
+        return origins
+
+    @classmethod
+    def _reset(cls, driver):
+        origins = cls._visited_origins(driver)
+        # Reset the first tab in place: the CDP setup of the driver (page scripts, blocked URLs) is per tab.
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.switch_to.default_content()
+        # Storage outlives the pages: clear it for every visited origin, sessionStorage of the kept tab included.
+        for origin in origins:
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": cls.STORAGE_TYPES})
+            driver.execute_cdp_cmd("DOMStorage.clear",
+                                   {"storageId": {"securityOrigin": origin, "isLocalStorage": False}})
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.get("about:blank")
+        # Drop the history too, so the next reset only clears the origins of its own lease.
+        driver.execute_cdp_cmd("Page.resetNavigationHistory", {})
+        driver.set_window_size(*Config.WINDOW_SIZE)
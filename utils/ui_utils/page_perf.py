@@ -0,0 +1,254 @@
+"""Page-load performance capture for UIUtils.navigate_to, with a per-page history across runs and a trend report."""
+
+import json
+import os
+import statistics
+import threading
+import time
+import uuid
+from selenium import webdriver
+from config.settings import Config
+from utils.api_utils.api_metrics import percentile
+from utils.ui_utils.driver_cache import FileLock
+
+# Installed in every new document: long tasks are only reported to observers registered while they happen.
+LONG_TASK_OBSERVER_JS = """
+(function () {
+    if (window.__mistLongTasks || !window.PerformanceObserver) { return; }
+    var state = window.__mistLongTasks = {count: 0, total: 0};
+    try {
+        new PerformanceObserver(function (list) {
+            list.getEntries().forEach(function (entry) { state.count++; state.total += entry.duration; });
+        }).observe({type: 'longtask', buffered: true});
+    } catch (e) {}
+})();
+"""
+
+# Navigation Timing, Paint Timing and long tasks of the current document, in ms from the navigation start.
+PAGE_TIMINGS_JS = """
+var nav = performance.getEntriesByType('navigation')[0] || {};
+var paints = {};
+performance.getEntriesByType('paint').forEach(function (entry) { paints[entry.name] = entry.startTime; });
+var longTasks = window.__mistLongTasks || {count: 0, total: 0};
+return {
+    ttfb_ms: nav.responseStart || 0,
+    dom_interactive_ms: nav.domInteractive || 0,
+    dom_content_loaded_ms: nav.domContentLoadedEventEnd || 0,
+    load_ms: nav.loadEventEnd || 0,
+    first_paint_ms: paints['first-paint'] || 0,
+    first_contentful_paint_ms: paints['first-contentful-paint'] || 0,
+    long_tasks: longTasks.count,
+    long_task_ms: longTasks.total
+};
+"""
+
+# CDP Performance.getMetrics durations are cumulative per renderer, so they are measured as a delta
+# around the navigation. Metric name -> (output name, scale).
+CDP_DURATION_METRICS = {
+    "ScriptDuration": ("script_ms", 1000),
+    "LayoutDuration": ("layout_ms", 1000),
+    "RecalcStyleDuration": ("recalc_style_ms", 1000),
+    "TaskDuration": ("task_ms", 1000),
+}
+CDP_GAUGE_METRICS = {
+    "JSHeapUsedSize": ("js_heap_mb", 1.0 / (1024 * 1024)),
+    "Nodes": ("dom_nodes", 1),
+}
+
+# Metrics compared against the history by the trend report.
+TREND_METRICS = ("navigation_ms", "ttfb_ms", "dom_content_loaded_ms", "load_ms", "first_contentful_paint_ms",
+                 "long_task_ms", "script_ms")
+
+
+def get_run_id() -> str:
+    """
+    Identifier of the current test run, shared by the xdist controller and its workers: the controller
+    sets it before the workers start and they inherit it through the environment.
+    """
+    return os.environ.setdefault("MIST_TEST_RUN_ID", uuid.uuid4().hex)
+
+
+def get_cdp_metrics(driver: webdriver.Chrome) -> dict:
+    """Raw CDP Performance.getMetrics values, or {} if the driver doesn't support CDP."""
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    except Exception as e:
+        print(f"Could not read CDP performance metrics: {e}")
+        return {}
+    return {metric["name"]: metric["value"] for metric in metrics}
+
+
+def collect_page_perf(driver: webdriver.Chrome, navigation_seconds: float, cdp_before: dict = None) -> dict:
+    """
+    Collect the performance metrics of the document just loaded.
+
+    Args:
+        driver: WebDriver instance
+        navigation_seconds: Wall time of driver.get()
+        cdp_before: get_cdp_metrics() taken right before the navigation
+
+    Returns:
+        dict: metric name -> value, times in ms
+    """
+    metrics = {"navigation_ms": round(navigation_seconds * 1000, 1)}
+    timings = driver.execute_script(PAGE_TIMINGS_JS) or {}
+    metrics.update({name: round(value or 0, 1) for name, value in timings.items()})
+    if cdp_before is not None:
+        cdp_after = get_cdp_metrics(driver)
+        for cdp_name, (name, scale) in CDP_DURATION_METRICS.items():
+            if cdp_name in cdp_after:
+                metrics[name] = round(max(cdp_after[cdp_name] - cdp_before.get(cdp_name, 0), 0) * scale, 1)
+        for cdp_name, (name, scale) in CDP_GAUGE_METRICS.items():
+            if cdp_name in cdp_after:
+                metrics[name] = round(cdp_after[cdp_name] * scale, 1)
+    return metrics
+
+
+def _page_key(url: str) -> str:
+    # The fragment is kept because it routes the single page app (signin.html#!signup/register).
+    base, _, fragment = url.partition("#")
+    base = base.split("?", 1)[0]
+    return base + ("#" + fragment if fragment else "")
+
+
+class PagePerfRecorder:
+    """
+    Process-wide collector of page-load metrics, aggregated by page URL (query string dropped).
+
+    Every process appends its samples to the history file under a lock at the end of the session, in the
+    entry of the current run, so the trend report sees the pages visited by all xdist workers.
+    """
+
+    _lock = threading.Lock()
+    _samples = {}
+
+    @classmethod
+    def record(cls, url: str, metrics: dict):
+        with cls._lock:
+            cls._samples.setdefault(_page_key(url), []).append(dict(metrics))
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._samples = {}
+
+    @classmethod
+    def samples(cls) -> dict:
+        with cls._lock:
+            return {page: list(samples) for page, samples in cls._samples.items()}
+
+    @classmethod
+    def summary(cls) -> dict:
+        """
+        Aggregate the samples of this process per page.
+
+        Returns:
+            dict: page -> {count, <metric>_p50, <metric>_p95}
+        """
+        return {page: _aggregate(samples) for page, samples in sorted(cls.samples().items())}
+
+    @classmethod
+    def save_history(cls, path: str = None, run_id: str = None, max_runs: int = None):
+        """
+        Merge the samples of this process into the entry of the current run in the history file,
+        keeping the latest `max_runs` runs.
+        """
+        path = path or Config.PAGE_PERF_HISTORY_FILE
+        run_id = run_id or get_run_id()
+        max_runs = Config.PAGE_PERF_HISTORY_RUNS if max_runs is None else max_runs
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with FileLock(path + ".lock"):
+            history = load_history(path)
+            runs = history.setdefault("runs", [])
+            run = next((run for run in runs if run["run_id"] == run_id), None)
+            if run is None:
+                run = {"run_id": run_id, "timestamp": time.time(), "pages": {}}
+                runs.append(run)
+            for page, samples in cls.samples().items():
+                run["pages"].setdefault(page, []).extend(samples)
+            history["runs"] = runs[-max_runs:]
+            with open(path, "w") as history_file:
+                json.dump(history, history_file, indent=2, sort_keys=True)
+        return path
+
+
+def _aggregate(samples: list) -> dict:
+    stats = {"count": len(samples)}
+    for metric in sorted({name for sample in samples for name in sample}):
+        values = sorted(sample[metric] for sample in samples if metric in sample)
+        stats["{}_p50".format(metric)] = percentile(values, 50)
+        stats["{}_p95".format(metric)] = percentile(values, 95)
+    return stats
+
+
+def load_history(path: str = None) -> dict:
+    try:
+        with open(path or Config.PAGE_PERF_HISTORY_FILE) as history_file:
+            return json.load(history_file)
+    except (OSError, ValueError):
+        return {"runs": []}
+
+
+def trend_report(path: str = None, run_id: str = None, threshold_pct: float = None, min_baseline_runs: int = None):
+    """
+    Compare the median of every page metric in the current run with its baseline, the median of the
+    per-run medians of the previous runs.
+
+    Args:
+        path: History file, Config.PAGE_PERF_HISTORY_FILE by default
+        run_id: Current run, get_run_id() by default
+        threshold_pct: Increase over the baseline flagged as a regression
+        min_baseline_runs: Previous runs with the page needed before a metric is judged
+
+    Returns:
+        List[dict]: One row per page and metric: page, metric, baseline, current, change_pct, runs, regressed
+    """
+    run_id = run_id or get_run_id()
+    threshold_pct = Config.PAGE_PERF_REGRESSION_PCT if threshold_pct is None else threshold_pct
+    min_baseline_runs = Config.PAGE_PERF_BASELINE_RUNS if min_baseline_runs is None else min_baseline_runs
+    runs = load_history(path)["runs"]
+    current = next((run for run in runs if run["run_id"] == run_id), None)
+    if current is None:
+        return []
+    previous = [run for run in runs if run["run_id"] != run_id]
+
+    rows = []
+    for page, samples in sorted(current["pages"].items()):
+        for metric in TREND_METRICS:
+            values = [sample[metric] for sample in samples if metric in sample]
+            if not values:
+                continue
+            baselines = [statistics.median(run_values) for run_values in
+                         ([sample[metric] for sample in run["pages"].get(page, []) if metric in sample]
+                          for run in previous) if run_values]
+            row = {"page": page, "metric": metric, "current": statistics.median(values), "baseline": None,
+                   "change_pct": None, "runs": len(baselines), "regressed": False}
+            if len(baselines) >= min_baseline_runs:
+                row["baseline"] = statistics.median(baselines)
+                if row["baseline"] > 0:
+                    row["change_pct"] = round((row["current"] - row["baseline"]) / row["baseline"] * 100, 1)
+                    row["regressed"] = row["change_pct"] > threshold_pct
+            rows.append(row)
+    return rows
+
+
+def format_trend(rows: list, labels: dict = None) -> str:
+    """
+    Render trend_report() rows as a fixed-width text table.
+
+    Args:
+        rows: Rows returned by trend_report()
+        labels: Optional mapping of page URL -> display name
+    """
+    labels = labels or {}
+    header = "{:<40} {:<28} {:>10} {:>10} {:>8} {:>5}  {}".format(
+        "page", "metric", "baseline", "current", "change", "runs", "status")
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append("{:<40} {:<28} {:>10} {:>10} {:>8} {:>5}  {}".format(
+            labels.get(row["page"], row["page"])[-40:], row["metric"],
+            "-" if row["baseline"] is None else round(row["baseline"], 1), round(row["current"], 1),
+            "-" if row["change_pct"] is None else "{:+.1f}%".format(row["change_pct"]), row["runs"],
+            "REGRESSION" if row["regressed"] else ("no baseline" if row["baseline"] is None else "ok")))
+    return "\n".join(lines)
@@ -0,0 +1,160 @@
+"""Helpers to run UI tests in parallel pytest-xdist workers without sharing browser state or artifacts."""
+
+import itertools
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from config.settings import Config
+
+_port_counter = itertools.count()
+_port_lock = threading.Lock()
+
+
+def get_worker_id() -> str:
+    """xdist worker id ("gw0", "gw1", ...) or "master" when not running under xdist."""
+    return os.getenv("PYTEST_XDIST_WORKER", "master")
+
+
+def get_worker_index() -> int:
+    """Numeric index of the xdist worker, 0 when not running under xdist."""
+    worker_id = get_worker_id()
+    return int(worker_id[2:]) if worker_id.startswith("gw") else 0
+
+
+def worker_artifact_dir(base_dir: str) -> str:
+    """Per-worker sub-directory of `base_dir`, created if missing."""
+    path = os.path.join(base_dir, get_worker_id())
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def worker_profile_root() -> str:
+    """Directory holding the Chrome user-data directories of this worker."""
+    return os.path.join(Config.BROWSER_PROFILE_ROOT, get_worker_id())
+
+
+def new_user_data_dir() -> str:
+    """Fresh Chrome user-data directory owned by this worker."""
+    root = worker_profile_root()
+    os.makedirs(root, exist_ok=True)
+    return tempfile.mkdtemp(prefix="chrome-", dir=root)
+
+
+def cleanup_worker_profiles():
+    """Remove every user-data directory created by this worker."""
+    shutil.rmtree(worker_profile_root(), ignore_errors=True)
+
+
+def _port_is_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        try:
+            probe.bind(("127.0.0.1", port))
+            return True
+        except OSError:
+            return False
+
+
+def next_remote_debugging_port() -> int:
+    """
+    Remote debugging port for the next browser of this worker. Each worker owns a block of
+    Config.REMOTE_DEBUGGING_PORTS_PER_WORKER ports starting at Config.REMOTE_DEBUGGING_BASE_PORT,
+    handed out in turn; once the block wraps around, the ports still in use are skipped.
+
+    Raises:
+        RuntimeError: If every port of the block is in use
+    """
+    block_size = Config.REMOTE_DEBUGGING_PORTS_PER_WORKER
+    first_port = Config.REMOTE_DEBUGGING_BASE_PORT + get_worker_index() * block_size
+    with _port_lock:
+        for _ in range(block_size):
+            port = first_port + next(_port_counter) % block_size
+            if _port_is_free(port):
+                return port
+    raise RuntimeError(f"All {block_size} remote debugging ports of worker {get_worker_id()} "
+                       f"({first_port}-{first_port + block_size - 1}) are in use, "
+                       f"raise REMOTE_DEBUGGING_PORTS_PER_WORKER")
+
+
+def selects_ui_tests(args, ui_tests_dir: str) -> bool:
+    """
+    Whether a pytest run over `args` (paths or node ids, the current directory if empty) includes UI tests.
+
+    Args:
+        args: pytest positional arguments
+        ui_tests_dir: Directory of the UI tests
+    """
+    ui_tests_dir = os.path.abspath(ui_tests_dir)
+    for arg in args or [os.curdir]:
+        path = os.path.abspath(arg.split("::", 1)[0])
+        if path == ui_tests_dir or path.startswith(ui_tests_dir + os.sep) or \
+                ui_tests_dir.startswith(path.rstrip(os.sep) + os.sep):
+            return True
+    return False
+
+
+def max_parallel_browsers() -> int:
+    """
+    Number of browsers the host can run in parallel: bounded by the CPU count and by the
+    available memory divided by Config.BROWSER_MEMORY_MB, and by Config.MAX_UI_WORKERS if set.
+    """
+    limit = os.cpu_count() or 1
+    try:
+        available_mb = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+        limit = min(limit, max(available_mb // Config.BROWSER_MEMORY_MB, 1))
+    except (AttributeError, ValueError, OSError):
+        # os.sysconf is not available on Windows, fall back to the CPU count.
+        pass
+    if Config.MAX_UI_WORKERS:
+        limit = min(limit, Config.MAX_UI_WORKERS)
+    return max(limit, 1)
+
+
+class TestDurationHistory:
+    """
+    Historical duration of each test file, used to start the slowest files first so that
+    `--dist loadfile` spreads the work evenly across workers (longest processing time first).
+    """
+
+    # Not a test class, despite the name.
+    __test__ = False
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.TEST_DURATIONS_FILE
+        self.durations = self._load()
+        self._current = {}
+
+    def _load(self):
+        try:
+            with open(self.path) as history_file:
+                return json.load(history_file)
+        except (OSError, ValueError):
+            return {}
+
+    def record(self, nodeid: str, duration: float):
+        """Add the duration of one test phase to its file's total for the current run."""
+        test_file = nodeid.split("::", 1)[0]
+        self._current[test_file] = self._current.get(test_file, 0.0) + duration
+
+    def save(self, smoothing: float = 0.5):
+        """Merge the current run into the history as an exponential moving average and write it."""
+        for test_file, duration in self._current.items():
+            previous = self.durations.get(test_file)
+            self.durations[test_file] = duration if previous is None else \
+                smoothing * duration + (1 - smoothing) * previous
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as history_file:
+            json.dump(self.durations, history_file, indent=2, sort_keys=True)
+
+    def sort_items(self, items):
+        """
+        Reorder collected items in place so files with the longest history come first.
+        Files without history keep their relative order after the known ones. Tests within a file keep their order.
+        """
+        file_order = {}
+        for item in items:
+            file_order.setdefault(item.nodeid.split("::", 1)[0], len(file_order))
+        items.sort(key=lambda item: (-self.durations.get(item.nodeid.split("::", 1)[0], 0.0),
+                                     file_order[item.nodeid.split("::", 1)[0]]))
@@ -0,0 +1,114 @@
+"""Network resource policy applied to Chrome: URL blocking, image/animation switches and network timing capture."""
+
+from typing import List
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from config.settings import Config
+
+# CDP Network.setBlockedURLs only matches URL patterns, so resource types are mapped to the
+# file extensions that serve them.
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.svg*", "*.webp*", "*.ico*"],
+    "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.ogg*", "*.wav*"],
+    "stylesheet": ["*.css*"],
+}
+
+DISABLE_ANIMATIONS_JS = """
+(function () {
+    var css = '*, *::before, *::after { animation: none !important; transition: none !important; ' +
+              'scroll-behavior: auto !important; caret-color: transparent !important; }';
+    function inject() {
+        var style = document.createElement('style');
+        style.textContent = css;
+        (document.head || document.documentElement).appendChild(style);
+    }
+    if (document.documentElement) { inject(); } else { document.addEventListener('DOMContentLoaded', inject); }
+})();
+"""
+
+# Resource timing entries of the current document, in one round-trip.
+NETWORK_TIMINGS_JS = """
+return performance.getEntriesByType('resource').map(function (entry) {
+    return {
+        name: entry.name,
+        initiatorType: entry.initiatorType,
+        startTime: Math.round(entry.startTime),
+        duration: Math.round(entry.duration),
+        transferSize: entry.transferSize || 0
+    };
+});
+"""
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+class ResourcePolicy:
+    """
+    What the browser is allowed to load.
+
+    Args:
+        blocked_url_patterns: URL patterns ("*" wildcards) never requested
+        blocked_resource_types: Resource types to block: image, font, media, stylesheet
+        disable_images: Turn image loading off through the Chrome content settings
+        disable_animations: Turn CSS animations and transitions off in every document
+    """
+
+    def __init__(self, blocked_url_patterns=None, blocked_resource_types=None, disable_images=False,
+                 disable_animations=False):
+        self.blocked_url_patterns = list(blocked_url_patterns or [])
+        self.blocked_resource_types = [resource_type.lower() for resource_type in blocked_resource_types or []]
+        self.disable_images = disable_images
+        self.disable_animations = disable_animations
+        unknown = set(self.blocked_resource_types) - set(RESOURCE_TYPE_PATTERNS)
+        if unknown:
+            raise ValueError(f"Unknown resource types {sorted(unknown)}, choose from {sorted(RESOURCE_TYPE_PATTERNS)}")
+
+    @classmethod
+    def from_config(cls) -> "ResourcePolicy":
+        return cls(blocked_url_patterns=_split(Config.BLOCKED_URL_PATTERNS),
+                   blocked_resource_types=_split(Config.BLOCKED_RESOURCE_TYPES),
+                   disable_images=Config.DISABLE_IMAGES,
+                   disable_animations=Config.DISABLE_ANIMATIONS)
+
+    @property
+    def url_patterns(self) -> List[str]:
+        patterns = list(self.blocked_url_patterns)
+        for resource_type in self.blocked_resource_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+        return patterns
+
+    def apply_to_options(self, chrome_options: Options):
+        """Settings that must be given at launch."""
+        if self.disable_images:
+            chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        if self.disable_animations:
+            chrome_options.add_argument("--force-prefers-reduced-motion")
+
+    def apply_to_driver(self, driver: webdriver.Chrome):
+        """Settings applied through the Chrome DevTools Protocol once the session exists."""
+        patterns = self.url_patterns
+        if patterns:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        if self.disable_animations:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": DISABLE_ANIMATIONS_JS})
+
+
+def collect_network_timings(driver: webdriver.Chrome) -> dict:
+    """
+    Summarize the resources loaded by the current document.
+
+    Returns:
+        dict: url, resource count, total transfer size, and the resource entries sorted slowest first
+    """
+    entries = driver.execute_script(NETWORK_TIMINGS_JS) or []
+    return {
+        "url": driver.current_url,
+        "resources": len(entries),
+        "transfer_bytes": sum(entry["transferSize"] for entry in entries),
+        "entries": sorted(entries, key=lambda entry: entry["duration"], reverse=True),
+    }
@@ -1,28 +1,49 @@
 """UI utility functions for Selenium operations."""
 
+import base64
 import os
 import shutil
 import subprocess
+import threading
+import time
 from typing import List, Optional
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 from webdriver_manager.chrome import ChromeDriverManager
 from config.settings import Config
+from utils.ui_utils.driver_cache import ChromeDriverCache
+from utils.ui_utils import parallel_utils
+from utils.ui_utils.wait_utils import AdaptiveWait, PAGE_INSTRUMENTATION_JS, PAGE_STATE_JS
+from utils.ui_utils import batch_utils
+from utils.ui_utils.resource_policy import ResourcePolicy, collect_network_timings
+from utils.ui_utils import page_perf
+from utils.ui_utils.artifact_writer import ArtifactWriter, artifact_name
+from utils.ui_utils.browser_state import BrowserStateSnapshot
 
 
 class UIUtils:
     """Utility class for UI automation operations."""
 
+    # Lookup timings per locator across all instances: "by=value" -> {lookups, cache_hits, total_seconds, max_seconds}
+    _locator_stats = {}
+    _locator_stats_lock = threading.Lock()
+
     def __init__(self, driver: webdriver.Chrome):
         self.driver = driver
-        self.wait = WebDriverWait(driver, Config.TIMEOUT)
+        self.wait = AdaptiveWait(driver, Config.TIMEOUT)
         self.implicit_wait = Config.IMPLICIT_WAIT
+        # Element handles of the current page, cleared on navigation and re-resolved when stale.
+        self._element_cache = {}
+        # Resource timings of each navigation, when Config.CAPTURE_NETWORK_TIMINGS is on.
+        self.network_timings = []
+        # Page-load metrics of the last navigation captured by navigate_to.
+        self.last_page_perf = None
 
     @staticmethod
     def get_driver() -> webdriver.Chrome:
@@ -40,28 +61,34 @@ class UIUtils:
 
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--window-size=1920,1080')
+        chrome_options.add_argument('--window-size={},{}'.format(*Config.WINDOW_SIZE))
         chrome_options.add_argument('--disable-web-security')
         chrome_options.add_argument('--allow-running-insecure-content')
+        ResourcePolicy.from_config().apply_to_options(chrome_options)
+        # Isolate every browser so parallel workers don't share a profile or a debugging port.
+        chrome_options.add_argument(f'--user-data-dir={parallel_utils.new_user_data_dir()}')
+        chrome_options.add_argument(f'--remote-debugging-port={parallel_utils.next_remote_debugging_port()}')
 
         # Method 1: Try to get the correct chromedriver path
+        driver_path = None
         try:
             driver_path = UIUtils._get_chromedriver_path()
             print(f"Using ChromeDriver at: {driver_path}")
             service = Service(driver_path)
             driver = webdriver.Chrome(service=service, options=chrome_options)
-            driver.implicitly_wait(Config.IMPLICIT_WAIT)
-            return driver
+            return UIUtils._prepare_driver(driver)
         except Exception as e:
             print(f"Method 1 failed: {e}")
+            # The cache is shared by every worker: only drop it when the cached binary itself is unusable.
+            if driver_path and ChromeDriverCache.is_broken(driver_path, e):
+                ChromeDriverCache.invalidate()
 
         # Method 2: Try with system ChromeDriver
         try:
             print("Trying system ChromeDriver...")
             service = Service('/usr/local/bin/chromedriver')
             driver = webdriver.Chrome(service=service, options=chrome_options)
-            driver.implicitly_wait(Config.IMPLICIT_WAIT)
-            return driver
+            return UIUtils._prepare_driver(driver)
         except Exception as e:
             print(f"Method 2 failed: {e}")
 
@@ -70,8 +97,7 @@ class UIUtils:
             print("Trying Homebrew ChromeDriver...")
             service = Service('/opt/homebrew/bin/chromedriver')
             driver = webdriver.Chrome(service=service, options=chrome_options)
-            driver.implicitly_wait(Config.IMPLICIT_WAIT)
-            return driver
+            return UIUtils._prepare_driver(driver)
         except Exception as e:
             print(f"Method 3 failed: {e}")
 
@@ -79,15 +105,48 @@ class UIUtils:
         try:
             print("Trying default ChromeDriver...")
             driver = webdriver.Chrome(options=chrome_options)
-            driver.implicitly_wait(Config.IMPLICIT_WAIT)
-            return driver
+            return UIUtils._prepare_driver(driver)
         except Exception as e:
             print(f"Method 4 failed: {e}")
 
         raise Exception("All ChromeDriver initialization methods failed. Please install ChromeDriver manually.")
 
+    @staticmethod
+    def _prepare_driver(driver: webdriver.Chrome) -> webdriver.Chrome:
+        """
+        Apply the common settings to a freshly launched driver: the implicit wait (0 by default),
+        the page activity instrumentation used by the wait_for_* methods, installed in every
+        new document so it also sees the requests made while the page loads, and the resource policy.
+        """
+        driver.implicitly_wait(Config.IMPLICIT_WAIT)
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": PAGE_INSTRUMENTATION_JS})
+        except Exception as e:
+            print(f"Could not install page instrumentation, it will be injected on demand: {e}")
+        if Config.CAPTURE_PAGE_PERF:
+            try:
+                driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                       {"source": page_perf.LONG_TASK_OBSERVER_JS})
+            except Exception as e:
+                print(f"Could not install the long task observer: {e}")
+        try:
+            ResourcePolicy.from_config().apply_to_driver(driver)
+        except Exception as e:
+            print(f"Could not apply the resource policy: {e}")
+        return driver
+
     @staticmethod
     def _get_chromedriver_path():
+        """
+        Get the ChromeDriver path, resolved once and then served from the on-disk ChromeDriverCache.
+
+        Returns:
+            str: Path to ChromeDriver executable
+        """
+        return ChromeDriverCache.resolve(UIUtils._resolve_chromedriver_path)
+
+    @staticmethod
+    def _resolve_chromedriver_path():
         """
         Get the correct ChromeDriver path, fixing common issues.
 
@@ -167,9 +226,41 @@ class UIUtils:
         brew install chromedriver
         """)
 
-    def navigate_to(self, url: str):
-        """Navigate to the specified URL."""
+    def navigate_to(self, url: str, capture_perf: Optional[bool] = None):
+        """
+        Navigate to the specified URL.
+
+        Args:
+            url: URL to load
+            capture_perf: Collect the page-load metrics into self.last_page_perf and the PagePerfRecorder,
+                Config.CAPTURE_PAGE_PERF by default
+        """
+        capture_perf = Config.CAPTURE_PAGE_PERF if capture_perf is None else capture_perf
+        self.invalidate_element_cache()
+        cdp_before = page_perf.get_cdp_metrics(self.driver) if capture_perf else None
+        started_at = time.perf_counter()
         self.driver.get(url)
+        if capture_perf:
+            self.last_page_perf = page_perf.collect_page_perf(self.driver, time.perf_counter() - started_at,
+                                                              cdp_before)
+            page_perf.PagePerfRecorder.record(url, self.last_page_perf)
+        if Config.CAPTURE_NETWORK_TIMINGS:
+            self.network_timings.append(collect_network_timings(self.driver))
+
+    def capture_browser_state(self, ttl: float = None) -> BrowserStateSnapshot:
+        """Snapshot the cookies and the storage of the current page, see BrowserStateSnapshot.capture."""
+        return BrowserStateSnapshot.capture(self.driver, ttl)
+
+    def restore_browser_state(self, snapshot: BrowserStateSnapshot, url: str = None):
+        """
+        Restore a snapshot and navigate to `url`, the snapshot page by default.
+
+        Args:
+            snapshot: State captured by capture_browser_state
+            url: Page to open once the state is restored
+        """
+        self.invalidate_element_cache()
+        snapshot.restore(self.driver, url)
 
     def find_element(self, by: By, value: str) -> WebElement:
         """
@@ -182,7 +273,59 @@ class UIUtils:
         Returns:
             WebElement: Found element
         """
-        return self.wait.until(EC.presence_of_element_located((by, value)))
+        started_at = time.perf_counter()
+        element = self.wait.until(EC.presence_of_element_located((by, value)))
+        self._record_lookup(by, value, time.perf_counter() - started_at)
+        self._element_cache[(by, value)] = element
+        return element
+
+    def get_cached_element(self, by: By, value: str) -> WebElement:
+        """
+        Return the element handle cached for this locator on the current page, looking it up
+        (with explicit wait) only on the first use. The handle may be stale; use _with_element
+        to retry automatically.
+        """
+        element = self._element_cache.get((by, value))
+        if element is None:
+            return self.find_element(by, value)
+        self._record_lookup(by, value, 0.0, cache_hit=True)
+        return element
+
+    def invalidate_element_cache(self):
+        """Forget every cached element handle, e.g. after the page changed."""
+        self._element_cache.clear()
+
+    def _with_element(self, by: By, value: str, action):
+        """Run action(element) on the cached element, re-resolving it once if it went stale."""
+        try:
+            return action(self.get_cached_element(by, value))
+        except StaleElementReferenceException:
+            self._element_cache.pop((by, value), None)
+            return action(self.find_element(by, value))
+
+    def _record_lookup(self, by, value, seconds, cache_hit=False):
+        key = "{}={}".format(by, value)
+        with UIUtils._locator_stats_lock:
+            stats = UIUtils._locator_stats.setdefault(key, {"lookups": 0, "cache_hits": 0,
+                                                            "total_seconds": 0.0, "max_seconds": 0.0})
+            if cache_hit:
+                stats["cache_hits"] += 1
+            else:
+                stats["lookups"] += 1
+                stats["total_seconds"] += seconds
+                stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    @classmethod
+    def get_locator_stats(cls) -> List[dict]:
+        """
+        Lookup timings per locator, slowest first.
+
+        Returns:
+            List[dict]: {"locator", "lookups", "cache_hits", "total_seconds", "max_seconds"}
+        """
+        with cls._locator_stats_lock:
+            stats = [dict(locator=locator, **values) for locator, values in cls._locator_stats.items()]
+        return sorted(stats, key=lambda entry: entry["total_seconds"], reverse=True)
 
     def find_elements(self, by: By, value: str) -> List[WebElement]:
         """
@@ -212,35 +355,39 @@ class UIUtils:
             text: Text to send
             clear_first: Whether to clear the field first
         """
-        element = self.find_element(by, value)
-        if clear_first:
-            element.clear()
-        element.send_keys(text)
+        def type_text(element):
+            if clear_first:
+                element.clear()
+            element.send_keys(text)
+        self._with_element(by, value, type_text)
 
     def get_text(self, by: By, value: str) -> str:
         """Get text from an element."""
-        element = self.find_element(by, value)
-        return element.text
+        return self._with_element(by, value, lambda element: element.text)
 
     def get_attribute(self, by: By, value: str, attribute: str) -> str:
         """Get attribute value from an element."""
-        element = self.find_element(by, value)
-        return element.get_attribute(attribute)
+        return self._with_element(by, value, lambda element: element.get_attribute(attribute))
 
-    def is_element_visible(self, by: By, value: str) -> bool:
-        """Check if element is visible."""
+    def is_element_visible(self, by: By, value: str, timeout: float = None) -> bool:
+        """Check if element is visible, waiting up to `timeout` seconds (Config.TIMEOUT by default)."""
         try:
-            self.wait.until(EC.visibility_of_element_located((by, value)))
+            AdaptiveWait(self.driver, timeout).until(EC.visibility_of_element_located((by, value)))
             return True
-        except:
+        except TimeoutException:
             return False
 
-    def is_element_present(self, by: By, value: str) -> bool:
-        """Check if element is present in DOM."""
+    def is_element_present(self, by: By, value: str, timeout: float = 0) -> bool:
+        """
+        Check if element is present in DOM. Returns immediately by default;
+        pass a timeout to wait for an element that is still being rendered.
+        """
+        if not timeout:
+            return bool(self.driver.find_elements(by, value))
         try:
-            self.find_element(by, value)
+            AdaptiveWait(self.driver, timeout).until(lambda driver: driver.find_elements(by, value))
             return True
-        except:
+        except TimeoutException:
             return False
 
     def wait_for_element_to_disappear(self, by: By, value: str):
@@ -251,40 +398,188 @@ class UIUtils:
         """Wait for specific text to appear in element."""
         self.wait.until(EC.text_to_be_present_in_element((by, value), text))
 
+    def wait_until(self, condition, timeout: float = None, message: str = ""):
+        """
+        Wait with adaptive polling until condition(driver) returns a truthy value.
+
+        Args:
+            condition: Callable taking the driver, e.g. an expected_conditions instance
+            timeout: Seconds to wait. Defaults to Config.TIMEOUT
+            message: Message of the TimeoutException
+
+        Returns:
+            The truthy value returned by the condition
+        """
+        return AdaptiveWait(self.driver, timeout).until(condition, message)
+
+    def get_page_activity(self) -> dict:
+        """
+        Read the page activity probe in one round-trip.
+
+        Returns:
+            dict: readyState, pending (in-flight fetch/XHR), networkIdleMs (since the last request ended)
+                  and domIdleMs (since the last DOM mutation)
+        """
+        return self.driver.execute_script(PAGE_STATE_JS)
+
+    def wait_for_dom_ready(self, timeout: float = None):
+        """Wait until document.readyState is complete."""
+        self.wait_until(lambda driver: self.get_page_activity()["readyState"] == "complete", timeout,
+                        "Document did not finish loading")
+
+    def wait_for_network_idle(self, idle_ms: int = None, timeout: float = None):
+        """Wait until no fetch/XHR is in flight and no resource finished loading for `idle_ms`."""
+        idle_ms = Config.NETWORK_IDLE_MS if idle_ms is None else idle_ms
+
+        def network_idle(driver):
+            activity = self.get_page_activity()
+            return activity["pending"] == 0 and activity["networkIdleMs"] >= idle_ms
+        self.wait_until(network_idle, timeout, "Network did not become idle")
+
+    def wait_for_dom_stable(self, quiet_ms: int = None, timeout: float = None):
+        """Wait until the page went `quiet_ms` without DOM mutations (MutationObserver)."""
+        quiet_ms = Config.NETWORK_IDLE_MS if quiet_ms is None else quiet_ms
+        self.wait_until(lambda driver: self.get_page_activity()["domIdleMs"] >= quiet_ms, timeout,
+                        "DOM did not settle")
+
+    def wait_for_page_ready(self, idle_ms: int = None, timeout: float = None):
+        """
+        Wait until the page is loaded and the single page app has settled: document complete,
+        no pending requests and no DOM mutations for `idle_ms`.
+        """
+        idle_ms = Config.NETWORK_IDLE_MS if idle_ms is None else idle_ms
+
+        def page_ready(driver):
+            activity = self.get_page_activity()
+            return activity["readyState"] == "complete" and activity["pending"] == 0 \
+                and activity["networkIdleMs"] >= idle_ms and activity["domIdleMs"] >= idle_ms
+        self.wait_until(page_ready, timeout, "Page did not become ready")
+
+    def run_batch(self, actions: List[dict], strict: bool = True) -> List[dict]:
+        """
+        Run several DOM actions in a single execute_script round-trip.
+
+        Actions are built with the helpers of utils.ui_utils.batch_utils (fill, check, click, text,
+        attribute, visible, present). Fills marked native=True are typed afterwards with real key events.
+
+        Args:
+            actions: List of actions, run in order
+            strict: Raise BatchError if any action failed
+
+        Returns:
+            List[dict]: One {"ok": bool, "value": ..., "error": str} per action, in order
+        """
+        results = self.driver.execute_script(batch_utils.BATCH_JS, actions)
+        for action, result in zip(actions, results):
+            element = result.pop("element", None)
+            if element is not None:
+                element.clear()
+                element.send_keys(action["text"])
+                result["value"] = element.get_attribute("value")
+        if strict and not all(result["ok"] for result in results):
+            raise batch_utils.BatchError(results)
+        return results
+
+    def fill_fields(self, fields: dict, native: bool = False):
+        """
+        Fill several inputs in one round-trip.
+
+        Args:
+            fields: Mapping of (by, value) locator -> text
+            native: Type the texts with real key events instead of setting the values
+        """
+        self.run_batch([batch_utils.fill(by, value, text, native) for (by, value), text in fields.items()])
+
+    def get_texts(self, locators: List[tuple]) -> List[str]:
+        """Visible texts of several elements in one round-trip."""
+        return [result["value"] for result in self.run_batch([batch_utils.text(*locator) for locator in locators])]
+
+    def get_visibilities(self, locators: List[tuple]) -> List[bool]:
+        """Visibility of several elements in one round-trip. Missing elements are reported as not visible."""
+        return [result["value"] for result in self.run_batch([batch_utils.visible(*locator) for locator in locators])]
+
     def scroll_to_element(self, by: By, value: str):
         """Scroll to element."""
-        element = self.find_element(by, value)
-        self.driver.execute_script("arguments[0].scrollIntoView();", element)
+        self._with_element(by, value,
+                           lambda element: self.driver.execute_script("arguments[0].scrollIntoView();", element))
 
     def select_dropdown_by_text(self, by: By, value: str, text: str):
         """Select dropdown option by visible text."""
         from selenium.webdriver.support.ui import Select
-        element = self.find_element(by, value)
-        select = Select(element)
-        select.select_by_visible_text(text)
+        self._with_element(by, value, lambda element: Select(element).select_by_visible_text(text))
 
-    def take_screenshot(self, filename: str):
+    def get_screenshot_bytes(self) -> bytes:
+        """
+        Screenshot of the viewport, encoded by Chrome in Config.SCREENSHOT_FORMAT (webp, jpeg or png).
+        Falls back to a WebDriver PNG when CDP isn't available.
+        """
+        if Config.SCREENSHOT_FORMAT != "png":
+            try:
+                result = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+                    "format": Config.SCREENSHOT_FORMAT, "quality": Config.SCREENSHOT_QUALITY})
+                return base64.b64decode(result["data"])
+            except Exception as e:
+                print(f"Could not capture a {Config.SCREENSHOT_FORMAT} screenshot, falling back to PNG: {e}")
+        return self.driver.get_screenshot_as_png()
+
+    def take_screenshot(self, filename: Optional[str] = None) -> Optional[str]:
         """
-        Take screenshot and save to file.
+        Take a screenshot and hand it to the background artifact writer.
 
         Args:
-            filename: Name of the screenshot file
+            filename: Optional label of the screenshot, its extension is replaced by the actual format.
+                The file is named after the running test.
+
+        Returns:
+            str: Path the screenshot is written to, or None if the artifact queue dropped it
+        """
+        data = self.get_screenshot_bytes()
+        extension = "png" if data.startswith(b"\x89PNG") else Config.SCREENSHOT_FORMAT
+        label = os.path.splitext(filename)[0] if filename else "screenshot"
+        return ArtifactWriter.shared().submit(artifact_name(label, extension), data)
+
+    def save_page_source(self, label: str = "page_source") -> Optional[str]:
+        """
+        Hand the current page source to the background artifact writer, gzip compressed.
+
+        Returns:
+            str: Path the page source is written to, or None if the artifact queue dropped it
+        """
+        return ArtifactWriter.shared().submit(artifact_name(label, "html"), self.driver.page_source.encode("utf-8"),
+                                              compress=True)
+
+    def capture_failure_artifacts(self, label: str = "failure") -> List[str]:
+        """
+        Screenshot and page source of the current page, for the error path of a test.
+        Never raises, so the original failure is the one reported.
+
+        Returns:
+            List[str]: Paths of the queued artifacts
         """
-        os.makedirs(Config.SCREENSHOT_DIR, exist_ok=True)
-        filepath = os.path.join(Config.SCREENSHOT_DIR, filename)
-        self.driver.save_screenshot(filepath)
-        return filepath
+        paths = []
+        for capture in (lambda: self.take_screenshot(label), lambda: self.save_page_source(label)):
+            try:
+                path = capture()
+            except Exception as e:
+                print(f"Could not capture failure artifact: {e}")
+                continue
+            if path:
+                paths.append(path)
+        return paths
 
     def switch_to_frame(self, frame_reference):
         """Switch to iframe."""
+        self.invalidate_element_cache()
         self.driver.switch_to.frame(frame_reference)
 
     def switch_to_default_content(self):
         """Switch back to default content from iframe."""
+        self.invalidate_element_cache()
         self.driver.switch_to.default_content()
 
     def switch_to_window(self, window_handle: str):
         """Switch to specific browser window."""
+        self.invalidate_element_cache()
         self.driver.switch_to.window(window_handle)
 
     def get_current_url(self) -> str:
@@ -297,10 +592,12 @@ class UIUtils:
 
     def refresh_page(self):
         """Refresh the current page."""
+        self.invalidate_element_cache()
         self.driver.refresh()
 
     def go_back(self):
         """Navigate back in browser history."""
+        self.invalidate_element_cache()
         self.driver.back()
 
     def execute_script(self, script: str, *args):
@@ -0,0 +1,108 @@
+"""Event-driven waits for UIUtils: page activity probes injected in the browser and adaptive polling."""
+
+import time
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from config.settings import Config
+
+# Installed in every document (through CDP on new documents, or on demand). Tracks in-flight
+# fetch/XHR requests and the time of the last network activity and DOM mutation in window.__mistWait.
+PAGE_INSTRUMENTATION_JS = """
+(function () {
+    if (window.__mistWait) { return; }
+    var state = window.__mistWait = {pending: 0, lastNetwork: Date.now(), lastMutation: Date.now(), observing: false};
+    function touch() { state.lastNetwork = Date.now(); }
+    function mutated() { state.lastMutation = Date.now(); }
+    function done() { state.pending = Math.max(state.pending - 1, 0); touch(); }
+
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            state.pending++; touch();
+            return originalFetch.apply(this, arguments).then(
+                function (response) { done(); return response; },
+                function (error) { done(); throw error; });
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.pending++; touch();
+        this.addEventListener('loadend', done);
+        return originalSend.apply(this, arguments);
+    };
+
+    function observe() {
+        if (state.observing || !document.documentElement) { return; }
+        new MutationObserver(mutated).observe(document.documentElement,
+            {childList: true, subtree: true, attributes: true, characterData: true});
+        state.observing = true;
+    }
+    observe();
+    document.addEventListener('DOMContentLoaded', observe);
+})();
+"""
+
+# One round-trip returning everything the page-ready waits need.
+PAGE_STATE_JS = PAGE_INSTRUMENTATION_JS + """
+var state = window.__mistWait;
+var lastResource = 0;
+if (window.performance && performance.getEntriesByType) {
+    var resources = performance.getEntriesByType('resource');
+    if (resources.length) {
+        lastResource = performance.timeOrigin + resources[resources.length - 1].responseEnd;
+    }
+}
+var now = Date.now();
+return {
+    readyState: document.readyState,
+    pending: state.pending,
+    networkIdleMs: now - Math.max(state.lastNetwork, lastResource),
+    domIdleMs: now - state.lastMutation
+};
+"""
+
+
+class AdaptiveWait:
+    """
+    Drop-in replacement for WebDriverWait whose poll interval starts small and grows geometrically,
+    so fast conditions return almost immediately while slow ones don't flood the driver with calls.
+    """
+
+    def __init__(self, driver, timeout: float = None, min_poll: float = None, max_poll: float = None,
+                 ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)):
+        self.driver = driver
+        self.timeout = Config.TIMEOUT if timeout is None else timeout
+        self.min_poll = Config.WAIT_MIN_POLL if min_poll is None else min_poll
+        self.max_poll = Config.WAIT_MAX_POLL if max_poll is None else max_poll
+        self.ignored_exceptions = tuple(ignored_exceptions)
+
+    def _poll(self, predicate, message):
+        deadline = time.monotonic() + self.timeout
+        interval = self.min_poll
+        while True:
+            result = predicate()
+            if result is not None:
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(message)
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 1.5, self.max_poll)
+
+    def until(self, condition, message: str = ""):
+        """Wait until condition(driver) returns a truthy value and return it."""
+        def predicate():
+            try:
+                value = condition(self.driver)
+                return value if value else None
+            except self.ignored_exceptions:
+                return None
+        return self._poll(predicate, message)
+
+    def until_not(self, condition, message: str = ""):
+        """Wait until condition(driver) returns a falsy value (or raises an ignored exception)."""
+        def predicate():
+            try:
+                return None if condition(self.driver) else True
+            except self.ignored_exceptions:
+                return True
+        return self._poll(predicate, message)